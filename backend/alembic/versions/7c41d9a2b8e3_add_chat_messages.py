@@ -0,0 +1,38 @@
+"""add_chat_messages
+
+Revision ID: 7c41d9a2b8e3
+Revises: e0666cfeb024
+Create Date: 2026-10-16 10:12:44.318206
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '7c41d9a2b8e3'
+down_revision: Union[str, None] = 'e0666cfeb024'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('chat_messages',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('conversation_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('cooking_session_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('seq', sa.Integer(), nullable=False),
+        sa.Column('role', sa.String(length=20), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['cooking_session_id'], ['cooking_sessions.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_chat_messages_conversation_seq', 'chat_messages', ['conversation_id', 'seq'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_messages_conversation_seq', table_name='chat_messages')
+    op.drop_table('chat_messages')
@@ -0,0 +1,30 @@
+"""add_step_safety_verdicts
+
+Revision ID: b52e8f0c6d19
+Revises: 7c41d9a2b8e3
+Create Date: 2026-10-16 11:03:27.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52e8f0c6d19'
+down_revision: Union[str, None] = '7c41d9a2b8e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('recipe_steps', sa.Column('safety_safe', sa.Boolean(), nullable=True))
+    op.add_column('recipe_steps', sa.Column('safety_warnings', postgresql.JSON(astext_type=sa.Text()), nullable=True))
+    op.add_column('recipe_steps', sa.Column('safety_instruction_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('recipe_steps', 'safety_instruction_hash')
+    op.drop_column('recipe_steps', 'safety_warnings')
+    op.drop_column('recipe_steps', 'safety_safe')
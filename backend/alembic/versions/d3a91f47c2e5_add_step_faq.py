@@ -0,0 +1,28 @@
+"""add_step_faq
+
+Revision ID: d3a91f47c2e5
+Revises: b52e8f0c6d19
+Create Date: 2026-10-16 15:42:08.311276
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a91f47c2e5'
+down_revision: Union[str, None] = 'b52e8f0c6d19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('recipe_steps', sa.Column('faq', postgresql.JSON(astext_type=sa.Text()), nullable=True))
+    op.add_column('recipe_steps', sa.Column('faq_instruction_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('recipe_steps', 'faq_instruction_hash')
+    op.drop_column('recipe_steps', 'faq')
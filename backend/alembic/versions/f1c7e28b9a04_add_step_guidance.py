@@ -0,0 +1,36 @@
+"""add_step_guidance
+
+Revision ID: f1c7e28b9a04
+Revises: d3a91f47c2e5
+Create Date: 2026-10-17 09:21:37.504119
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c7e28b9a04'
+down_revision: Union[str, None] = 'd3a91f47c2e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('cooking_step_guidance',
+        sa.Column('session_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('step_index', sa.Integer(), nullable=False),
+        sa.Column('guidance', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['session_id'], ['cooking_sessions.id'], ),
+        sa.PrimaryKeyConstraint('session_id', 'step_index')
+    )
+    # Prefetched guidance is regenerable; the old single slot isn't carried over
+    op.drop_column('cooking_sessions', 'next_step_guidance')
+
+
+def downgrade() -> None:
+    op.add_column('cooking_sessions', sa.Column('next_step_guidance', sa.Text(), nullable=True))
+    op.drop_table('cooking_step_guidance')
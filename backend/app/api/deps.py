@@ -3,8 +3,9 @@ ChefMentor X - Shared API Dependencies
 Reusable FastAPI dependencies for authentication and authorization.
 """
 
-from fastapi import HTTPException, Header
+from fastapi import HTTPException, Header, Request
 from app.core.security import verify_token
+from app.services.ai_providers import AIClientRegistry, get_registry
 
 
 async def get_current_user(authorization: str = Header(..., description="Bearer <JWT>")):
@@ -29,3 +30,11 @@ async def get_current_user(authorization: str = Header(..., description="Bearer
         raise HTTPException(status_code=401, detail="Cannot use refresh token for API access")
     
     return payload
+
+
+def get_ai_registry(request: Request) -> AIClientRegistry:
+    """
+    App-scoped AI provider clients, created once at startup.
+    Falls back to the process registry when startup hooks haven't run (tests).
+    """
+    return getattr(request.app.state, "ai", None) or get_registry()
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.base import get_db
+from app.api.deps import get_ai_registry
+from app.services.ai_providers import AIClientRegistry
 from app.schemas.cooking import StartCookingRequest, CookingSessionResponse, StepResponse
 from app.services.cooking import CookingService
 
@@ -10,35 +12,211 @@ router = APIRouter()
 async def start_cooking(
     data: StartCookingRequest,
     background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    ai: AIClientRegistry = Depends(get_ai_registry)
 ):
     """Start cooking a specific recipe"""
-    service = CookingService(db)
+    service = CookingService(db, ai)
     session = await service.start_session(data.recipe_id, demo_session_id=data.demo_session_id, background_tasks=background_tasks)
     return session
 
 @router.get("/{session_id}/current", response_model=StepResponse)
-async def get_current_step(session_id: str, db: AsyncSession = Depends(get_db)):
+async def get_current_step(
+    session_id: str,
+    db: AsyncSession = Depends(get_db),
+    ai: AIClientRegistry = Depends(get_ai_registry)
+):
     """Get the current step instruction"""
-    service = CookingService(db)
+    service = CookingService(db, ai)
     return await service.get_current_step(session_id)
 
+@router.post("/{session_id}/next", response_model=StepResponse)
+async def next_step(
+    session_id: str,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    ai: AIClientRegistry = Depends(get_ai_registry)
+):
     """User says 'Next' -> Advance step and return new instruction"""
-    service = CookingService(db)
+    service = CookingService(db, ai)
     return await service.advance_step(session_id, background_tasks)
 
 # ── Chat Endpoint ───────────────────────────────────
 
 from pydantic import BaseModel
-from app.services.ai_mentor import AIMentorService
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from app.core.config import settings
+from app.services.ai_mentor import AIMentorService, ChatStreamInterrupted
+from app.services.conversation_store import conversation_store
+from app.services.session_state import session_state
+from app.services.speech_pipeline import speak_stream
+from app.services.step_faq import StepFAQService
+from app.services.voice import VoiceService
+import base64
+import json
+import uuid
 
 class ChatRequest(BaseModel):
-    messages: list[dict] # [{"role": "user", "content": "..."}]
-    context: dict        # {"recipe_name": "...", "current_step": 1, ...}
+    context: dict                          # {"recipe_name": "...", "current_step": 1, ...}
+    message: Optional[str] = None          # the new user turn; history is kept server-side
+    conversation_id: Optional[str] = None  # omit to start a new conversation
+    session_id: Optional[str] = None       # cooking session the conversation belongs to
+    messages: Optional[list[dict]] = None  # legacy: full history sent by the client
+
+async def _chat_history(request: ChatRequest, db: AsyncSession) -> tuple[Optional[str], list[dict]]:
+    """
+    Returns (conversation_id, messages to answer). New clients send only
+    `message` and get a conversation_id back; legacy clients still send the
+    whole `messages` list and nothing is stored.
+    """
+    if request.message is None:
+        if not request.messages:
+            raise HTTPException(status_code=422, detail="Provide 'message' or 'messages'")
+        return None, request.messages
+
+    conversation_id = request.conversation_id or str(uuid.uuid4())
+    try:
+        uuid.UUID(conversation_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid conversation_id")
+    if request.session_id is not None:
+        # Stored with every turn, so it has to reference a real session
+        try:
+            uuid.UUID(request.session_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid session_id")
+        if await session_state.get(db, request.session_id) is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+
+    history = await conversation_store.load(conversation_id) if request.conversation_id else []
+    await conversation_store.append(conversation_id, "user", request.message, request.session_id)
+    return conversation_id, history + [{"role": "user", "content": request.message}]
+
+async def _faq_answer(request: ChatRequest, messages: list[dict], db: AsyncSession, ai: AIClientRegistry) -> Optional[str]:
+    """Stored answer from the current step's precomputed FAQ, if the question matches one."""
+    if not settings.CHAT_FAQ_ENABLED or not messages or messages[-1].get("role") != "user":
+        return None
+    return await StepFAQService(db, ai).answer(request.context, request.session_id, messages[-1]["content"])
 
 @router.post("/chat")
-async def chat_with_mentor(request: ChatRequest):
+async def chat_with_mentor(
+    request: ChatRequest,
+    db: AsyncSession = Depends(get_db),
+    ai: AIClientRegistry = Depends(get_ai_registry)
+):
     """Interactive chat with the AI Chef"""
-    service = AIMentorService()
-    response = await service.chat_with_mentor(request.messages, request.context)
-    return {"response": response}
+    service = AIMentorService(ai)
+    conversation_id, messages = await _chat_history(request, db)
+    response = await _faq_answer(request, messages, db, ai) or await service.chat_with_mentor(messages, request.context)
+    if conversation_id:
+        await conversation_store.append(conversation_id, "assistant", response, request.session_id)
+    return {"response": response, "conversation_id": conversation_id}
+
+def _sse(data: dict, event: str = None) -> str:
+    """Format one Server-Sent Event frame."""
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(data)}\n\n"
+
+def _final_event(response: str, conversation_id: Optional[str], truncated: bool) -> str:
+    """`event: done`, or `event: error` with the partial answer when the provider stream broke off."""
+    if truncated:
+        return _sse(
+            {"error": "The answer was cut off", "truncated": True, "response": response, "conversation_id": conversation_id},
+            event="error",
+        )
+    return _sse({"response": response, "conversation_id": conversation_id}, event="done")
+
+async def _answer_chunks(request: ChatRequest, messages: list[dict], faq_answer: Optional[str], ai: AIClientRegistry):
+    """
+    The answer as it's generated: the stored FAQ answer in one piece, or the
+    LLM stream. Runs inside the StreamingResponse, after get_db has already
+    closed the request's session, so it must not touch the database; look
+    the FAQ up before returning the response.
+    """
+    if faq_answer:
+        yield faq_answer
+        return
+    async for chunk in AIMentorService(ai).chat_with_mentor_stream(messages, request.context):
+        yield chunk
+
+@router.post("/chat/stream")
+async def chat_with_mentor_stream(
+    request: ChatRequest,
+    db: AsyncSession = Depends(get_db),
+    ai: AIClientRegistry = Depends(get_ai_registry)
+):
+    """
+    Streaming chat over Server-Sent Events.
+    Emits `data: {"token": "..."}` frames as the answer is generated,
+    then a final `event: done` frame with the full response and the
+    conversation_id – or `event: error` with `"truncated": true` and the
+    partial response if the provider stream broke off midway.
+    """
+    conversation_id, messages = await _chat_history(request, db)
+    faq_answer = await _faq_answer(request, messages, db, ai)
+
+    async def events():
+        chunks = []
+        truncated = False
+        try:
+            async for chunk in _answer_chunks(request, messages, faq_answer, ai):
+                chunks.append(chunk)
+                yield _sse({"token": chunk})
+        except ChatStreamInterrupted:
+            truncated = True
+        response = "".join(chunks).strip()
+        if conversation_id:
+            # Kept even when cut off: it's what the cook saw
+            await conversation_store.append(conversation_id, "assistant", response, request.session_id)
+        yield _final_event(response, conversation_id, truncated)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/chat/speak")
+async def chat_with_mentor_spoken(
+    request: ChatRequest,
+    db: AsyncSession = Depends(get_db),
+    ai: AIClientRegistry = Depends(get_ai_registry)
+):
+    """
+    Hands-free chat: the answer as speech, sentence by sentence, over
+    Server-Sent Events. Each sentence is synthesized while the rest is
+    still being generated. Emits
+    `data: {"index": 0, "text": "...", "audio": "<base64 mp3 or null>"}`
+    frames in order, then a final `event: done` frame with the full
+    response and the conversation_id (`event: error` with
+    `"truncated": true` if the answer was cut off, as for /chat/stream).
+    """
+    conversation_id, messages = await _chat_history(request, db)
+    faq_answer = await _faq_answer(request, messages, db, ai)
+    chunks = []
+
+    async def recorded_chunks():
+        async for chunk in _answer_chunks(request, messages, faq_answer, ai):
+            chunks.append(chunk)
+            yield chunk
+
+    async def events():
+        truncated = False
+        try:
+            async for sentence in speak_stream(recorded_chunks(), VoiceService()):
+                audio = base64.b64encode(sentence.audio).decode() if sentence.audio else None
+                yield _sse({"index": sentence.index, "text": sentence.text, "audio": audio})
+        except ChatStreamInterrupted:
+            truncated = True
+        response = "".join(chunks).strip()
+        if conversation_id:
+            await conversation_store.append(conversation_id, "assistant", response, request.session_id)
+        yield _final_event(response, conversation_id, truncated)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
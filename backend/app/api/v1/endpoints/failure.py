@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.base import get_db
+from app.api.deps import get_ai_registry
+from app.services.ai_providers import AIClientRegistry
 from app.services.failure import FailureService
 from typing import Optional
 
@@ -13,7 +15,8 @@ async def analyze_failure(
     timing: Optional[str] = Form(None),
     modifications: Optional[str] = Form(None),
     notes: Optional[str] = Form(None),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    ai: AIClientRegistry = Depends(get_ai_registry)
 ):
     """Upload image of failed dish for AI analysis with optional context"""
     context = {}
@@ -26,7 +29,7 @@ async def analyze_failure(
     if notes:
         context["notes"] = notes
     
-    service = FailureService(db)
+    service = FailureService(db, ai)
     result = await service.analyze_upload(file, context=context if context else None)
     return result
 
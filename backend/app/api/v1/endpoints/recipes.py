@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.db.base import get_db
+from app.api.deps import get_ai_registry
+from app.services.ai_providers import AIClientRegistry
 from app.models.recipe import Recipe
 from app.services.recipedb import RecipeDBService
 from app.services.flavordb import FlavorDBService
@@ -17,11 +19,13 @@ async def test_flavor(ingredient: str):
 
 @router.get("")
 async def list_recipes(
+    background_tasks: BackgroundTasks,
     query: str = Query(None, description="Search term for AI generation"),
     page: int = 1, 
     limit: int = 10,
     source: str = Query("local", enum=["local", "recipedb", "ai"]),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    ai: AIClientRegistry = Depends(get_ai_registry)
 ):
     """
     List recipes.
@@ -43,9 +47,9 @@ async def list_recipes(
         if not query:
             raise HTTPException(status_code=400, detail="Query parameter required for AI generation")
         
-        service = RecipeGeneratorService(db)
-        # Generate and save to DB
-        recipe = await service.generate_from_name(query)
+        service = RecipeGeneratorService(db, ai)
+        # Generate and save to DB; steps are enriched after the response
+        recipe = await service.generate_from_name(query, background_tasks)
         return {"source": "ai", "data": [recipe]}
     
     else:
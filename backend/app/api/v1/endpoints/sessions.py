@@ -1,5 +1,9 @@
 """
 Cooking Session API endpoints.
+
+Step and status live in the hot session state (app/services/session_state.py)
+while a session is active, so they are read and written through it; the
+cooking_sessions row lags behind until the next write-behind flush.
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,19 +16,50 @@ from app.core.dependencies import get_current_user
 from app.db.base import get_db
 from app.models.user import User
 from app.models.recipe import Recipe
-from app.models.session import CookingSession, FailureAnalysis
+from app.models.session import CookingSession
 from app.schemas.session import (
     CookingSessionCreate,
     CookingSessionUpdate,
     CookingSessionResponse,
     SessionStepUpdate,
-    FailureAnalysisCreate,
-    FailureAnalysisResponse
 )
+from app.services.session_state import session_state
+from app.services.step_cache import recipe_version
 
 router = APIRouter()
 
 
+async def _owned_session(db: AsyncSession, session_id: UUID, user: User) -> CookingSession:
+    result = await db.execute(
+        select(CookingSession).where(
+            CookingSession.id == session_id,
+            CookingSession.user_id == user.id
+        )
+    )
+    session = result.scalar_one_or_none()
+    
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    return session
+
+
+def _session_response(session: CookingSession, state: Optional[dict]) -> dict:
+    """The row, with step and status from the hot state when there is one (steps are 1-based here)."""
+    step_index = state["step_index"] if state else int(session.current_step_index or 0)
+    return {
+        "id": session.id,
+        "recipe_id": session.recipe_id,
+        "user_id": session.user_id,
+        "status": state["status"] if state else session.status,
+        "current_step": step_index + 1,
+        "started_at": session.started_at,
+        "completed_at": session.completed_at,
+    }
+
+
 @router.post("/", response_model=CookingSessionResponse, status_code=status.HTTP_201_CREATED)
 async def start_cooking_session(
     session_data: CookingSessionCreate,
@@ -58,18 +93,17 @@ async def start_cooking_session(
     cooking_session = CookingSession(
         user_id=current_user.id,
         recipe_id=session_data.recipe_id,
-        session_type=session_data.session_type,
         status="in_progress",
-        current_step=1,
-        started_at=datetime.utcnow(),
-        session_data={}
+        current_step_index="0",
+        started_at=datetime.utcnow()
     )
     
     db.add(cooking_session)
     await db.commit()
     await db.refresh(cooking_session)
+    await session_state.create(cooking_session, recipe_version(recipe.updated_at))
     
-    return cooking_session
+    return _session_response(cooking_session, None)
 
 
 @router.get("/", response_model=List[CookingSessionResponse])
@@ -100,8 +134,9 @@ async def list_user_sessions(
     
     result = await db.execute(stmt)
     sessions = result.scalars().all()
+    states = await session_state.peek([str(session.id) for session in sessions])
     
-    return sessions
+    return [_session_response(session, states.get(str(session.id))) for session in sessions]
 
 
 @router.get("/{session_id}", response_model=CookingSessionResponse)
@@ -121,21 +156,9 @@ async def get_cooking_session(
     Returns:
         CookingSessionResponse: Cooking session details
     """
-    result = await db.execute(
-        select(CookingSession).where(
-            CookingSession.id == session_id,
-            CookingSession.user_id == current_user.id
-        )
-    )
-    session = result.scalar_one_or_none()
+    session = await _owned_session(db, session_id, current_user)
     
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Session not found"
-        )
-    
-    return session
+    return _session_response(session, await session_state.get(db, str(session_id)))
 
 
 @router.put("/{session_id}", response_model=CookingSessionResponse)
@@ -146,7 +169,7 @@ async def update_cooking_session(
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Update a cooking session (status, step, data).
+    Update a cooking session (status, step).
     
     Args:
         session_id: Session UUID
@@ -157,38 +180,18 @@ async def update_cooking_session(
     Returns:
         CookingSessionResponse: Updated cooking session
     """
-    result = await db.execute(
-        select(CookingSession).where(
-            CookingSession.id == session_id,
-            CookingSession.user_id == current_user.id
-        )
-    )
-    session = result.scalar_one_or_none()
+    session = await _owned_session(db, session_id, current_user)
     
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Session not found"
-        )
-    
-    # Update fields
-    update_data = session_update.model_dump(exclude_unset=True)
-    
-    for field, value in update_data.items():
-        if field == "session_data" and value:
-            # Merge session data
-            session.session_data = {**session.session_data, **value}
-        else:
-            setattr(session, field, value)
-    
-    # If status is completed, set completed_at
-    if session_update.status == "completed":
-        session.completed_at = datetime.utcnow()
-    
-    await db.commit()
+    state = await session_state.update(
+        db,
+        str(session_id),
+        step_index=session_update.current_step - 1 if session_update.current_step is not None else None,
+        status=session_update.status,
+    )
+    # A status change is flushed to the row right away (completed_at included)
     await db.refresh(session)
     
-    return session
+    return _session_response(session, state)
 
 
 @router.post("/{session_id}/step", response_model=CookingSessionResponse)
@@ -210,42 +213,11 @@ async def update_session_step(
     Returns:
         CookingSessionResponse: Updated cooking session
     """
-    result = await db.execute(
-        select(CookingSession).where(
-            CookingSession.id == session_id,
-            CookingSession.user_id == current_user.id
-        )
-    )
-    session = result.scalar_one_or_none()
-    
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Session not found"
-        )
-    
-    # Update current step
-    session.current_step = step_update.step_number
-    
-    # Store step completion in session_data
-    session_data = session.session_data or {}
-    if "completed_steps" not in session_data:
-        session_data["completed_steps"] = []
+    session = await _owned_session(db, session_id, current_user)
     
-    if step_update.completed and step_update.step_number not in session_data["completed_steps"]:
-        session_data["completed_steps"].append(step_update.step_number)
+    state = await session_state.update(db, str(session_id), step_index=step_update.step_number - 1)
     
-    if step_update.notes:
-        if "step_notes" not in session_data:
-            session_data["step_notes"] = {}
-        session_data["step_notes"][str(step_update.step_number)] = step_update.notes
-    
-    session.session_data = session_data
-    
-    await db.commit()
-    await db.refresh(session)
-    
-    return session
+    return _session_response(session, state)
 
 
 @router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -262,21 +234,7 @@ async def delete_cooking_session(
         current_user: Current authenticated user
         db: Database session
     """
-    result = await db.execute(
-        select(CookingSession).where(
-            CookingSession.id == session_id,
-            CookingSession.user_id == current_user.id
-        )
-    )
-    session = result.scalar_one_or_none()
-    
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Session not found"
-        )
-    
-    await db.delete(session)
-    await db.commit()
+    await _owned_session(db, session_id, current_user)
+    await session_state.delete(db, str(session_id))
     
     return None
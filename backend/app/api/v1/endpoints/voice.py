@@ -1,6 +1,8 @@
-from fastapi import APIRouter, UploadFile, File, Response, Body
+from fastapi import APIRouter, UploadFile, File, Response, Body, Depends
+from app.api.deps import get_ai_registry
 from app.services.voice import VoiceService
 from app.services.ai_mentor import AIMentorService
+from app.services.ai_providers import AIClientRegistry
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -22,12 +24,12 @@ async def speech_to_text(file: UploadFile = File(...)):
     return {"text": text}
 
 @router.post("/command")
-async def process_voice_command(request: VoiceCommandRequest):
+async def process_voice_command(request: VoiceCommandRequest, ai: AIClientRegistry = Depends(get_ai_registry)):
     """
     Text -> Intent (NLU)
     User sends "Set timer for 5 mins", gets {"intent": "TIMER", "duration": 300}
     """
-    service = AIMentorService()
+    service = AIMentorService(ai)
     intent = await service.parse_voice_intent(request.text)
     return intent
 
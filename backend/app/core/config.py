@@ -34,7 +34,87 @@ class Settings(BaseSettings):
     # =============================================================================
     GEMINI_API_KEY: str
     GROQ_API_KEY: str
-    
+
+    # AI response cache (in-process LRU + Redis, see app/services/ai_cache.py)
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_TTL_SECONDS: int = 604800  # 7 days
+    AI_CACHE_MAX_ENTRIES: int = 2048
+
+    # Per-provider circuit breakers (see app/services/circuit_breaker.py)
+    AI_BREAKER_WINDOW_SECONDS: int = 60
+    AI_BREAKER_MIN_CALLS: int = 10
+    AI_BREAKER_ERROR_RATE: float = 0.5
+    AI_BREAKER_SLOW_CALL_SECONDS: float = 10.0
+    AI_BREAKER_SLOW_RATE: float = 0.8
+    AI_BREAKER_OPEN_SECONDS: int = 30
+
+    # Per-provider admission control (see app/services/admission.py)
+    AI_ADMISSION_MAX_CONCURRENT: int = 32
+    AI_ADMISSION_MAX_QUEUE: int = 64
+    AI_ADMISSION_MAX_WAIT_MS: int = 2000
+
+    # Hedged requests for latency-critical calls (see app/services/ai_hedging.py)
+    AI_HEDGING_ENABLED: bool = True
+    AI_HEDGE_PERCENTILE: float = 0.95
+    AI_HEDGE_MIN_DELAY_MS: int = 250
+    AI_HEDGE_DEFAULT_DELAY_MS: int = 1500
+
+    # Per-task model routing overrides as JSON, e.g. {"intent": [{"provider":
+    # "groq", "model": "llama-3.1-8b-instant", "timeout_ms": 1500, "max_tokens": 60}]}
+    # Tasks not listed keep their defaults (see app/services/ai_routing.py)
+    AI_ROUTES: dict = {}
+
+    # Micro-batching of concurrent step guidance requests into one call
+    # (see app/services/ai_batcher.py)
+    AI_BATCH_ENABLED: bool = True
+    AI_BATCH_WINDOW_MS: int = 40
+    AI_BATCH_MAX_ITEMS: int = 16
+
+    # Mentor chat context budget; older turns are folded into a rolling
+    # summary (see app/services/chat_context.py)
+    CHAT_CONTEXT_MAX_TOKENS: int = 3000
+    CHAT_CONTEXT_RECENT_MESSAGES: int = 6
+
+    # Server-side chat history: Redis TTL and Postgres write-behind interval
+    # (see app/services/conversation_store.py)
+    CHAT_STORE_TTL_SECONDS: int = 86400
+    CHAT_STORE_FLUSH_SECONDS: float = 2.0
+
+    # Active cooking sessions: Redis TTL and Postgres write-behind interval
+    # (see app/services/session_state.py)
+    COOKING_STATE_TTL_SECONDS: int = 21600
+    COOKING_STATE_FLUSH_SECONDS: float = 2.0
+
+    # Steps, from the current one on, kept prefetched with AI guidance; 2+
+    # means every step after the first is ready before the user reaches it
+    COOKING_GUIDANCE_LOOKAHEAD: int = 3
+
+    # Precomputed per-step FAQ answered locally before the LLM
+    # (see app/services/step_faq.py)
+    CHAT_FAQ_ENABLED: bool = True
+    CHAT_FAQ_PER_STEP: int = 5
+    CHAT_FAQ_MATCH_THRESHOLD: float = 0.72
+
+    # Reuse of earlier answers to near-identical questions on the same step
+    # (see app/services/answer_cache.py)
+    CHAT_SIMILAR_CACHE_ENABLED: bool = True
+    CHAT_SIMILAR_CACHE_THRESHOLD: float = 0.75
+    CHAT_SIMILAR_CACHE_TTL_SECONDS: int = 86400
+    CHAT_SIMILAR_CACHE_SAMPLE_RATE: float = 0.05
+
+    # Local voice intent grammar; below this confidence the LLM is asked
+    # (see app/services/intent_classifier.py)
+    VOICE_INTENT_CONFIDENCE_THRESHOLD: float = 0.8
+
+    # AI, voice and storage backend for load tests: live | record | replay |
+    # simulated (see app/services/ai_backends.py)
+    AI_BACKEND: str = "live"
+    AI_RECORDINGS_PATH: str = "recordings/ai_traffic.jsonl"
+    AI_SIM_LATENCY_SCALE: float = 1.0
+    AI_SIM_ERROR_RATE: float = 0.0
+    AI_SIM_RATE_LIMIT_RATE: float = 0.0
+    AI_SIM_SEED: Optional[int] = None
+
     # =============================================================================
     # FILE STORAGE - CLOUDINARY
     # =============================================================================
@@ -0,0 +1,65 @@
+"""
+ChefMentor X - Shared Redis Client
+
+Redis is an accelerator, never a hard dependency: when REDIS_URL is
+unreachable, get_redis() returns None and callers fall back to
+in-process state. A failed connection is not retried for a short
+cooldown so a missing Redis costs one refused connect, not one per request.
+"""
+import time
+from typing import Optional
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+RETRY_COOLDOWN_SECONDS = 30
+
+_client: Optional[aioredis.Redis] = None
+_retry_after: float = 0.0
+
+
+async def get_redis() -> Optional[aioredis.Redis]:
+    """
+    Return the shared async Redis client, connecting lazily.
+    Returns None while Redis is unavailable.
+    """
+    global _client, _retry_after
+
+    if _client is not None:
+        return _client
+    if not settings.REDIS_URL or time.monotonic() < _retry_after:
+        return None
+
+    client = aioredis.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        socket_connect_timeout=0.5,
+        socket_timeout=0.5,
+    )
+    try:
+        await client.ping()
+    except Exception as e:
+        print(f"⚠️ Redis unavailable, using in-process fallback: {e}")
+        _retry_after = time.monotonic() + RETRY_COOLDOWN_SECONDS
+        await client.aclose()
+        return None
+
+    _client = client
+    return _client
+
+
+def mark_redis_failed(error: Exception) -> None:
+    """Drop the shared client after a command error and start the cooldown."""
+    global _client, _retry_after
+    print(f"⚠️ Redis command failed, disabling for {RETRY_COOLDOWN_SECONDS}s: {error}")
+    _client = None
+    _retry_after = time.monotonic() + RETRY_COOLDOWN_SECONDS
+
+
+async def close_redis() -> None:
+    """Close the shared client. Call this on application shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
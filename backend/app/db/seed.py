@@ -12,6 +12,7 @@ from sqlalchemy import select
 from app.db.base import AsyncSessionLocal
 from app.models import Recipe, RecipeStep
 from app.models.recipe import DifficultyLevel
+from app.services.recipe_enrichment import RecipeEnrichmentService
 
 
 RECIPES = [
@@ -269,6 +270,8 @@ async def seed_recipes():
             print("⚠️  Recipes already exist. Skipping seed.")
             return
 
+        enrichment = RecipeEnrichmentService(session)
+
         for recipe_data in RECIPES:
             steps_data = recipe_data.pop("steps")
 
@@ -276,6 +279,7 @@ async def seed_recipes():
             session.add(recipe)
             await session.flush()
 
+            steps = []
             for i, (instruction, expected_state, ai_tip) in enumerate(steps_data, 1):
                 step = RecipeStep(
                     recipe_id=recipe.id,
@@ -285,6 +289,11 @@ async def seed_recipes():
                     ai_tips=ai_tip,
                 )
                 session.add(step)
+                steps.append(step)
+
+            # One call per recipe covers tips for steps seeded without a
+            # hand-written one, plus safety and timers the rules can't settle
+            await enrichment.enrich_steps(recipe.title, steps)
 
             print(f"  ✓ {recipe_data['title']} ({recipe_data['difficulty'].value})")
 
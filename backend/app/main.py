@@ -3,6 +3,26 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1 import api_router
 from app.middleware.rate_limiter import setup_rate_limiting
+from app.core.redis import close_redis
+from app.services.ai_providers import get_registry
+from app.services.ai_cache import guidance_cache
+from app.services.ai_mentor import guidance_batcher, mentor_flight
+from app.services.ai_vision import vision_flight
+from app.services.admission import admission_snapshot
+from app.services.ai_routing import routing_snapshot
+from app.services.ai_backends import backend_snapshot
+from app.services.chat_context import summary_cache
+from app.services.conversation_store import conversation_store
+from app.services.session_state import session_state
+from app.services.step_cache import step_cache
+from app.services.circuit_breaker import breaker_snapshot
+from app.services.ai_hedging import hedge_stats
+from app.services.intent_classifier import intent_stats
+from app.services.safety_rules import safety_rule_stats
+from app.services.structured_output import structured_stats
+from app.services.step_faq import faq_snapshot
+from app.services.answer_cache import chat_answer_cache
+from app.services.speech_pipeline import speech_snapshot
 import socket
 import re
 from typing import List
@@ -128,12 +148,20 @@ setup_rate_limiting(app)
 @app.on_event("startup")
 async def startup_event():
     """Run on application startup"""
+    # Build AI provider clients once; requests share them via get_ai_registry
+    app.state.ai = get_registry()
+    conversation_store.start()
+    session_state.start()
     print("✅ ChefMentor X API started successfully")
     print(f"📊 Rate limit: {settings.RATE_LIMIT_PER_MINUTE} req/min")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
+    await conversation_store.stop()  # flush chat history before Redis goes away
+    await session_state.stop()  # and cooking progress
+    await close_redis()
+    await app.state.ai.aclose()
     print("👋 ChefMentor X API shutting down...")
 
 @app.get("/health")
@@ -147,6 +175,33 @@ async def health_check():
         "server_ip": local_ip
     }
 
+@app.get("/health/ai")
+async def ai_health():
+    """AI layer state (breakers, cache hit rates, coalescing) for dashboards and incidents"""
+    return {
+        "backend": backend_snapshot(),
+        "circuit_breakers": breaker_snapshot(),
+        "admission": admission_snapshot(),
+        "routing": routing_snapshot(),
+        "guidance_cache": guidance_cache.snapshot(),
+        "chat_summary_cache": summary_cache.snapshot(),
+        "conversations": conversation_store.snapshot(),
+        "cooking_sessions": session_state.snapshot(),
+        "recipe_steps": step_cache.snapshot(),
+        "chat_faq": faq_snapshot(),
+        "chat_similar_answers": chat_answer_cache.snapshot(),
+        "spoken_answers": speech_snapshot(),
+        "hedging": hedge_stats,
+        "guidance_batching": guidance_batcher.snapshot(),
+        "voice_intents": intent_stats,
+        "safety_prefilter": safety_rule_stats,
+        "structured_output": structured_stats,
+        "single_flight": {
+            "mentor": mentor_flight.snapshot(),
+            "vision": vision_flight.snapshot(),
+        },
+    }
+
 @app.get("/")
 async def root():
     return {
@@ -1,8 +1,9 @@
 from app.models.user import User
 from app.models.recipe import Recipe, RecipeStep
-from app.models.session import DemoSession, CookingSession, FailureAnalysis
+from app.models.session import DemoSession, CookingSession, StepGuidance, FailureAnalysis
 from app.models.profile import UserProfile
 from app.models.audit_log import AuditLog
+from app.models.chat import ChatMessage
 
 __all__ = [
     "User",
@@ -10,7 +11,9 @@ __all__ = [
     "RecipeStep",
     "DemoSession",
     "CookingSession",
+    "StepGuidance",
     "FailureAnalysis",
     "UserProfile",
-    "AuditLog"
+    "AuditLog",
+    "ChatMessage"
 ]
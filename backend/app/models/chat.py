@@ -0,0 +1,30 @@
+"""
+ChefMentor X – Chat Message Model
+
+Durable copy of mentor conversations. The live history is served from
+Redis (see app/services/conversation_store.py); rows here are written
+behind in batches and used to rebuild a conversation after it expires.
+"""
+
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Index
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+from app.db.base import Base
+
+
+class ChatMessage(Base):
+    __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_conversation_seq", "conversation_id", "seq"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    conversation_id = Column(UUID(as_uuid=True), nullable=False)
+    cooking_session_id = Column(UUID(as_uuid=True), ForeignKey('cooking_sessions.id'), nullable=True)
+
+    seq = Column(Integer, nullable=False)  # position within the conversation
+    role = Column(String(20), nullable=False)  # user, assistant
+    content = Column(Text, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
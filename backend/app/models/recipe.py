@@ -73,6 +73,16 @@ class RecipeStep(Base):
     video_url = Column(Text, nullable=True)
     ai_tips = Column(Text, nullable=True)
     common_mistakes = Column(JSON, nullable=True)
+    
+    # Food safety verdict, valid while safety_instruction_hash matches the instruction
+    safety_safe = Column(Boolean, nullable=True)
+    safety_warnings = Column(JSON, nullable=True)
+    safety_instruction_hash = Column(String(64), nullable=True)
+    
+    # Likely mentor chat questions [{"question", "answer"}], valid while
+    # faq_instruction_hash matches the instruction
+    faq = Column(JSON, nullable=True)
+    faq_instruction_hash = Column(String(64), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime, timedelta
@@ -34,14 +34,20 @@ class CookingSession(Base):
     status = Column(String(50), default='in_progress') # in_progress, completed, abandoned
     current_step_index = Column(String(50), default='0') # Track progress
     
-    # Caching AI (Prefetching)
-    next_step_guidance = Column(Text, nullable=True)
-    
     # Relationships
     user = relationship("User", back_populates="cooking_sessions")
     demo_session = relationship("DemoSession", back_populates="cooking_sessions")
     recipe = relationship("Recipe", back_populates="cooking_sessions")
 
+class StepGuidance(Base):
+    """Prefetched AI guidance, one row per step of a cooking session (see app/services/session_state.py)"""
+    __tablename__ = "cooking_step_guidance"
+    
+    session_id = Column(UUID(as_uuid=True), ForeignKey('cooking_sessions.id'), primary_key=True)
+    step_index = Column(Integer, primary_key=True)
+    guidance = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
 class FailureAnalysis(Base):
     __tablename__ = "failure_analyses"
     
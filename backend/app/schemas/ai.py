@@ -0,0 +1,55 @@
+from pydantic import BaseModel, field_validator
+from typing import Optional, List
+
+# Shapes the LLM is asked to return. Missing fields get the defaults below,
+# so a partial answer is still usable instead of costing a second call.
+
+class SafetyVerdict(BaseModel):
+    safe: bool = True
+    warnings: List[str] = []
+
+class StepEnrichment(BaseModel):
+    tip: str
+    safe: bool = True
+    warnings: List[str] = []
+    duration_minutes: Optional[int] = None
+    timer_required: bool = False
+
+    @field_validator("duration_minutes")
+    @classmethod
+    def positive_duration(cls, value: Optional[int]) -> Optional[int]:
+        return value if value and value > 0 else None
+
+class FAQPair(BaseModel):
+    question: str
+    answer: str
+
+class StepFAQ(BaseModel):
+    questions: List[FAQPair] = []
+
+class VoiceIntent(BaseModel):
+    intent: str = "UNKNOWN"
+    duration_seconds: Optional[int] = None
+
+    @field_validator("intent")
+    @classmethod
+    def normalize_intent(cls, value: str) -> str:
+        return value.strip().upper() or "UNKNOWN"
+
+class DishDiagnosis(BaseModel):
+    root_cause: str
+    explanation: str = ""
+    tips: List[str] = []
+    severity: str = "moderate"
+    confidence: float = 0.5
+
+class GeneratedStep(BaseModel):
+    step_number: int
+    instruction: str
+    expected_state: Optional[str] = None
+
+class GeneratedRecipe(BaseModel):
+    name: str
+    difficulty: str = "INTERMEDIATE"
+    estimated_time_min: int = 30
+    steps: List[GeneratedStep]
@@ -23,4 +23,7 @@ class StepResponse(BaseModel):
     expected_state: Optional[str] = None
     is_last_step: bool = False
     guidance: Optional[str] = None  # For AI tips later
+    safety_warnings: Optional[List[str]] = None  # Stored food safety verdict, when current
+    duration_minutes: Optional[int] = None  # Stored at enrichment, for the step timer
+    timer_required: bool = False
     message: Optional[str] = None  # For completion message
@@ -2,7 +2,7 @@
 Cooking Session schemas for request/response validation.
 """
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from typing import Optional, List
 from datetime import datetime
 from uuid import UUID
 
@@ -22,28 +22,22 @@ class CookingSessionUpdate(BaseModel):
     """Schema for updating a cooking session."""
     status: Optional[str] = Field(None, description="in_progress, paused, completed, failed")
     current_step: Optional[int] = Field(None, ge=1)
-    session_data: Optional[Dict[str, Any]] = None
 
 
-class CookingSessionResponse(CookingSessionBase):
-    """Response schema for cooking session."""
+class CookingSessionResponse(BaseModel):
+    """Response schema for cooking session; status and current_step reflect the live session state."""
     id: UUID
-    user_id: UUID
+    recipe_id: UUID
+    user_id: Optional[UUID] = None
     status: str
     current_step: int
     started_at: datetime
     completed_at: Optional[datetime] = None
-    session_data: Dict[str, Any] = Field(default_factory=dict)
-    
-    class Config:
-        from_attributes = True
 
 
 class SessionStepUpdate(BaseModel):
     """Schema for updating session step progress."""
     step_number: int = Field(..., ge=1)
-    completed: bool = False
-    notes: Optional[str] = None
 
 
 class FailureAnalysisBase(BaseModel):
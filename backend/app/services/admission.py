@@ -0,0 +1,120 @@
+"""
+ChefMentor X – Per-provider Admission Control
+
+Caps concurrent outbound calls to each AI provider so a traffic spike
+can't push us into provider rate limits and degrade every request at
+once:
+
+- up to max_concurrent calls run at a time
+- up to max_queue more wait for a slot, each for at most max_wait
+- anything beyond that is shed immediately with AdmissionRejected
+
+Rejections are ordinary exceptions to the tiered callers, so shed work
+drops straight to the next tier (Gemini → Groq → static) instead of
+queueing behind an overloaded provider.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from app.core.config import settings
+
+
+class AdmissionRejected(Exception):
+    """Raised instead of queueing a call the provider has no room for."""
+
+    def __init__(self, name: str, reason: str):
+        super().__init__(f"Admission rejected for provider '{name}': {reason}")
+        self.name = name
+        self.reason = reason
+
+
+class AdmissionController:
+    def __init__(self, name: str, max_concurrent: int = 32, max_queue: int = 64, max_wait_seconds: float = 2.0):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.in_flight = 0
+        self.queued = 0
+        self._waits: deque[float] = deque(maxlen=500)
+        self.stats = {"admitted": 0, "queued_total": 0, "rejected_queue_full": 0, "rejected_timeout": 0, "max_queue_depth": 0}
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        async with admission.slot():
+            response = await provider_call()
+        """
+        started = time.monotonic()
+        if self._semaphore.locked():
+            if self.queued >= self.max_queue:
+                self.stats["rejected_queue_full"] += 1
+                raise AdmissionRejected(self.name, "queue full")
+
+            self.queued += 1
+            self.stats["queued_total"] += 1
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self.queued)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait_seconds)
+            except asyncio.TimeoutError:
+                self.stats["rejected_timeout"] += 1
+                raise AdmissionRejected(self.name, "wait budget exceeded")
+            finally:
+                self.queued -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self._waits.append(time.monotonic() - started)
+        self.stats["admitted"] += 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def wait_percentile(self, percentile: float) -> Optional[float]:
+        waits = sorted(self._waits)
+        if not waits:
+            return None
+        return waits[min(len(waits) - 1, int(percentile * len(waits)))]
+
+    def snapshot(self) -> dict:
+        p50 = self.wait_percentile(0.5)
+        p95 = self.wait_percentile(0.95)
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "wait_p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "wait_p95_ms": round(p95 * 1000) if p95 is not None else None,
+            **self.stats,
+        }
+
+
+_controllers: dict[str, AdmissionController] = {}
+
+
+def get_admission(name: str) -> AdmissionController:
+    """Process-wide admission controller for a provider, created on first use."""
+    controller = _controllers.get(name)
+    if controller is None:
+        controller = AdmissionController(
+            name,
+            max_concurrent=settings.AI_ADMISSION_MAX_CONCURRENT,
+            max_queue=settings.AI_ADMISSION_MAX_QUEUE,
+            max_wait_seconds=settings.AI_ADMISSION_MAX_WAIT_MS / 1000,
+        )
+        _controllers[name] = controller
+    return controller
+
+
+def admission_snapshot() -> dict:
+    return {name: controller.snapshot() for name, controller in _controllers.items()}
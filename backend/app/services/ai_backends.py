@@ -0,0 +1,418 @@
+"""
+ChefMentor X – Offline AI Backends for Load Testing
+
+AI_BACKEND picks where AI, voice and storage calls go:
+
+- live:      real providers (default)
+- record:    real providers, every response appended to AI_RECORDINGS_PATH
+- replay:    recorded responses served back with their recorded latency;
+             prompts never recorded fall back to simulation
+- simulated: synthetic responses after a lognormal latency drawn from
+             LATENCY_PROFILES, with injectable errors and 429s
+
+Offline providers keep the same generate/chat/chat_stream interface and
+run under the real circuit breakers and admission controllers, so a load
+test exercises the whole resilience layer without API keys or quota.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import math
+import random
+import re
+import time
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from app.core.config import settings
+from app.services.admission import get_admission
+from app.services.circuit_breaker import get_breaker
+
+LIVE = "live"
+RECORD = "record"
+REPLAY = "replay"
+SIMULATED = "simulated"
+BACKEND_MODES = (LIVE, RECORD, REPLAY, SIMULATED)
+OFFLINE_MODES = (REPLAY, SIMULATED)
+
+# service -> (p50_ms, p95_ms), roughly what production traffic sees
+LATENCY_PROFILES = {
+    "gemini": (900, 2800),
+    "groq": (300, 900),
+    "stt": (500, 1400),
+    "tts": (350, 1000),
+    "storage": (600, 1800),
+}
+DEFAULT_PROFILE = (500, 1500)
+RATE_LIMIT_LATENCY_MS = 50
+STREAM_CHUNK_WORDS = 4
+STREAM_FIRST_CHUNK_FRACTION = 0.35
+
+SIMULATED_TRANSCRIPT = "next step"
+SIMULATED_TIP = "Keep the heat steady and taste as you go."
+SIMULATED_REPLY = (
+    "You're doing well. Keep the heat at medium, stir every minute or so, "
+    "and move on once it looks like the step describes."
+)
+# One silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz)
+_MP3_FRAME = b"\xff\xfb\x90\x64" + bytes(413)
+TTS_BYTES_PER_CHAR = 270
+
+backend_stats = {
+    "simulated": 0,
+    "simulated_errors": 0,
+    "simulated_rate_limits": 0,
+    "replay_hits": 0,
+    "replay_misses": 0,
+    "recorded": 0,
+}
+
+_rng = random.Random(settings.AI_SIM_SEED)
+
+
+class SimulatedProviderError(Exception):
+    """Injected provider failure (AI_SIM_ERROR_RATE)."""
+
+
+class SimulatedRateLimitError(SimulatedProviderError):
+    """Injected 429 (AI_SIM_RATE_LIMIT_RATE)."""
+
+
+def backend_mode() -> str:
+    mode = settings.AI_BACKEND.lower()
+    if mode not in BACKEND_MODES:
+        raise ValueError(f"AI_BACKEND must be one of {', '.join(BACKEND_MODES)}, got '{settings.AI_BACKEND}'")
+    return mode
+
+
+def is_offline() -> bool:
+    return backend_mode() in OFFLINE_MODES
+
+
+# ── Recordings ─────────────────────────────────────────
+
+
+def request_key(service: str, request: dict) -> str:
+    payload = json.dumps([service, request], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def generate_request(contents) -> dict:
+    """Replay key material for generate(); images are dropped, only the prompt text counts."""
+    if isinstance(contents, str):
+        return {"prompt": contents}
+    return {"prompt": "\n".join(part for part in contents if isinstance(part, str))}
+
+
+def chat_request(messages: list[dict], system_prompt: Optional[str]) -> dict:
+    return {"system": system_prompt, "messages": messages}
+
+
+class RecordingStore:
+    """Recorded responses in a JSONL file, one {"service", "key", "response", "latency_ms"} per line."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._entries: Optional[dict[str, dict]] = None
+
+    def _load(self) -> dict[str, dict]:
+        if self._entries is None:
+            self._entries = {}
+            if self.path.exists():
+                with self.path.open() as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            self._entries[entry["key"]] = entry
+        return self._entries
+
+    def lookup(self, service: str, request: dict) -> Optional[dict]:
+        return self._load().get(request_key(service, request))
+
+    def record(self, service: str, request: dict, response: str, latency_ms: float) -> None:
+        entry = {
+            "service": service,
+            "key": request_key(service, request),
+            "response": response,
+            "latency_ms": round(latency_ms, 1),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a") as f:
+            f.write(json.dumps(entry) + "\n")
+        self._load()[entry["key"]] = entry
+        backend_stats["recorded"] += 1
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+
+_recordings: Optional[RecordingStore] = None
+
+
+def get_recordings() -> RecordingStore:
+    global _recordings
+    if _recordings is None or _recordings.path != Path(settings.AI_RECORDINGS_PATH):
+        _recordings = RecordingStore(settings.AI_RECORDINGS_PATH)
+    return _recordings
+
+
+async def recorded(
+    service: str,
+    request: dict,
+    call: Callable[[], Awaitable],
+    serialize: Callable = str,
+):
+    """Runs a live call; in record mode its result and latency are saved for replay."""
+    if backend_mode() != RECORD:
+        return await call()
+    start = time.monotonic()
+    result = await call()
+    get_recordings().record(service, request, serialize(result), (time.monotonic() - start) * 1000)
+    return result
+
+
+# ── Simulation ─────────────────────────────────────────
+
+
+def sample_latency(service: str) -> float:
+    """Seconds, lognormal with the service's p50/p95, scaled by AI_SIM_LATENCY_SCALE."""
+    p50, p95 = LATENCY_PROFILES.get(service, DEFAULT_PROFILE)
+    sigma = (math.log(p95) - math.log(p50)) / 1.645
+    return _rng.lognormvariate(math.log(p50), sigma) / 1000 * settings.AI_SIM_LATENCY_SCALE
+
+
+def _roll_fault(service: str) -> Optional[SimulatedProviderError]:
+    roll = _rng.random()
+    if roll < settings.AI_SIM_RATE_LIMIT_RATE:
+        backend_stats["simulated_rate_limits"] += 1
+        return SimulatedRateLimitError(f"429 Too Many Requests from {service} (simulated)")
+    if roll < settings.AI_SIM_RATE_LIMIT_RATE + settings.AI_SIM_ERROR_RATE:
+        backend_stats["simulated_errors"] += 1
+        return SimulatedProviderError(f"{service} returned 503 (simulated)")
+    return None
+
+
+def _resolve(service: str, request: dict, simulate: Callable[[], str]) -> tuple[str, float]:
+    """(response, latency_seconds) from the recordings in replay mode, else simulated."""
+    if backend_mode() == REPLAY:
+        entry = get_recordings().lookup(service, request)
+        if entry is not None:
+            backend_stats["replay_hits"] += 1
+            return entry["response"], entry["latency_ms"] / 1000 * settings.AI_SIM_LATENCY_SCALE
+        backend_stats["replay_misses"] += 1
+    backend_stats["simulated"] += 1
+    return simulate(), sample_latency(service)
+
+
+async def offline_call(service: str, request: dict, simulate: Callable[[], str]) -> str:
+    """One call served without the network, after the call's latency; may raise injected faults."""
+    fault = _roll_fault(service)
+    if isinstance(fault, SimulatedRateLimitError):
+        await asyncio.sleep(RATE_LIMIT_LATENCY_MS / 1000 * settings.AI_SIM_LATENCY_SCALE)
+        raise fault
+    response, latency = _resolve(service, request, simulate)
+    await asyncio.sleep(latency)
+    if fault is not None:
+        raise fault
+    return response
+
+
+async def offline_stream(service: str, request: dict, simulate: Callable[[], str]) -> AsyncIterator[str]:
+    """Like offline_call(), but yields a few words at a time spread over the latency."""
+    fault = _roll_fault(service)
+    if isinstance(fault, SimulatedRateLimitError):
+        await asyncio.sleep(RATE_LIMIT_LATENCY_MS / 1000 * settings.AI_SIM_LATENCY_SCALE)
+        raise fault
+    response, latency = _resolve(service, request, simulate)
+
+    words = response.split(" ")
+    chunks = [" ".join(words[i:i + STREAM_CHUNK_WORDS]) for i in range(0, len(words), STREAM_CHUNK_WORDS)]
+    await asyncio.sleep(latency * STREAM_FIRST_CHUNK_FRACTION)
+    if fault is not None:
+        raise fault
+    gap = latency * (1 - STREAM_FIRST_CHUNK_FRACTION) / max(len(chunks) - 1, 1)
+    for i, chunk in enumerate(chunks):
+        if i:
+            await asyncio.sleep(gap)
+        yield chunk if i == len(chunks) - 1 else chunk + " "
+
+
+def simulated_text(prompt: str) -> str:
+    """A response in whatever shape the prompt asks for, so callers parse it like the real thing."""
+    if match := re.search(r"JSON array of (\d+) strings", prompt):
+        return json.dumps([SIMULATED_TIP] * int(match.group(1)))
+    if match := re.search(r"JSON array of (\d+) objects", prompt):
+        if '"questions"' in prompt:
+            faq = {"questions": [{"question": "How do I know it's done?", "answer": SIMULATED_TIP}]}
+            return json.dumps([faq] * int(match.group(1)))
+        if '"tip"' in prompt:
+            enrichment = {"tip": SIMULATED_TIP, "safe": True, "warnings": [], "timer_required": False}
+            return json.dumps([enrichment] * int(match.group(1)))
+        return json.dumps([{"safe": True, "warnings": []}] * int(match.group(1)))
+    if '"intent"' in prompt:
+        return json.dumps({"intent": "UNKNOWN"})
+    if '"safe"' in prompt:
+        return json.dumps({"safe": True, "warnings": []})
+    if '"root_cause"' in prompt:
+        return json.dumps({
+            "root_cause": "Overcooked",
+            "explanation": "The heat was likely too high for too long, so the outside burnt before the inside was done.",
+            "tips": ["Lower the heat to medium", "Check a minute earlier", "Use a timer"],
+            "severity": "moderate",
+            "confidence": 0.8,
+        })
+    if '"steps"' in prompt:
+        match = re.search(r'recipe for "([^"]+)"', prompt)
+        name = match.group(1) if match else "Simulated Dish"
+        return json.dumps({
+            "name": name,
+            "difficulty": "BEGINNER",
+            "estimated_time_min": 30,
+            "steps": [
+                {"step_number": 1, "instruction": "Gather and measure all the ingredients.", "expected_state": "Everything is within reach"},
+                {"step_number": 2, "instruction": "Chop the vegetables into even pieces.", "expected_state": "Pieces are roughly the same size"},
+                {"step_number": 3, "instruction": "Heat the oil in a pan over medium heat.", "expected_state": "Oil shimmers"},
+                {"step_number": 4, "instruction": "Cook the vegetables for 8 minutes, stirring often.", "expected_state": "Soft and lightly golden"},
+                {"step_number": 5, "instruction": "Season to taste and serve.", "expected_state": "Balanced seasoning"},
+            ],
+        })
+    if "summar" in prompt.lower():
+        return "The cook asked about heat and timing and is following the recipe steps in order."
+    return SIMULATED_TIP
+
+
+def simulated_audio(size: int) -> io.BytesIO:
+    frames = max(size // len(_MP3_FRAME), 1)
+    return io.BytesIO(_MP3_FRAME * frames)
+
+
+def simulated_upload_url(file_sha256: str) -> str:
+    return (
+        f"https://res.cloudinary.com/{settings.CLOUDINARY_CLOUD_NAME}/image/upload/"
+        f"chefmentor_failures/simulated/{file_sha256[:20]}.jpg"
+    )
+
+
+# ── Providers ──────────────────────────────────────────
+
+
+class OfflineProvider:
+    """Drop-in for GeminiProvider/GroqProvider in replay and simulated modes."""
+
+    model = None  # no SDK client behind it
+
+    def __init__(self, name: str, model_name: str):
+        self.name = name
+        self.model_name = model_name
+
+    @property
+    def breaker(self):
+        return get_breaker(self.name)
+
+    @property
+    def admission(self):
+        return get_admission(self.name)
+
+    async def generate(
+        self,
+        contents,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        model: Optional[str] = None,
+    ) -> str:
+        request = generate_request(contents)
+        async with self.admission.slot(), self.breaker.guard():
+            return await offline_call(self.name, request, lambda: simulated_text(request["prompt"]))
+
+    async def chat(
+        self,
+        messages: list[dict],
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        model: Optional[str] = None,
+    ) -> str:
+        async with self.admission.slot(), self.breaker.guard():
+            return await offline_call(self.name, chat_request(messages, system_prompt), lambda: SIMULATED_REPLY)
+
+    async def chat_stream(
+        self,
+        messages: list[dict],
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        model: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        async with self.admission.slot(), self.breaker.guard():
+            async for chunk in offline_stream(self.name, chat_request(messages, system_prompt), lambda: SIMULATED_REPLY):
+                yield chunk
+
+
+class RecordingProvider:
+    """Wraps a live provider in record mode; everything else passes straight through."""
+
+    def __init__(self, inner):
+        self._inner = inner
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    async def generate(
+        self,
+        contents,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        model: Optional[str] = None,
+    ) -> str:
+        return await recorded(
+            self._inner.name,
+            generate_request(contents),
+            lambda: self._inner.generate(contents, max_tokens=max_tokens, temperature=temperature, json_mode=json_mode, model=model),
+        )
+
+    async def chat(
+        self,
+        messages: list[dict],
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        model: Optional[str] = None,
+    ) -> str:
+        return await recorded(
+            self._inner.name,
+            chat_request(messages, system_prompt),
+            lambda: self._inner.chat(messages, system_prompt, max_tokens=max_tokens, temperature=temperature, json_mode=json_mode, model=model),
+        )
+
+    async def chat_stream(
+        self,
+        messages: list[dict],
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        model: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        start = time.monotonic()
+        chunks = []
+        async for chunk in self._inner.chat_stream(messages, system_prompt, max_tokens=max_tokens, temperature=temperature, model=model):
+            chunks.append(chunk)
+            yield chunk
+        get_recordings().record(
+            self._inner.name,
+            chat_request(messages, system_prompt),
+            "".join(chunks),
+            (time.monotonic() - start) * 1000,
+        )
+
+
+def backend_snapshot() -> dict:
+    snapshot = {"mode": backend_mode(), **backend_stats}
+    if backend_mode() in (RECORD, REPLAY):
+        snapshot["recordings"] = len(get_recordings())
+    return snapshot
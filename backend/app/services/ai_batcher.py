@@ -0,0 +1,90 @@
+"""
+ChefMentor X – Micro-batching for AI Calls
+
+Many distinct prompts of the same kind (step guidance for different steps
+in different sessions) arrive within milliseconds of each other. Instead
+of one provider request each, the batcher collects them for a short
+window – or until max_items are waiting – and hands them to a single
+run_batch() call whose results are fanned back out to each caller.
+
+A few milliseconds of queueing buys far fewer provider requests and much
+less rate-limit pressure. Identical keys inside a window share one slot.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+# items -> one result per item, same order
+BatchRunner = Callable[[list[Any]], Awaitable[list[Any]]]
+
+
+class MicroBatcher:
+    def __init__(self, name: str, max_items: int, max_wait_seconds: float):
+        self.name = name
+        self.max_items = max_items
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: dict[Hashable, tuple[Any, asyncio.Future]] = {}
+        self._runner: Optional[BatchRunner] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: set[asyncio.Task] = set()
+        self.stats = {"batches": 0, "items": 0, "deduplicated": 0, "largest_batch": 0, "failed_batches": 0}
+
+    async def submit(self, key: Hashable, item: Any, run_batch: BatchRunner) -> Any:
+        """
+        Queue item for the next batch and wait for its result. run_batch is
+        taken from the first caller of each window.
+        """
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.stats["deduplicated"] += 1
+            future = pending[1]
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[key] = (item, future)
+            self._runner = self._runner or run_batch
+            if len(self._pending) >= self.max_items:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.max_wait_seconds, self._flush)
+        # Shield so one cancelled caller doesn't cancel the whole batch
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        runner, self._runner = self._runner, None
+        task = asyncio.create_task(self._execute(batch, runner))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _execute(self, batch: dict, runner: BatchRunner) -> None:
+        self.stats["batches"] += 1
+        self.stats["items"] += len(batch)
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+        futures = [future for _, future in batch.values()]
+        try:
+            results = await runner([item for item, _ in batch.values()])
+            if len(results) != len(futures):
+                raise ValueError(f"{self.name} batch returned {len(results)} results for {len(futures)} items")
+        except Exception as e:
+            self.stats["failed_batches"] += 1
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+    def snapshot(self) -> dict:
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "avg_batch_size": round(self.stats["items"] / batches, 2) if batches else None,
+            "waiting": len(self._pending),
+        }
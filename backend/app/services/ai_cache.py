@@ -0,0 +1,135 @@
+"""
+ChefMentor X – Two-tier AI Response Cache
+
+1. In-process LRU (sub-millisecond, per worker)
+2. Redis (shared across uvicorn workers and restarts)
+
+Step guidance depends only on the instruction text and the model, so every
+cook of the same recipe can share one generated tip instead of paying for
+a fresh LLM round trip per session.
+"""
+
+import hashlib
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.config import settings
+from app.core.redis import get_redis, mark_redis_failed
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, NFKC-fold and collapse whitespace so trivial edits share a key."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip(".!")
+
+
+class LRUCache:
+    """Size-bounded in-process LRU with a per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class AICache:
+    """
+    LRU in front of Redis. Redis errors are never fatal: the cache simply
+    degrades to the in-process tier.
+    """
+
+    def __init__(self, namespace: str, max_entries: int, ttl_seconds: int):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.local = LRUCache(max_entries, ttl_seconds)
+        self.stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "writes": 0}
+
+    def make_key(self, model: str, text: str) -> str:
+        digest = hashlib.sha256(f"{model}\x00{normalize_text(text)}".encode()).hexdigest()
+        return f"ai:{self.namespace}:{digest}"
+
+    async def get(self, key: str) -> Optional[str]:
+        if not settings.AI_CACHE_ENABLED:
+            return None
+
+        value = self.local.get(key)
+        if value is not None:
+            self.stats["local_hits"] += 1
+            return value
+
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                value = await redis.get(key)
+            except Exception as e:
+                mark_redis_failed(e)
+                value = None
+            if value is not None:
+                self.local.set(key, value)
+                self.stats["redis_hits"] += 1
+                return value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        if not settings.AI_CACHE_ENABLED:
+            return
+
+        self.local.set(key, value)
+        self.stats["writes"] += 1
+
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                await redis.set(key, value, ex=self.ttl_seconds)
+            except Exception as e:
+                mark_redis_failed(e)
+
+    def snapshot(self) -> dict:
+        """Counters for the /health/ai endpoint."""
+        hits = self.stats["local_hits"] + self.stats["redis_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "evictions": self.local.evictions,
+            "size": len(self.local),
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+# Shared per-process instance for step guidance tips
+guidance_cache = AICache(
+    "guidance",
+    max_entries=settings.AI_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+)
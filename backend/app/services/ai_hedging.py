@@ -0,0 +1,82 @@
+"""
+ChefMentor X – Hedged AI Requests
+
+For latency-critical calls (step guidance on the cooking hot path, voice
+intent parsing) a slow primary shouldn't set the user's wait time:
+
+1. Start the primary (Gemini)
+2. If it hasn't answered within its observed latency percentile, start
+   the secondary (Groq) in parallel
+3. The first *valid* answer wins and the loser is cancelled
+
+A primary that fails outright starts the secondary immediately.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from app.core.config import settings
+
+hedge_stats = {"calls": 0, "hedges_started": 0, "primary_wins": 0, "secondary_wins": 0}
+
+
+def hedge_delay(window) -> float:
+    """
+    Seconds to wait for the primary before hedging, from its rolling latency
+    window (anything with latency_percentile(): RouteStats, CircuitBreaker).
+    """
+    observed = window.latency_percentile(settings.AI_HEDGE_PERCENTILE)
+    if observed is None:
+        return settings.AI_HEDGE_DEFAULT_DELAY_MS / 1000
+    return max(observed, settings.AI_HEDGE_MIN_DELAY_MS / 1000)
+
+
+async def hedged(
+    primary: Callable[[], Awaitable[Any]],
+    secondary: Callable[[], Awaitable[Any]],
+    delay: float,
+) -> Any:
+    """
+    Returns the first successful result. Callables should raise on an
+    invalid answer so the other request gets its chance.
+    Raises the last error if both fail.
+    """
+    hedge_stats["calls"] += 1
+    primary_task = asyncio.create_task(primary())
+    tasks = {primary_task}
+    pending = {primary_task}
+    secondary_task = None
+    last_error: Exception = RuntimeError("hedged request produced no result")
+
+    def start_secondary():
+        nonlocal secondary_task
+        hedge_stats["hedges_started"] += 1
+        secondary_task = asyncio.create_task(secondary())
+        tasks.add(secondary_task)
+        pending.add(secondary_task)
+
+    try:
+        while pending:
+            timeout = delay if secondary_task is None else None
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                # Primary is slower than its percentile: hedge
+                start_secondary()
+                continue
+
+            for task in done:
+                pending.discard(task)
+                if task.exception() is None:
+                    hedge_stats["primary_wins" if task is primary_task else "secondary_wins"] += 1
+                    return task.result()
+                last_error = task.exception()
+
+            if secondary_task is None:
+                start_secondary()
+
+        raise last_error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -2,35 +2,96 @@
 ChefMentor X – AI Service with Groq Fallback
 
 Multi-tier AI fallback:
-1. Gemini 2.5 Flash (primary)
-2. Groq Llama 3 (fallback)
-3. Cached/static response (last resort)
+1. The task's routed models, in order (ai_routing.py) – e.g. Llama 3.1 8B
+   then Gemini Flash-Lite for voice intents, Gemini 2.5 Flash then Groq
+   Llama 3.3 70B for recipes and safety
+2. Cached/static response (last resort)
+
+Latency-critical calls can be hedged: the second route starts in parallel
+once the first runs past its observed latency percentile, and the first
+valid answer wins.
 """
 
-import google.generativeai as genai
-from groq import Groq
 from app.core.config import settings
-import asyncio
+from app.schemas.ai import SafetyVerdict, StepEnrichment, StepFAQ, VoiceIntent
+from app.services.ai_batcher import MicroBatcher
+from app.services.answer_cache import chat_answer_cache, chat_scope
+from app.services.ai_cache import guidance_cache, normalize_text
+from app.services.ai_hedging import hedged, hedge_delay
+from app.services.ai_providers import AIClientRegistry, get_registry
+from app.services.ai_routing import get_routes, primary_model, route_stats, run_route, stream_route
+from app.services.ai_singleflight import SingleFlight, prompt_key
+from app.services.chat_context import compact_messages
+from app.services.intent_classifier import classify_intent, intent_stats
+from app.services.safety_rules import prefilter_safety
+from app.services.structured_output import parse_json
 from functools import partial
-import json
+from typing import AsyncIterator, Optional
+
+CHAT_FALLBACK = "I'm having trouble connecting to the chef brain right now. Please try again."
+
+
+class ChatStreamInterrupted(Exception):
+    """Raised when a chat stream breaks after part of the answer was already yielded."""
+
+    def __init__(self, model: str):
+        super().__init__(f"Chat stream from '{model}' ended early")
+        self.model = model
+
+
+# Coalesces identical in-flight prompts across sessions and workers
+mentor_flight = SingleFlight("mentor")
+
+# Distinct guidance prompts arriving together share one provider call
+guidance_batcher = MicroBatcher(
+    "guidance",
+    max_items=settings.AI_BATCH_MAX_ITEMS,
+    max_wait_seconds=settings.AI_BATCH_WINDOW_MS / 1000,
+)
 
 
 class AIMentorService:
-    def __init__(self):
-        # Initialize Gemini (primary)
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.gemini = genai.GenerativeModel('gemini-2.5-flash')
-        
-        # Initialize Groq (fallback)
-        self.groq = Groq(api_key=settings.GROQ_API_KEY)
+    def __init__(self, registry: AIClientRegistry = None):
+        # Shared, app-scoped clients – nothing is built per request
+        registry = registry or get_registry()
+        self.gemini = registry.gemini
+        self.groq = registry.groq
+        # Which model each task tries, in what order: see ai_routing.py
+        self.providers = {"gemini": self.gemini, "groq": self.groq}
 
     # ── Step Guidance ──────────────────────────────────
 
-    async def get_step_guidance(self, step_instruction: str) -> str:
+    async def get_step_guidance(self, step_instruction: str, hedge: bool = False) -> str:
         """
         Generates a short, helpful mentoring tip for the cooking step.
-        Falls back through: Gemini → Groq → static.
+        Served from the shared guidance cache when possible, otherwise
+        falls back through: routed models → static.
+        hedge=True for callers where the user is actively waiting.
         """
+        cache_key = guidance_cache.make_key(primary_model("guidance"), step_instruction)
+        cached = await guidance_cache.get(cache_key)
+        if cached:
+            return cached
+
+        return await mentor_flight.do(
+            cache_key,
+            partial(self._generate_step_guidance, step_instruction, cache_key, hedge),
+        )
+
+    async def _generate_step_guidance(self, step_instruction: str, cache_key: str, hedge: bool) -> str:
+        # Routed tiers, batched with other sessions' steps when enabled
+        if settings.AI_BATCH_ENABLED:
+            tip = await guidance_batcher.submit(cache_key, (step_instruction, hedge), self._guidance_batch)
+        else:
+            tip = await self._guidance_tip(step_instruction, hedge)
+        if tip:
+            await guidance_cache.set(cache_key, tip)
+            return tip
+
+        # Tier 3: Static fallback
+        return "Keep going, you're doing great! Trust the process."
+
+    async def _guidance_tip(self, step_instruction: str, hedge: bool) -> Optional[str]:
         prompt = f"""You are a professional chef mentor. 
 The user is on this step: "{step_instruction}".
 
@@ -38,36 +99,104 @@ Give one short, encouraging tip (max 20 words) to help them succeed at this spec
 Focus on technique or sensory cues (smell, look).
 Do not repeat the instruction."""
 
-        # Tier 1: Gemini
-        try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                partial(self.gemini.generate_content, prompt)
-            )
-            return response.text.strip()
-        except Exception as e:
-            print(f"⚠️ Gemini failed: {e}")
-
-        # Tier 2: Groq (Llama 3)
-        try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                partial(
-                    self.groq.chat.completions.create,
-                    model="llama-3.3-70b-versatile",
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=50,
-                    temperature=0.7,
-                )
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            print(f"⚠️ Groq fallback failed: {e}")
+        return await self._run_tiers(
+            "guidance", prompt, parse=self._parse_tip, hedge=hedge, max_tokens=50, temperature=0.7,
+        )
 
-        # Tier 3: Static fallback
-        return "Keep going, you're doing great! Trust the process."
+    async def _guidance_batch(self, items: list[tuple[str, bool]]) -> list[Optional[str]]:
+        """
+        One call for every step collected by guidance_batcher. Hedged if any
+        caller is waiting at the stove. None per item when both tiers fail.
+        """
+        hedge = any(item_hedge for _, item_hedge in items)
+        if len(items) == 1:
+            return [await self._guidance_tip(items[0][0], hedge)]
+
+        numbered = "\n".join(f"{i}. {instruction}" for i, (instruction, _) in enumerate(items, 1))
+        prompt = f"""You are a professional chef mentor. Several cooks are each on one of these steps:
+
+{numbered}
+
+For each step, give one short, encouraging tip (max 20 words) to help that cook succeed.
+Focus on technique or sensory cues (smell, look). Do not repeat the instruction.
+
+Return ONLY a JSON array of {len(items)} strings, one tip per step, in order.
+No explanation, just JSON."""
+
+        def parse(text: str) -> list[str]:
+            tips = parse_json(text, list[str])
+            if len(tips) != len(items) or not all(tip.strip() for tip in tips):
+                raise ValueError(f"expected {len(items)} tips")
+            return [tip.strip() for tip in tips]
+
+        tips = await self._run_tiers(
+            "guidance_batch", prompt, parse=parse, hedge=hedge, max_tokens=60 * len(items), temperature=0.7,
+        )
+        return tips or [None] * len(items)
+
+    async def enrich_recipe_steps(self, recipe_title: str, instructions: list[str]) -> Optional[list[dict]]:
+        """
+        Tip, food safety verdict and timer data for every step of a recipe in
+        a single call, for storing on RecipeStep at ingest time. Returns
+        [{"tip", "safe", "warnings", "timer_required"[, "duration_minutes"]}, ...]
+        in step order, or None when every route fails (nothing is stored, so
+        it's retried later).
+        """
+        numbered = "\n".join(f"{i}. {instruction}" for i, instruction in enumerate(instructions, 1))
+        prompt = f"""You are a professional chef mentor and food safety expert. For each step of "{recipe_title}" below give:
+- tip: one short, encouraging tip (max 20 words) to help the cook succeed at that step.
+  Focus on technique or sensory cues (smell, look). Do not repeat the instruction.
+- safe / warnings: only flag genuine dangers (undercooked meat, cross-contamination, allergens).
+- duration_minutes: how long the step takes if it states or clearly implies a time, else null.
+- timer_required: true if the cook should set a timer for this step.
+
+{numbered}
+
+Return ONLY a JSON array of {len(instructions)} objects, one per step, in order:
+[{{"tip": "...", "safe": true, "warnings": [], "duration_minutes": 10, "timer_required": true}}, ...]
+No explanation, just JSON."""
+
+        def parse(text: str) -> list[dict]:
+            results = parse_json(text, list[StepEnrichment])
+            if len(results) != len(instructions) or not all(result["tip"].strip() for result in results):
+                raise ValueError(f"expected {len(instructions)} step enrichments")
+            return [{**result, "tip": result["tip"].strip()} for result in results]
+
+        return await self._run_tiers(
+            "step_enrichment", prompt, parse=parse, max_tokens=100 * len(instructions), temperature=0.3,
+        )
+
+    async def generate_step_faqs(
+        self, recipe_title: str, instructions: list[str], per_step: int,
+    ) -> Optional[list[list[dict]]]:
+        """
+        The questions cooks most often ask on each step, with short answers,
+        for answering mentor chat locally. Returns one [{"question", "answer"}]
+        list per step in step order, or None when every route fails.
+        """
+        numbered = "\n".join(f"{i}. {instruction}" for i, instruction in enumerate(instructions, 1))
+        prompt = f"""You are a professional chef mentor. Home cooks making "{recipe_title}" ask you questions while on each step below.
+For every step, list the {per_step} questions they most often ask (substitutions, doneness cues, timing, fixing mistakes)
+with an answer of at most 2 short sentences each. Answer as you would in chat: friendly and specific to that step.
+
+{numbered}
+
+Return ONLY a JSON array of {len(instructions)} objects, one per step, in order:
+[{{"questions": [{{"question": "...", "answer": "..."}}]}}, ...]
+No explanation, just JSON."""
+
+        def parse(text: str) -> list[list[dict]]:
+            results = parse_json(text, list[StepFAQ])
+            if len(results) != len(instructions):
+                raise ValueError(f"expected FAQs for {len(instructions)} steps")
+            return [
+                [pair for pair in result["questions"] if pair["question"].strip() and pair["answer"].strip()]
+                for result in results
+            ]
+
+        return await self._run_tiers(
+            "step_faq", prompt, parse=parse, max_tokens=80 * per_step * len(instructions), temperature=0.5,
+        )
 
     # ── Chat with Mentor ───────────────────────────────
 
@@ -77,7 +206,85 @@ Do not repeat the instruction."""
         messages: [{"role": "user", "content": "..."}, ...]
         context: {"recipe_name": "...", "current_step": 1, "instruction": "..."}
         """
-        system_prompt = f"""You are a professional, encouraging chef mentor helping a user cook "{context.get('recipe_name', 'a recipe')}".
+        cache_key = self._similar_cache_key(messages, context)
+        if cache_key and (cached := chat_answer_cache.lookup(*cache_key)):
+            return cached
+
+        messages, system_prompt = await self._compact_context(messages, self._chat_system_prompt(context))
+
+        for route in get_routes("chat"):
+            provider = self.providers[route.provider]
+            try:
+                response_text = await run_route("chat", route, partial(
+                    provider.chat,
+                    messages,
+                    system_prompt=system_prompt,
+                    max_tokens=route.max_tokens,
+                    temperature=0.7,
+                    model=route.model,
+                ))
+                answer = response_text.strip()
+                if cache_key:
+                    chat_answer_cache.store(*cache_key, answer)
+                return answer
+            except Exception as e:
+                print(f"⚠️ {route.model} chat failed: {e}")
+
+        return CHAT_FALLBACK
+
+    async def chat_with_mentor_stream(self, messages: list[dict], context: dict) -> AsyncIterator[str]:
+        """
+        Streaming variant of chat_with_mentor: yields text chunks as they are
+        generated so the first words reach the cook in a few hundred ms.
+        Falls back to the next route only if one fails or ends before producing
+        any text – once the user has seen a partial answer we can't restart it,
+        so ChatStreamInterrupted is raised to tell the caller it was cut off.
+        """
+        cache_key = self._similar_cache_key(messages, context)
+        if cache_key and (cached := chat_answer_cache.lookup(*cache_key)):
+            yield cached
+            return
+
+        messages, system_prompt = await self._compact_context(messages, self._chat_system_prompt(context))
+
+        for route in get_routes("chat"):
+            provider = self.providers[route.provider]
+            stream = partial(
+                provider.chat_stream,
+                messages,
+                system_prompt=system_prompt,
+                max_tokens=route.max_tokens,
+                temperature=0.7,
+                model=route.model,
+            )
+            chunks = []
+            try:
+                async for chunk in stream_route("chat", route, stream):
+                    chunks.append(chunk)
+                    yield chunk
+                if not chunks:
+                    # Finished without a word (e.g. a blocked or empty candidate)
+                    print(f"⚠️ {route.model} chat stream ended empty")
+                    continue
+                if cache_key:
+                    chat_answer_cache.store(*cache_key, "".join(chunks).strip())
+                return
+            except Exception as e:
+                print(f"⚠️ {route.model} chat stream failed: {e}")
+                if chunks:
+                    raise ChatStreamInterrupted(route.model) from e
+
+        yield CHAT_FALLBACK
+
+    def _similar_cache_key(self, messages: list[dict], context: dict) -> Optional[tuple[tuple, str]]:
+        """(step scope, question) for chat_answer_cache, when the latest turn is a question on a known step."""
+        if not settings.CHAT_SIMILAR_CACHE_ENABLED or not messages or messages[-1].get("role") != "user":
+            return None
+        scope = chat_scope(context)
+        return (scope, messages[-1]["content"]) if scope else None
+
+    def _chat_system_prompt(self, context: dict) -> str:
+        return f"""You are a professional, encouraging chef mentor helping a user cook "{context.get('recipe_name', 'a recipe')}".
 The user is currently on Step {context.get('current_step', '?')}: "{context.get('step_instruction', '')}".
 
 Your goal is to answer their specific questions, offer substitutions, or troubleshoot issues.
@@ -85,65 +292,48 @@ Keep answers concise (under 3 sentences) unless asked for details.
 Be friendly and supportive.
 """
 
-        # Format history for Gemini
-        # Gemini expects: contents=[{'role': 'user', 'parts': ['...']}, ...]
-        gemini_history = []
-        for msg in messages:
-            role = 'user' if msg['role'] == 'user' else 'model'
-            gemini_history.append({'role': role, 'parts': [msg['content']]})
-
-        # Add system prompt as the first part of context for Gemini (or rely on system instruction if supported, 
-        # but 2.5 Flash supports system instructions via config. For simplicity, we prepend to first user msg or handle via logic)
-        # We'll use a fresh chat session with system instruction.
-
-        try:
-            # Tier 1: Gemini
-            loop = asyncio.get_event_loop()
-            
-            def run_gemini():
-                model = genai.GenerativeModel(
-                    'gemini-2.5-flash',
-                    system_instruction=system_prompt
-                )
-                chat = model.start_chat(history=gemini_history[:-1] if len(gemini_history) > 1 else [])
-                response = chat.send_message(gemini_history[-1]['parts'][0])
-                return response.text
-
-            response_text = await loop.run_in_executor(None, run_gemini)
-            return response_text.strip()
-            
-        except Exception as e:
-            print(f"⚠️ Gemini chat failed: {e}")
-
-        # Tier 2: Groq Fallback
-        try:
-            # Format for Llama 3
-            groq_messages = [{"role": "system", "content": system_prompt}] + messages
-            
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                partial(
-                    self.groq.chat.completions.create,
-                    model="llama-3.3-70b-versatile",
-                    messages=groq_messages,
-                    max_tokens=150,
-                    temperature=0.7,
-                )
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            print(f"⚠️ Groq chat failed: {e}")
-
-        return "I'm having trouble connecting to the chef brain right now. Please try again."
+    async def _compact_context(self, messages: list[dict], system_prompt: str) -> tuple[list[dict], str]:
+        """
+        Keeps the chat inside CHAT_CONTEXT_MAX_TOKENS: recent turns verbatim,
+        older ones folded into a cached rolling summary on the system prompt.
+        """
+        messages, summary = await compact_messages(messages, system_prompt, self._summarize_turns)
+        if summary:
+            system_prompt += f"\nSummary of the earlier conversation:\n{summary}\n"
+        return messages, system_prompt
+
+    async def _summarize_turns(self, previous_summary: Optional[str], turns: list[dict]) -> Optional[str]:
+        transcript = "\n".join(f"{msg['role'].upper()}: {msg['content']}" for msg in turns)
+        earlier = f"Summary so far:\n{previous_summary}\n\n" if previous_summary else ""
+        prompt = f"""You are condensing a cooking mentor chat so it can continue with less context.
+{earlier}New messages:
+{transcript}
+
+Write an updated summary (max 120 words) of everything above: what the user is cooking,
+problems they hit, substitutions or decisions made, and open questions.
+Plain text only."""
+
+        return await self._run_tiers(
+            "chat_summary", prompt, parse=self._parse_tip, max_tokens=250, temperature=0.2,
+        )
 
     # ── Voice Intent Parsing ───────────────────────────
 
     async def parse_voice_intent(self, text: str) -> dict:
         """
         Classifies voice command into structured intent.
-        Falls back through: Gemini → Groq → regex.
+        The local grammar answers confident matches without a network call;
+        everything else falls back through: routed models → local best guess.
         """
+        local = classify_intent(text)
+        if local["confidence"] >= settings.VOICE_INTENT_CONFIDENCE_THRESHOLD:
+            intent_stats["local"] += 1
+            return local
+
+        key = prompt_key("intent", primary_model("intent"), normalize_text(text))
+        return await mentor_flight.do(key, partial(self._classify_intent, text, local))
+
+    async def _classify_intent(self, text: str, local: dict) -> dict:
         prompt = f"""
 User said: "{text}"
 
@@ -166,38 +356,25 @@ or
 No explanation, just JSON.
 """
 
-        # Tier 1: Gemini
-        try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                partial(self.gemini.generate_content, prompt)
-            )
-            result_text = self._clean_json(response.text)
-            return json.loads(result_text)
-        except Exception as e:
-            print(f"⚠️ Gemini intent parse failed: {e}")
-
-        # Tier 2: Groq
-        try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                partial(
-                    self.groq.chat.completions.create,
-                    model="llama-3.3-70b-versatile",
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=100,
-                    temperature=0.0,
-                )
-            )
-            result_text = self._clean_json(response.choices[0].message.content)
-            return json.loads(result_text)
-        except Exception as e:
-            print(f"⚠️ Groq intent parse failed: {e}")
-
-        # Tier 3: Regex fallback
-        return self._regex_intent(text)
+        # Routed tiers, always hedged – someone is at the stove
+        result = await self._run_tiers(
+            "intent",
+            prompt,
+            parse=lambda text: parse_json(text, VoiceIntent),
+            hedge=True,
+            max_tokens=100,
+            temperature=0.0,
+            json_mode=True,
+        )
+        if result is not None:
+            intent_stats["llm"] += 1
+            return result
+
+        # Tier 3: the local classifier's low-confidence guess
+        intent_stats["fallback"] += 1
+        if local["intent"] == "UNKNOWN":
+            return {**local, "error": "Could not determine intent"}
+        return local
 
     # ── Food Safety Validation ─────────────────────────
 
@@ -205,7 +382,17 @@ No explanation, just JSON.
         """
         Checks cooking instruction for food safety concerns.
         Returns {"safe": bool, "warnings": [str]}
+        Clear-cut instructions are settled by the local rules; only
+        ambiguous ones reach the LLM.
         """
+        verdict = prefilter_safety(instruction)
+        if verdict is not None:
+            return verdict
+
+        key = prompt_key("safety", primary_model("safety"), normalize_text(instruction))
+        return await mentor_flight.do(key, partial(self._check_food_safety, instruction))
+
+    async def _check_food_safety(self, instruction: str) -> dict:
         prompt = f"""You are a food safety expert. Check this cooking instruction for safety:
 "{instruction}"
 
@@ -214,54 +401,68 @@ If safe, return: {{"safe": true, "warnings": []}}
 Only flag genuine dangers (undercooked meat, cross-contamination, allergens).
 JSON only, no explanation."""
 
-        try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                partial(self.gemini.generate_content, prompt)
-            )
-            result_text = self._clean_json(response.text)
-            return json.loads(result_text)
-        except Exception as e:
-            print(f"Food safety check error: {e}")
-            return {"safe": True, "warnings": []}
+        verdict = await self._run_tiers(
+            "safety",
+            prompt,
+            parse=lambda text: parse_json(text, SafetyVerdict),
+            temperature=0.0,
+            json_mode=True,
+        )
+        return verdict or {"safe": True, "warnings": []}
 
     # ── Helpers ────────────────────────────────────────
 
-    def _clean_json(self, text: str) -> str:
-        """Remove markdown code blocks from response."""
-        text = text.strip()
-        if text.startswith("```"):
-            text = text.split("```")[1]
-            if text.startswith("json"):
-                text = text[4:]
-        return text.strip()
-
-    def _regex_intent(self, text: str) -> dict:
-        """Simple regex-based intent parsing as last resort."""
-        import re
-        lower = text.lower().strip()
-
-        if re.match(r'^(next|go next|next step)', lower):
-            return {"intent": "NEXT"}
-        if re.match(r'^(back|previous|prev|go back)', lower):
-            return {"intent": "PREV"}
-        if re.match(r'^(repeat|again|say that again)', lower):
-            return {"intent": "REPEAT"}
-        if re.match(r'^(pause|stop|wait)', lower):
-            return {"intent": "PAUSE"}
-        if re.match(r'^(resume|continue|go)', lower):
-            return {"intent": "RESUME"}
-        if re.match(r'^(help|commands|what can)', lower):
-            return {"intent": "HELP"}
-
-        timer_match = re.search(r'(\d+)\s*(min|sec|minute|second)', lower)
-        if timer_match or 'timer' in lower:
-            if timer_match:
-                val = int(timer_match.group(1))
-                unit = timer_match.group(2)
-                secs = val * 60 if unit.startswith('min') else val
-                return {"intent": "TIMER", "duration_seconds": secs}
-            return {"intent": "TIMER", "duration_seconds": 300}
-
-        return {"intent": "UNKNOWN", "error": "Could not determine intent"}
+    async def _run_tiers(
+        self,
+        task: str,
+        prompt: str,
+        parse,
+        hedge: bool = False,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+    ):
+        """
+        Tries the task's routes in order (see ai_routing.py). Returns
+        parse(response) from the first route whose answer parses, or None when
+        all fail. With hedge=True, the second route starts in parallel once the
+        first runs past its observed latency percentile.
+        """
+        routes = get_routes(task)
+
+        async def attempt(route):
+            provider = self.providers[route.provider]
+            return parse(await run_route(task, route, partial(
+                provider.generate,
+                prompt,
+                max_tokens=route.cap(max_tokens),
+                temperature=temperature,
+                json_mode=json_mode,
+                model=route.model,
+            )))
+
+        if hedge and settings.AI_HEDGING_ENABLED and len(routes) > 1:
+            try:
+                return await hedged(
+                    partial(attempt, routes[0]),
+                    partial(attempt, routes[1]),
+                    delay=hedge_delay(route_stats(task, routes[0])),
+                )
+            except Exception as e:
+                print(f"⚠️ Hedged {task} failed: {e}")
+            routes = routes[2:]
+
+        for route in routes:
+            try:
+                return await attempt(route)
+            except Exception as e:
+                print(f"⚠️ {route.model} {task} failed: {e}")
+
+        return None
+
+    def _parse_tip(self, text: str) -> str:
+        tip = text.strip()
+        if not tip:
+            raise ValueError("empty guidance")
+        return tip
+
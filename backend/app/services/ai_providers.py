@@ -0,0 +1,283 @@
+"""
+ChefMentor X – AI Provider Clients
+
+Thin wrappers over each provider SDK's native async API:
+1. Gemini – generate_content_async / send_message_async (grpc.aio)
+2. Groq   – AsyncGroq over one pooled httpx.AsyncClient
+
+Nothing here touches the default thread pool, so concurrent LLM calls are
+bounded by sockets rather than threads and no longer queue Cloudinary
+uploads, gTTS or other blocking work behind them.
+
+Clients are built once per process by AIClientRegistry (created in the
+app lifespan, injected with the get_ai_registry dependency) so requests
+never pay for client construction or fresh TLS handshakes.
+
+Every call runs under the provider's circuit breaker: while a provider is
+open, calls raise CircuitOpenError immediately and callers fall through
+to their next tier without paying the failure latency. Calls also need
+a slot from the provider's admission controller; when its queue is full
+or the wait budget runs out they raise AdmissionRejected, which callers
+treat like any other provider failure.
+
+With AI_BACKEND=simulated or replay the registry hands out offline
+providers instead, and with record it wraps the live ones so their
+responses can be replayed later (see ai_backends.py).
+"""
+
+from typing import AsyncIterator, Optional
+
+import google.generativeai as genai
+import httpx
+from groq import AsyncGroq
+
+from app.core.config import settings
+from app.services.admission import get_admission
+from app.services.ai_backends import RECORD, OfflineProvider, RecordingProvider, backend_mode, is_offline
+from app.services.ai_routing import GEMINI_MODEL, GROQ_MODEL
+from app.services.circuit_breaker import get_breaker
+
+_gemini_configured = False
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def configure_gemini() -> None:
+    """genai.configure() drops the SDK's cached clients, so only call it once."""
+    global _gemini_configured
+    if not _gemini_configured:
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+        _gemini_configured = True
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Pooled keep-alive HTTP client shared by Groq and image downloads."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+        )
+    return _http_client
+
+
+async def close_providers() -> None:
+    """Close pooled connections. Call this on application shutdown."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def _gemini_config(max_tokens: Optional[int], temperature: Optional[float]) -> Optional[dict]:
+    config = {}
+    if max_tokens is not None:
+        config["max_output_tokens"] = max_tokens
+    if temperature is not None:
+        config["temperature"] = temperature
+    return config or None
+
+
+class GeminiProvider:
+    name = "gemini"
+
+    def __init__(self, model_name: str = GEMINI_MODEL):
+        configure_gemini()
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        self._models = {model_name: self.model}
+
+    @property
+    def breaker(self):
+        return get_breaker(self.name)
+
+    @property
+    def admission(self):
+        return get_admission(self.name)
+
+    async def generate(
+        self,
+        contents,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        model: Optional[str] = None,
+    ) -> str:
+        """
+        contents: a prompt string, or [prompt, PIL.Image] for vision.
+        model: overrides the default model for this call (see ai_routing.py).
+        json_mode is accepted for interface parity; the pinned SDK has no
+        response_mime_type, so JSON answers rely on structured_output parsing.
+        """
+        async with self.admission.slot(), self.breaker.guard():
+            response = await self._model(model).generate_content_async(
+                contents,
+                generation_config=_gemini_config(max_tokens, temperature),
+            )
+            return response.text
+
+    async def chat(
+        self,
+        messages: list[dict],
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        model: Optional[str] = None,
+    ) -> str:
+        """messages: [{"role": "user"|"assistant", "content": "..."}, ...]"""
+        chat, last_message = self._start_chat(messages, system_prompt, model)
+        async with self.admission.slot(), self.breaker.guard():
+            response = await chat.send_message_async(
+                last_message,
+                generation_config=_gemini_config(max_tokens, temperature),
+            )
+            return response.text
+
+    async def chat_stream(
+        self,
+        messages: list[dict],
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        model: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """Like chat(), but yields text chunks as Gemini produces them."""
+        chat, last_message = self._start_chat(messages, system_prompt, model)
+        async with self.admission.slot(), self.breaker.guard():
+            response = await chat.send_message_async(
+                last_message,
+                generation_config=_gemini_config(max_tokens, temperature),
+                stream=True,
+            )
+            async for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+
+    def _model(self, model: Optional[str]):
+        """GenerativeModel per model name, built once."""
+        model = model or self.model_name
+        if model not in self._models:
+            self._models[model] = genai.GenerativeModel(model)
+        return self._models[model]
+
+    def _start_chat(self, messages: list[dict], system_prompt: Optional[str], model: Optional[str] = None):
+        """
+        The pinned SDK has no system_instruction, so the system prompt is
+        sent as an opening user turn acknowledged by the model.
+        """
+        history = []
+        if system_prompt:
+            history.append({'role': 'user', 'parts': [system_prompt]})
+            history.append({'role': 'model', 'parts': ["Understood."]})
+        for msg in messages:
+            role = 'user' if msg['role'] == 'user' else 'model'
+            history.append({'role': role, 'parts': [msg['content']]})
+
+        return self._model(model).start_chat(history=history[:-1]), history[-1]['parts'][0]
+
+
+class GroqProvider:
+    name = "groq"
+
+    def __init__(self, model_name: str = GROQ_MODEL):
+        self.model_name = model_name
+        self.client = AsyncGroq(api_key=settings.GROQ_API_KEY, http_client=get_http_client())
+
+    @property
+    def breaker(self):
+        return get_breaker(self.name)
+
+    @property
+    def admission(self):
+        return get_admission(self.name)
+
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        model: Optional[str] = None,
+    ) -> str:
+        return await self.chat(
+            [{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            json_mode=json_mode,
+            model=model,
+        )
+
+    async def chat(
+        self,
+        messages: list[dict],
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        model: Optional[str] = None,
+    ) -> str:
+        """json_mode: Groq guarantees a syntactically valid JSON object back."""
+        async with self.admission.slot(), self.breaker.guard():
+            response = await self.client.chat.completions.create(
+                **self._request(messages, system_prompt, max_tokens, temperature, json_mode, model),
+            )
+            return response.choices[0].message.content
+
+    async def chat_stream(
+        self,
+        messages: list[dict],
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        model: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """Like chat(), but yields text deltas as Groq produces them."""
+        async with self.admission.slot(), self.breaker.guard():
+            stream = await self.client.chat.completions.create(
+                **self._request(messages, system_prompt, max_tokens, temperature, model=model),
+                stream=True,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    def _request(self, messages, system_prompt, max_tokens, temperature, json_mode: bool = False, model: Optional[str] = None) -> dict:
+        if system_prompt:
+            messages = [{"role": "system", "content": system_prompt}] + messages
+        request = {"model": model or self.model_name, "messages": messages}
+        if max_tokens is not None:
+            request["max_tokens"] = max_tokens
+        if temperature is not None:
+            request["temperature"] = temperature
+        if json_mode:
+            request["response_format"] = {"type": "json_object"}
+        return request
+
+
+class AIClientRegistry:
+    """Provider clients shared by every request and background task."""
+
+    def __init__(self):
+        if is_offline():
+            self.gemini = OfflineProvider("gemini", GEMINI_MODEL)
+            self.groq = OfflineProvider("groq", GROQ_MODEL)
+            return
+
+        self.gemini = GeminiProvider()
+        self.groq = GroqProvider()
+        if backend_mode() == RECORD:
+            self.gemini = RecordingProvider(self.gemini)
+            self.groq = RecordingProvider(self.groq)
+
+    async def aclose(self) -> None:
+        await close_providers()
+
+
+_registry: Optional[AIClientRegistry] = None
+
+
+def get_registry() -> AIClientRegistry:
+    """Process-wide registry, created on first use."""
+    global _registry
+    if _registry is None:
+        _registry = AIClientRegistry()
+    return _registry
@@ -0,0 +1,222 @@
+"""
+ChefMentor X – Task-aware Model Routing
+
+Every AI task has its own ordered list of models to try, each with a
+timeout and a max-token cap, instead of one Gemini → Groq pair for
+everything:
+
+- Latency-critical, tiny outputs (voice intents, 20-word tips) go to the
+  smallest, fastest models first
+- Long or judgement-heavy outputs (recipes, safety, diagnosis) keep the
+  larger models
+
+DEFAULT_ROUTES is the baseline; AI_ROUTES (JSON) replaces the list for
+any task per environment, e.g.
+
+    AI_ROUTES={"intent": [{"provider": "groq", "model": "llama-3.1-8b-instant",
+                           "timeout_ms": 1500, "max_tokens": 60}]}
+
+Latency, failures and timeouts are tracked per task and model and shown
+at GET /health/ai.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, NamedTuple, Optional
+
+from app.core.config import settings
+from app.services.circuit_breaker import call_deadline
+
+GEMINI_MODEL = "gemini-2.5-flash"
+GEMINI_LITE_MODEL = "gemini-2.5-flash-lite"
+GROQ_MODEL = "llama-3.3-70b-versatile"
+GROQ_FAST_MODEL = "llama-3.1-8b-instant"
+
+LATENCY_WINDOW = 200
+
+
+class Route(NamedTuple):
+    provider: str  # "gemini" | "groq"
+    model: str
+    timeout_ms: int
+    max_tokens: Optional[int] = None
+
+    def cap(self, max_tokens: Optional[int]) -> Optional[int]:
+        """The caller's token budget, never above this route's cap."""
+        if max_tokens is None or self.max_tokens is None:
+            return max_tokens or self.max_tokens
+        return min(max_tokens, self.max_tokens)
+
+
+# 2.5 Flash spends output tokens on thinking, so its routes aren't capped
+DEFAULT_ROUTES: dict[str, list[Route]] = {
+    "intent": [
+        Route("groq", GROQ_FAST_MODEL, 2000, 60),
+        Route("gemini", GEMINI_LITE_MODEL, 2500, 60),
+    ],
+    "guidance": [
+        Route("gemini", GEMINI_LITE_MODEL, 4000, 80),
+        Route("groq", GROQ_FAST_MODEL, 3000, 80),
+    ],
+    "guidance_batch": [
+        Route("gemini", GEMINI_LITE_MODEL, 8000, 1200),
+        Route("groq", GROQ_FAST_MODEL, 6000, 1200),
+    ],
+    "chat": [
+        Route("gemini", GEMINI_MODEL, 15000),
+        Route("groq", GROQ_MODEL, 10000, 150),
+    ],
+    "chat_summary": [
+        Route("gemini", GEMINI_LITE_MODEL, 8000, 250),
+        Route("groq", GROQ_FAST_MODEL, 6000, 250),
+    ],
+    "step_enrichment": [
+        Route("gemini", GEMINI_MODEL, 30000),
+        Route("groq", GROQ_MODEL, 20000, 4096),
+    ],
+    "step_faq": [
+        Route("gemini", GEMINI_MODEL, 45000),
+        Route("groq", GROQ_MODEL, 30000, 8000),
+    ],
+    "safety": [
+        Route("gemini", GEMINI_MODEL, 10000),
+        Route("groq", GROQ_MODEL, 8000, 200),
+    ],
+    "diagnosis": [
+        Route("gemini", GEMINI_MODEL, 30000),
+        Route("groq", GROQ_MODEL, 15000, 500),
+    ],
+    "recipe": [
+        Route("gemini", GEMINI_MODEL, 45000),
+        Route("groq", GROQ_MODEL, 30000, 2048),
+    ],
+}
+
+
+def get_routes(task: str) -> list[Route]:
+    override = settings.AI_ROUTES.get(task)
+    if override:
+        return [Route(**route) for route in override]
+    return DEFAULT_ROUTES[task]
+
+
+def primary_model(task: str) -> str:
+    """Model of the task's first route – what cache keys are scoped to."""
+    return get_routes(task)[0].model
+
+
+class RouteStats:
+    """
+    Rolling latency window plus counters for one (task, model). Timed-out
+    and cancelled attempts (hedge losers) go in as censored samples: the
+    elapsed time is a lower bound on their latency. Leaving them out would
+    keep only the fast calls, so the hedge delay would keep shrinking.
+    """
+
+    def __init__(self):
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.cancelled = 0
+
+    def record(self, latency: float) -> None:
+        self._latencies.append(latency)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """Seconds; same shape as CircuitBreaker.latency_percentile so hedge_delay() accepts it."""
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(int(len(ordered) * percentile), len(ordered) - 1)]
+
+    def snapshot(self) -> dict:
+        p50 = self.latency_percentile(0.5)
+        p95 = self.latency_percentile(0.95)
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "latency_p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "latency_p95_ms": round(p95 * 1000) if p95 is not None else None,
+        }
+
+
+_stats: dict[tuple[str, str], RouteStats] = {}
+
+
+def route_stats(task: str, route: Route) -> RouteStats:
+    key = (task, route.model)
+    if key not in _stats:
+        _stats[key] = RouteStats()
+    return _stats[key]
+
+
+async def run_route(task: str, route: Route, call: Callable[[], Awaitable[str]]) -> str:
+    """
+    One attempt on one route, under its timeout, with its latency recorded.
+    A timeout also counts against the provider's circuit breaker.
+    """
+    stats = route_stats(task, route)
+    stats.calls += 1
+    start = time.monotonic()
+    timeout = route.timeout_ms / 1000
+    try:
+        with call_deadline(timeout):
+            result = await asyncio.wait_for(call(), timeout)
+    except asyncio.TimeoutError:
+        stats.timeouts += 1
+        stats.record(time.monotonic() - start)
+        raise
+    except asyncio.CancelledError:
+        stats.cancelled += 1
+        stats.record(time.monotonic() - start)
+        raise
+    except Exception:
+        stats.failures += 1
+        raise
+    stats.record(time.monotonic() - start)
+    return result
+
+
+async def stream_route(task: str, route: Route, stream: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+    """
+    Like run_route() for streams: the timeout applies to the first chunk and
+    the recorded latency is time to first chunk.
+    """
+    stats = route_stats(task, route)
+    stats.calls += 1
+    start = time.monotonic()
+    chunks = stream()
+    timeout = route.timeout_ms / 1000
+    try:
+        with call_deadline(timeout):
+            first = await asyncio.wait_for(chunks.__anext__(), timeout)
+    except StopAsyncIteration:
+        stats.record(time.monotonic() - start)
+        return
+    except asyncio.TimeoutError:
+        stats.timeouts += 1
+        stats.record(time.monotonic() - start)
+        await chunks.aclose()
+        raise
+    except asyncio.CancelledError:
+        stats.cancelled += 1
+        stats.record(time.monotonic() - start)
+        raise
+    except Exception:
+        stats.failures += 1
+        raise
+    stats.record(time.monotonic() - start)
+    yield first
+    async for chunk in chunks:
+        yield chunk
+
+
+def routing_snapshot() -> dict:
+    snapshot: dict[str, dict] = {}
+    for (task, model), stats in sorted(_stats.items()):
+        snapshot.setdefault(task, {})[model] = stats.snapshot()
+    return snapshot
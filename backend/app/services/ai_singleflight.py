@@ -0,0 +1,136 @@
+"""
+ChefMentor X – Single-flight Coalescing for AI Calls
+
+Concurrent callers with the same prompt key await one provider call:
+1. Within a process: every caller awaits one shared task through
+   asyncio.shield, so a caller that goes away (client disconnect, hedge
+   loser) only detaches itself; the call is cancelled only once nobody
+   is waiting for it
+2. Across uvicorn workers: the leader holds a short-lived Redis lock and
+   publishes its result; other workers poll for it instead of calling out
+
+If Redis is unavailable, or the remote leader dies, callers simply make
+the call themselves – coalescing is an optimisation, never a dependency.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from functools import partial
+from typing import Any, Awaitable, Callable
+
+from app.core.redis import get_redis, mark_redis_failed
+
+# Compare-and-delete so a leader never releases a lock it no longer owns
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def prompt_key(*parts: str) -> str:
+    """Stable hash for a prompt and whatever else determines its answer."""
+    return hashlib.sha256("\x00".join(parts).encode()).hexdigest()
+
+
+class SingleFlight:
+    def __init__(
+        self,
+        namespace: str,
+        lock_ttl_ms: int = 15000,
+        result_ttl_ms: int = 5000,
+        poll_interval: float = 0.05,
+    ):
+        self.namespace = namespace
+        self.lock_ttl_ms = lock_ttl_ms
+        self.result_ttl_ms = result_ttl_ms
+        self.poll_interval = poll_interval
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._waiters: dict[str, int] = {}
+        self.stats = {"leaders": 0, "coalesced": 0, "remote_waits": 0, "remote_hits": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() once per key across all concurrent callers.
+        fn's result must be JSON-serialisable to be shared across workers.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["leaders"] += 1
+            task = asyncio.create_task(self._lead(key, fn))
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._finished, key))
+
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[key] == 1 and not task.done():
+                task.cancel()  # last one waiting: nobody wants the answer any more
+            raise
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved when every caller had already gone
+
+    async def _lead(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        redis = await get_redis()
+        if redis is None:
+            return await fn()
+
+        lock_key = f"sf:{self.namespace}:lock:{key}"
+        result_key = f"sf:{self.namespace}:result:{key}"
+        token = uuid.uuid4().hex
+
+        try:
+            acquired = await redis.set(lock_key, token, nx=True, px=self.lock_ttl_ms)
+        except Exception as e:
+            mark_redis_failed(e)
+            return await fn()
+
+        if acquired:
+            try:
+                result = await fn()
+                try:
+                    await redis.set(result_key, json.dumps(result), px=self.result_ttl_ms)
+                except Exception as e:
+                    mark_redis_failed(e)
+                return result
+            finally:
+                try:
+                    await redis.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                except Exception:
+                    pass  # Lock expires on its own
+
+        # Another worker is leading: wait for its published result
+        self.stats["remote_waits"] += 1
+        deadline = time.monotonic() + self.lock_ttl_ms / 1000
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                raw = await redis.get(result_key)
+                if raw is not None:
+                    self.stats["remote_hits"] += 1
+                    return json.loads(raw)
+                if not await redis.exists(lock_key):
+                    break  # Leader gave up without publishing
+            except Exception as e:
+                mark_redis_failed(e)
+                break
+
+        return await fn()
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "in_flight": len(self._inflight)}
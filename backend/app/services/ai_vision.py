@@ -7,29 +7,37 @@ Multi-tier AI for dish failure analysis:
 3. Static response (last resort)
 """
 
-import google.generativeai as genai
-from groq import Groq
-from app.core.config import settings
-import requests
+from app.services.ai_backends import is_offline
+from app.services.ai_providers import AIClientRegistry, get_registry, get_http_client
+from app.services.ai_routing import get_routes, run_route
+from app.services.ai_singleflight import SingleFlight, prompt_key
+from app.services.structured_output import StructuredOutputError, parse_json
+from app.schemas.ai import DishDiagnosis
 from PIL import Image
 from io import BytesIO
-import asyncio
 from functools import partial
 import json
 
+# Duplicate uploads (retries, double taps) share one diagnosis call
+vision_flight = SingleFlight("vision", lock_ttl_ms=60000)
+
 
 class AIVisionService:
-    def __init__(self):
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
-        self.groq = Groq(api_key=settings.GROQ_API_KEY)
+    def __init__(self, registry: AIClientRegistry = None):
+        registry = registry or get_registry()
+        self.model = registry.gemini
+        self.groq = registry.groq
 
     async def analyze_dish_failure(self, image_url: str, context: dict = None) -> dict:
         """
         Analyzes an image of a failed dish to determine what went wrong.
         Accepts optional context questions (heat, timing, modifications).
-        Falls back: Gemini Vision → Groq text → static.
+        Falls back through the "diagnosis" routes (Gemini Vision → Groq text) → static.
         """
+        key = prompt_key("diagnosis", image_url, json.dumps(context or {}, sort_keys=True))
+        return await vision_flight.do(key, partial(self._diagnose, image_url, context))
+
+    async def _diagnose(self, image_url: str, context: dict = None) -> dict:
         context_text = ""
         if context:
             context_text = "\n\nAdditional context from the cook:"
@@ -58,27 +66,9 @@ Format your response as valid JSON:
     "confidence": 0.85
 }}"""
 
-        # Tier 1: Gemini Vision (can see the image)
-        try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, requests.get, image_url)
-            image_data = Image.open(BytesIO(response.content))
-
-            ai_response = await loop.run_in_executor(
-                None,
-                partial(self.model.generate_content, [base_prompt, image_data])
-            )
-
-            result = self._parse_json(ai_response.text)
-            if result:
-                result["ai_provider"] = "gemini"
-                return result
-        except Exception as e:
-            print(f"⚠️ Gemini Vision failed: {e}")
-
-        # Tier 2: Groq text-based analysis (describe what might have gone wrong)
-        try:
-            groq_prompt = f"""A user uploaded an image of a failed cooking dish.
+        # Gemini routes see the image; Groq routes get a text-only prompt
+        # and diagnose from the context clues
+        groq_prompt = f"""A user uploaded an image of a failed cooking dish.
 {context_text}
 
 Based on the context clues provided, diagnose what likely went wrong.
@@ -86,24 +76,36 @@ Since you cannot see the image, use the context to make educated guesses.
 
 {base_prompt}"""
 
-            loop = asyncio.get_event_loop()
-            groq_response = await loop.run_in_executor(
-                None,
-                partial(
-                    self.groq.chat.completions.create,
-                    model="llama-3.3-70b-versatile",
-                    messages=[{"role": "user", "content": groq_prompt}],
-                    max_tokens=500,
+        image = None
+        for route in get_routes("diagnosis"):
+            try:
+                if route.provider == "gemini":
+                    if image is None and not is_offline():
+                        # Offline backends never look at pixels; skip the download
+                        response = await get_http_client().get(image_url)
+                        response.raise_for_status()
+                        image = Image.open(BytesIO(response.content))
+                    contents = [base_prompt, image] if image is not None else [base_prompt]
+                    provider = self.model
+                else:
+                    contents = groq_prompt
+                    provider = self.groq
+
+                ai_response = await run_route("diagnosis", route, partial(
+                    provider.generate,
+                    contents,
+                    max_tokens=route.max_tokens,
                     temperature=0.3,
-                )
-            )
+                    json_mode=True,
+                    model=route.model,
+                ))
 
-            result = self._parse_json(groq_response.choices[0].message.content)
-            if result:
-                result["ai_provider"] = "groq"
-                return result
-        except Exception as e:
-            print(f"⚠️ Groq Vision fallback failed: {e}")
+                result = self._parse_json(ai_response)
+                if result:
+                    result["ai_provider"] = route.provider
+                    return result
+            except Exception as e:
+                print(f"⚠️ {route.model} diagnosis failed: {e}")
 
         # Tier 3: Static fallback
         return {
@@ -120,13 +122,8 @@ Since you cannot see the image, use the context to make educated guesses.
         }
 
     def _parse_json(self, text: str) -> dict:
-        """Safely parse JSON from AI response, handling markdown blocks."""
+        """Tolerant JSON extraction; None only when nothing usable came back."""
         try:
-            text = text.strip()
-            if "```json" in text:
-                text = text.split("```json")[1].split("```")[0].strip()
-            elif "```" in text:
-                text = text.split("```")[1].split("```")[0].strip()
-            return json.loads(text)
-        except (json.JSONDecodeError, IndexError):
+            return parse_json(text, DishDiagnosis)
+        except StructuredOutputError:
             return None
@@ -0,0 +1,181 @@
+"""
+ChefMentor X – Similar-question Answer Cache
+
+Exact prompt caching misses most repeated mentor chat questions, because
+cooks on the same step ask paraphrases of each other ("can I use oil
+instead of butter?" / "could I use oil instead of the butter"). This
+cache keeps every answered question per (recipe, step, instruction) and
+reuses the answer when a new question is near-identical:
+
+1. MinHash signature of the question's tokens and trigrams
+   (app/services/text_similarity.py)
+2. LSH band keys pick the few candidates worth scoring
+3. The best candidate at or above CHAT_SIMILAR_CACHE_THRESHOLD (estimated
+   Jaccard) is served, unless it substitutes the other way round ("butter
+   instead of oil" for "oil instead of butter"), which no bag of words sees
+
+A sample of hits (CHAT_SIMILAR_CACHE_SAMPLE_RATE) is re-checked with the
+exact Jaccard similarity. Below-threshold rechecks count as suspect
+matches, and the sampled pairs are kept for review at GET /health/ai.
+Everything is in-process: no network and no embeddings service.
+"""
+
+import hashlib
+import random
+import time
+from collections import OrderedDict, deque
+from typing import Optional
+
+from app.core.config import settings
+from app.services.ai_cache import normalize_text
+from app.services.text_similarity import MinHasher, TextFeatures, estimated_jaccard, jaccard, reversed_substitution
+
+MAX_SCOPES = 2000
+MAX_ENTRIES_PER_SCOPE = 64
+# Fewer content words than this and the question leans on the conversation
+# ("what about that?"), so someone else's answer won't fit
+MIN_CONTENT_TOKENS = 2
+SAMPLE_HISTORY = 20
+
+
+class _Entry:
+    __slots__ = ("question", "features", "shingles", "signature", "answer", "expires_at")
+
+    def __init__(self, question: str, features: TextFeatures, signature: tuple, answer: str, expires_at: float):
+        self.question = question
+        self.features = features
+        self.shingles = features.shingles
+        self.signature = signature
+        self.answer = answer
+        self.expires_at = expires_at
+
+
+class _Scope:
+    """Answers for one step, with LSH band postings over their signatures."""
+
+    def __init__(self):
+        self.entries: OrderedDict[int, _Entry] = OrderedDict()
+        self.bands: dict[tuple, set[int]] = {}
+        self._next_id = 0
+
+    def add(self, entry: _Entry, band_keys: list[tuple]) -> None:
+        entry_id = self._next_id
+        self._next_id += 1
+        self.entries[entry_id] = entry
+        for key in band_keys:
+            self.bands.setdefault(key, set()).add(entry_id)
+
+    def remove_oldest(self, band_keys_of) -> None:
+        entry_id, entry = self.entries.popitem(last=False)
+        for key in band_keys_of(entry.signature):
+            ids = self.bands.get(key)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self.bands[key]
+
+
+def chat_scope(context: dict) -> Optional[tuple[str, str, str]]:
+    """(recipe, step, instruction digest) from the chat context, None if the step isn't identifiable."""
+    recipe = context.get("recipe_id") or normalize_text(context.get("recipe_name") or "")
+    step = context.get("current_step")
+    if not recipe or step is None:
+        return None
+    instruction = normalize_text(context.get("step_instruction") or "")
+    return str(recipe), str(step), hashlib.sha256(instruction.encode()).hexdigest()[:16]
+
+
+class SimilarAnswerCache:
+    def __init__(self, max_scopes: int = MAX_SCOPES, max_entries: int = MAX_ENTRIES_PER_SCOPE):
+        self.max_scopes = max_scopes
+        self.max_entries = max_entries
+        self.hasher = MinHasher()
+        self._scopes: OrderedDict[tuple, _Scope] = OrderedDict()
+        self.samples: deque[dict] = deque(maxlen=SAMPLE_HISTORY)
+        self.stats = {"lookups": 0, "hits": 0, "misses": 0, "skipped": 0, "stores": 0, "sampled": 0, "suspect_matches": 0}
+
+    def lookup(self, scope: tuple, question: str) -> Optional[str]:
+        features = TextFeatures(question)
+        if len(features.tokens) < MIN_CONTENT_TOKENS:
+            self.stats["skipped"] += 1
+            return None
+        self.stats["lookups"] += 1
+
+        bucket = self._scopes.get(scope)
+        best: Optional[tuple[float, _Entry]] = None
+        if bucket is not None:
+            self._scopes.move_to_end(scope)
+            shingles = features.shingles
+            signature = self.hasher.signature(shingles)
+            candidates = {
+                entry_id for key in self.hasher.band_keys(signature)
+                for entry_id in bucket.bands.get(key, ())
+            }
+            now = time.monotonic()
+            for entry_id in candidates:
+                entry = bucket.entries.get(entry_id)
+                if entry is None or entry.expires_at < now or reversed_substitution(features, entry.features):
+                    continue
+                score = estimated_jaccard(signature, entry.signature)
+                if score >= settings.CHAT_SIMILAR_CACHE_THRESHOLD and (best is None or score > best[0]):
+                    best = (score, entry)
+
+        if best is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        score, entry = best
+        if random.random() < settings.CHAT_SIMILAR_CACHE_SAMPLE_RATE:
+            self._sample(question, shingles, entry, score)
+        return entry.answer
+
+    def store(self, scope: tuple, question: str, answer: str) -> None:
+        features = TextFeatures(question)
+        if len(features.tokens) < MIN_CONTENT_TOKENS or not answer:
+            return
+        bucket = self._scopes.get(scope)
+        if bucket is None:
+            bucket = self._scopes[scope] = _Scope()
+            while len(self._scopes) > self.max_scopes:
+                self._scopes.popitem(last=False)
+        self._scopes.move_to_end(scope)
+
+        signature = self.hasher.signature(features.shingles)
+        expires_at = time.monotonic() + settings.CHAT_SIMILAR_CACHE_TTL_SECONDS
+        bucket.add(_Entry(question, features, signature, answer, expires_at), self.hasher.band_keys(signature))
+        while len(bucket.entries) > self.max_entries:
+            bucket.remove_oldest(self.hasher.band_keys)
+        self.stats["stores"] += 1
+
+    def _sample(self, question: str, shingles: frozenset, entry: _Entry, estimated: float) -> None:
+        """Re-check a served hit exactly; MinHash over-estimates sometimes."""
+        exact = jaccard(shingles, entry.shingles)
+        suspect = exact < settings.CHAT_SIMILAR_CACHE_THRESHOLD
+        self.stats["sampled"] += 1
+        self.stats["suspect_matches"] += suspect
+        self.samples.append({
+            "question": question,
+            "matched": entry.question,
+            "estimated": round(estimated, 3),
+            "exact": round(exact, 3),
+            "suspect": suspect,
+        })
+
+    def clear(self) -> None:
+        self._scopes.clear()
+        self.samples.clear()
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["lookups"]
+        sampled = self.stats["sampled"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else None,
+            "suspect_rate": round(self.stats["suspect_matches"] / sampled, 3) if sampled else None,
+            "scopes": len(self._scopes),
+            "entries": sum(len(bucket.entries) for bucket in self._scopes.values()),
+            "recent_samples": list(self.samples),
+        }
+
+
+chat_answer_cache = SimilarAnswerCache()
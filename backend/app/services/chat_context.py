@@ -0,0 +1,121 @@
+"""
+ChefMentor X – Chat Context Compaction
+
+Keeps mentor chat requests inside a token budget however long the cooking
+session runs:
+
+- Under budget: messages are sent untouched
+- Over budget: the most recent turns stay verbatim and everything older
+  is replaced by a rolling summary
+
+Summaries are folded incrementally. Fold boundaries fall every
+SUMMARY_FOLD_MESSAGES messages and each boundary's summary is cached under
+a digest of the history up to it, so a new fold only summarizes the
+previous summary plus the few turns since – never the whole conversation –
+and the turns in between reuse the cached summary with no LLM call.
+"""
+
+import hashlib
+from typing import Awaitable, Callable, Optional
+
+from app.core.config import settings
+from app.services.ai_cache import AICache
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+SUMMARY_FOLD_MESSAGES = 6
+
+# (previous_summary, turns_to_fold) -> new summary, or None on failure
+Summarizer = Callable[[Optional[str], list[dict]], Awaitable[Optional[str]]]
+
+summary_cache = AICache(
+    "chat_summary",
+    max_entries=settings.AI_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Provider-agnostic estimate (~4 chars per token); good enough for budgeting."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def count_tokens(messages: list[dict]) -> int:
+    return sum(estimate_tokens(msg["content"]) + MESSAGE_OVERHEAD_TOKENS for msg in messages)
+
+
+def _prefix_digests(messages: list[dict]) -> list[str]:
+    """digests[i] identifies messages[:i]; each is chained from the previous one."""
+    digests = [hashlib.sha256(b"chat").hexdigest()]
+    for msg in messages:
+        digests.append(hashlib.sha256(f"{digests[-1]}\x00{msg['role']}\x00{msg['content']}".encode()).hexdigest())
+    return digests
+
+
+def _fold_boundaries(messages: list[dict], keep_recent: int) -> list[int]:
+    """
+    Candidate fold points, ascending: every SUMMARY_FOLD_MESSAGES messages,
+    nudged forward so the verbatim tail starts on a user turn (Gemini needs
+    user/model turns to alternate after the system prompt).
+    """
+    limit = len(messages) - keep_recent
+    boundaries = []
+    for mark in range(SUMMARY_FOLD_MESSAGES, limit + 1, SUMMARY_FOLD_MESSAGES):
+        while mark < len(messages) and messages[mark]["role"] != "user":
+            mark += 1
+        if mark < len(messages) and mark not in boundaries:
+            boundaries.append(mark)
+    return boundaries
+
+
+def _trim(messages: list[dict], budget: int) -> list[dict]:
+    """Last resort: drop the oldest turns until the rest fits, always keeping the latest message."""
+    start = 0
+    while start < len(messages) - 1 and count_tokens(messages[start:]) > budget:
+        start += 1
+    while start < len(messages) - 1 and messages[start]["role"] != "user":
+        start += 1
+    return messages[start:]
+
+
+async def compact_messages(
+    messages: list[dict],
+    system_prompt: str,
+    summarize: Summarizer,
+    max_tokens: int = None,
+    keep_recent: int = None,
+) -> tuple[list[dict], Optional[str]]:
+    """
+    Returns (messages_to_send, summary_of_older_turns). The summary is None
+    when nothing had to be folded.
+    """
+    max_tokens = max_tokens or settings.CHAT_CONTEXT_MAX_TOKENS
+    keep_recent = keep_recent or settings.CHAT_CONTEXT_RECENT_MESSAGES
+    budget = max_tokens - estimate_tokens(system_prompt)
+
+    if count_tokens(messages) <= budget:
+        return messages, None
+
+    boundaries = _fold_boundaries(messages, keep_recent)
+    if not boundaries:
+        return _trim(messages, budget), None
+
+    digests = _prefix_digests(messages)
+    target = boundaries[-1]
+
+    # Resume from the furthest fold we already have a summary for
+    summary, start = None, 0
+    for boundary in reversed(boundaries):
+        cached = await summary_cache.get(summary_cache.make_key("summary", digests[boundary]))
+        if cached:
+            summary, start = cached, boundary
+            break
+
+    if start < target:
+        folded = await summarize(summary, messages[start:target])
+        if folded:
+            summary, start = folded, target
+            await summary_cache.set(summary_cache.make_key("summary", digests[target]), summary)
+
+    remaining = budget - (estimate_tokens(summary) if summary else 0)
+    return _trim(messages[start:], remaining), summary
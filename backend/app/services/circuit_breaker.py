@@ -0,0 +1,234 @@
+"""
+ChefMentor X – Per-provider Circuit Breakers
+
+One breaker per AI provider (gemini, groq), shared by every service that
+calls it. Each breaker keeps a rolling window of call outcomes and
+latencies:
+
+- CLOSED:    calls flow; trips to OPEN when the window's error rate or
+             slow-call rate crosses its threshold
+- OPEN:      calls are rejected instantly with CircuitOpenError, so the
+             caller drops straight to its next tier
+- HALF_OPEN: after the cooldown a single probe is let through; success
+             closes the breaker, failure re-opens it
+
+A call cancelled because its deadline passed counts as a failure; any
+other cancellation (a losing hedge, a client that went away) is neutral.
+Callers that enforce a timeout wrap the call in call_deadline() so the
+breaker can tell the two apart.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from app.core.config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Monotonic time at which the caller gives up on the current call
+_deadline: ContextVar[Optional[float]] = ContextVar("breaker_deadline", default=None)
+
+
+@contextmanager
+def call_deadline(seconds: float):
+    """
+    with call_deadline(timeout):
+        await asyncio.wait_for(provider_call(), timeout)
+
+    A guarded call cancelled at or after the deadline is recorded as a
+    failure instead of a neutral cancellation.
+    """
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+
+    def __init__(self, name: str):
+        super().__init__(f"Circuit open for provider '{name}'")
+        self.name = name
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 60,
+        min_calls: int = 10,
+        error_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_rate_threshold: float = 0.8,
+        open_seconds: float = 30,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate_threshold = slow_rate_threshold
+        self.open_seconds = open_seconds
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        # (timestamp, ok, latency_seconds)
+        self._calls: deque[tuple[float, bool, float]] = deque()
+        self.stats = {"successes": 0, "failures": 0, "timeouts": 0, "rejected": 0, "trips": 0}
+
+    # ── State machine ──────────────────────────────────
+
+    def allow(self) -> bool:
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+
+        self.stats["rejected"] += 1
+        return False
+
+    def record_success(self, latency: float) -> None:
+        self.stats["successes"] += 1
+        if self.state == HALF_OPEN:
+            self._calls.clear()
+            self._transition(CLOSED)
+        self._record(True, latency)
+
+    def record_failure(self, latency: float) -> None:
+        self.stats["failures"] += 1
+        if self.state == HALF_OPEN:
+            self.trip()
+            return
+        self._record(False, latency)
+
+    def trip(self) -> None:
+        self.opened_at = time.monotonic()
+        self.stats["trips"] += 1
+        self._transition(OPEN)
+
+    def reset(self) -> None:
+        self._calls.clear()
+        self._transition(CLOSED)
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            print(f"⚡ Circuit '{self.name}': {self.state} → {state}")
+        self.state = state
+        self._probe_in_flight = False
+
+    def _record(self, ok: bool, latency: float) -> None:
+        now = time.monotonic()
+        self._calls.append((now, ok, latency))
+        self._prune(now)
+
+        if self.state != CLOSED or len(self._calls) < self.min_calls:
+            return
+        if self.error_rate() >= self.error_rate_threshold or self.slow_rate() >= self.slow_rate_threshold:
+            self.trip()
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+
+    # ── Rolling window stats ───────────────────────────
+
+    def error_rate(self) -> float:
+        if not self._calls:
+            return 0.0
+        return sum(1 for _, ok, _ in self._calls if not ok) / len(self._calls)
+
+    def slow_rate(self) -> float:
+        if not self._calls:
+            return 0.0
+        return sum(1 for _, _, latency in self._calls if latency >= self.slow_call_seconds) / len(self._calls)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """Latency of successful calls in the window, e.g. percentile=0.95."""
+        latencies = sorted(latency for _, ok, latency in self._calls if ok)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(percentile * len(latencies)))
+        return latencies[index]
+
+    # ── Call wrapper ───────────────────────────────────
+
+    @asynccontextmanager
+    async def guard(self):
+        """
+        async with breaker.guard():
+            response = await provider_call()
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+
+        started = time.monotonic()
+        try:
+            yield
+        except (asyncio.CancelledError, GeneratorExit):
+            deadline = _deadline.get()
+            if deadline is not None and time.monotonic() >= deadline:
+                # Cancelled by the caller's timeout: the provider was too slow
+                self.stats["timeouts"] += 1
+                self.record_failure(time.monotonic() - started)
+            else:
+                # A cancelled call (a losing hedge, a client that stopped
+                # reading a stream) says nothing about provider health
+                self._probe_in_flight = False
+            raise
+        except Exception:
+            self.record_failure(time.monotonic() - started)
+            raise
+        else:
+            self.record_success(time.monotonic() - started)
+
+    def snapshot(self) -> dict:
+        self._prune(time.monotonic())
+        p50 = self.latency_percentile(0.5)
+        p95 = self.latency_percentile(0.95)
+        return {
+            "state": self.state,
+            "window_calls": len(self._calls),
+            "error_rate": round(self.error_rate(), 3),
+            "slow_rate": round(self.slow_rate(), 3),
+            "latency_p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "latency_p95_ms": round(p95 * 1000) if p95 is not None else None,
+            **self.stats,
+        }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Process-wide breaker for a provider, created on first use."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            name,
+            window_seconds=settings.AI_BREAKER_WINDOW_SECONDS,
+            min_calls=settings.AI_BREAKER_MIN_CALLS,
+            error_rate_threshold=settings.AI_BREAKER_ERROR_RATE,
+            slow_call_seconds=settings.AI_BREAKER_SLOW_CALL_SECONDS,
+            slow_rate_threshold=settings.AI_BREAKER_SLOW_RATE,
+            open_seconds=settings.AI_BREAKER_OPEN_SECONDS,
+        )
+        _breakers[name] = breaker
+    return breaker
+
+
+def breaker_snapshot() -> dict:
+    return {name: breaker.snapshot() for name, breaker in _breakers.items()}
@@ -0,0 +1,324 @@
+"""
+ChefMentor X – Server-side Conversation Store
+
+Mentor chat history lives on the server, addressed by a conversation id,
+so clients send only the new user turn instead of the whole transcript:
+
+1. Redis list per conversation (shared across workers, expires after
+   CHAT_STORE_TTL_SECONDS of inactivity)
+2. In-process LRU when Redis is unavailable
+3. Postgres (chat_messages) as the durable copy – written behind in
+   batches by a background flusher, read only to rebuild an expired
+   conversation. A row the database rejects is dropped on its own
+   rather than blocking every later flush
+
+Unflushed rows queue in Redis (chat:pending) next to the conversations,
+so any worker's flusher writes them and a rebuild on any worker sees
+them. Each flush claims a batch off the head of the queue in one
+MULTI; rows it can't write go back to the head. Without Redis they
+queue in-process.
+"""
+
+import asyncio
+import json
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.core.config import settings
+from app.core.redis import get_redis, mark_redis_failed
+from app.models.chat import ChatMessage
+
+MAX_LOCAL_CONVERSATIONS = 1000
+# Bound on unflushed turns while the database is unreachable; the oldest go first
+MAX_PENDING = 10000
+PENDING_KEY = "chat:pending"
+FLUSH_BATCH = 500
+
+
+def _encode_row(row: dict) -> str:
+    return json.dumps({**row, "created_at": row["created_at"].isoformat()})
+
+
+def _decode_row(raw: str) -> dict:
+    row = json.loads(raw)
+    row["created_at"] = datetime.fromisoformat(row["created_at"])
+    return row
+
+
+class ConversationStore:
+    def __init__(self, ttl_seconds: int, flush_interval: float):
+        self.ttl_seconds = ttl_seconds
+        self.flush_interval = flush_interval
+        self._local: OrderedDict[str, list[dict]] = OrderedDict()
+        self._pending: list[dict] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self.stats = {"redis_hits": 0, "local_hits": 0, "db_loads": 0, "appends": 0, "flushed": 0, "flush_errors": 0, "dropped": 0}
+
+    @staticmethod
+    def _key(conversation_id: str) -> str:
+        return f"chat:conv:{conversation_id}"
+
+    # ── Reads ──────────────────────────────────────────
+
+    async def load(self, conversation_id: str) -> list[dict]:
+        """Full history as [{"role": ..., "content": ...}], oldest first."""
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                raw = await redis.lrange(self._key(conversation_id), 0, -1)
+                if raw:
+                    self.stats["redis_hits"] += 1
+                    return [json.loads(item) for item in raw]
+            except Exception as e:
+                mark_redis_failed(e)
+        if conversation_id in self._local:
+            self.stats["local_hits"] += 1
+            self._local.move_to_end(conversation_id)
+            return list(self._local[conversation_id])
+
+        messages = await self._load_from_db(conversation_id)
+        if messages:
+            await self._hydrate(conversation_id, messages)
+        return messages
+
+    async def _load_from_db(self, conversation_id: str) -> list[dict]:
+        from app.db.base import AsyncSessionLocal
+
+        self.stats["db_loads"] += 1
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(ChatMessage.role, ChatMessage.content)
+                .where(ChatMessage.conversation_id == uuid.UUID(conversation_id))
+                .order_by(ChatMessage.seq)
+            )
+            messages = [{"role": role, "content": content} for role, content in result.all()]
+
+        # Turns not flushed yet, queued by any worker
+        persisted = len(messages)
+        pending = {
+            row["seq"]: row
+            for row in self._pending + await self._shared_pending()
+            if row["conversation_id"] == conversation_id and row["seq"] >= persisted
+        }
+        messages.extend({"role": row["role"], "content": row["content"]} for _, row in sorted(pending.items()))
+        return messages
+
+    async def _shared_pending(self) -> list[dict]:
+        redis = await get_redis()
+        if redis is None:
+            return []
+        try:
+            return [_decode_row(raw) for raw in await redis.lrange(PENDING_KEY, 0, -1)]
+        except Exception as e:
+            mark_redis_failed(e)
+            return []
+
+    async def _hydrate(self, conversation_id: str, messages: list[dict]) -> None:
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                key = self._key(conversation_id)
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.delete(key)
+                    pipe.rpush(key, *(json.dumps(msg) for msg in messages))
+                    pipe.expire(key, self.ttl_seconds)
+                    await pipe.execute()
+                return
+            except Exception as e:
+                mark_redis_failed(e)
+        self._set_local(conversation_id, list(messages))
+
+    # ── Writes ─────────────────────────────────────────
+
+    async def append(self, conversation_id: str, role: str, content: str, cooking_session_id: str = None) -> None:
+        message = {"role": role, "content": content}
+        seq = None
+
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                key = self._key(conversation_id)
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.rpush(key, json.dumps(message))
+                    pipe.expire(key, self.ttl_seconds)
+                    length, _ = await pipe.execute()
+                seq = length - 1
+            except Exception as e:
+                mark_redis_failed(e)
+
+        if seq is None:
+            history = self._local.get(conversation_id, [])
+            history.append(message)
+            self._set_local(conversation_id, history)
+            seq = len(history) - 1
+
+        self.stats["appends"] += 1
+        row = {
+            "conversation_id": conversation_id,
+            "cooking_session_id": cooking_session_id,
+            "seq": seq,
+            "role": role,
+            "content": content,
+            "created_at": datetime.utcnow(),
+        }
+        if redis is not None and await self._queue_shared([row]):
+            return
+        self._pending.append(row)
+        if len(self._pending) > MAX_PENDING:
+            del self._pending[0]
+            self.stats["dropped"] += 1
+
+    async def _queue_shared(self, rows: list[dict], front: bool = False) -> bool:
+        """Queue rows in Redis for whichever worker flushes next. False if Redis failed."""
+        redis = await get_redis()
+        if redis is None:
+            return False
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                if front:
+                    pipe.lpush(PENDING_KEY, *(_encode_row(row) for row in reversed(rows)))
+                else:
+                    pipe.rpush(PENDING_KEY, *(_encode_row(row) for row in rows))
+                pipe.ltrim(PENDING_KEY, -MAX_PENDING, -1)
+                length, _ = await pipe.execute()
+        except Exception as e:
+            mark_redis_failed(e)
+            return False
+        self.stats["dropped"] += max(0, length - MAX_PENDING)
+        return True
+
+    def _set_local(self, conversation_id: str, messages: list[dict]) -> None:
+        self._local[conversation_id] = messages
+        self._local.move_to_end(conversation_id)
+        while len(self._local) > MAX_LOCAL_CONVERSATIONS:
+            self._local.popitem(last=False)
+
+    # ── Write-behind ───────────────────────────────────
+
+    async def flush(self) -> int:
+        """
+        Persist pending messages, this worker's and those queued in Redis, in
+        batched transactions. Returns how many were written.
+        """
+        written = 0
+        if self._pending:
+            batch, self._pending = self._pending, []
+            flushed, unwritten = await self._write(batch)
+            written += flushed
+            if unwritten:
+                self._pending = unwritten + self._pending
+                return written
+
+        redis = await get_redis()
+        if redis is None:
+            return written
+        while True:
+            try:
+                # Claim the head of the queue; no other worker can get these rows
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.lrange(PENDING_KEY, 0, FLUSH_BATCH - 1)
+                    pipe.ltrim(PENDING_KEY, FLUSH_BATCH, -1)
+                    raw, _ = await pipe.execute()
+            except Exception as e:
+                mark_redis_failed(e)
+                return written
+            if not raw:
+                return written
+
+            flushed, unwritten = await self._write([_decode_row(item) for item in raw])
+            written += flushed
+            if unwritten:
+                if not await self._queue_shared(unwritten, front=True):
+                    self._pending = unwritten + self._pending
+                return written
+            if len(raw) < FLUSH_BATCH:
+                return written
+
+    async def _write(self, batch: list[dict]) -> tuple[int, list[dict]]:
+        """One batch to Postgres. Returns (rows written, rows to retry later)."""
+        try:
+            await self._insert(batch)
+        except Exception as e:
+            print(f"⚠️ Chat history flush failed, retrying row by row: {e}")
+            self.stats["flush_errors"] += 1
+            return await self._write_rows(batch)
+
+        self.stats["flushed"] += len(batch)
+        return len(batch), []
+
+    async def _write_rows(self, batch: list[dict]) -> tuple[int, list[dict]]:
+        """Insert one row per transaction, dropping rows the database rejects."""
+        written = 0
+        unwritten: list[dict] = []
+        for i, row in enumerate(batch):
+            try:
+                await self._insert([row])
+            except (IntegrityError, DataError, ValueError) as e:
+                print(f"⚠️ Dropping chat message the database rejected: {e}")
+                self.stats["dropped"] += 1
+            except Exception:
+                # Database unreachable: keep this row and the rest for the next flush
+                unwritten = batch[i:]
+                break
+            else:
+                written += 1
+
+        self.stats["flushed"] += written
+        return written, unwritten
+
+    @staticmethod
+    async def _insert(rows: list[dict]) -> None:
+        from app.db.base import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as session:
+            try:
+                session.add_all(
+                    ChatMessage(
+                        conversation_id=uuid.UUID(row["conversation_id"]),
+                        cooking_session_id=uuid.UUID(row["cooking_session_id"]) if row["cooking_session_id"] else None,
+                        seq=row["seq"],
+                        role=row["role"],
+                        content=row["content"],
+                        created_at=row["created_at"],
+                    )
+                    for row in rows
+                )
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the background flusher. Call this on application startup."""
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write out anything still pending. Call this on shutdown."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "pending": len(self._pending), "local_conversations": len(self._local)}
+
+
+conversation_store = ConversationStore(
+    ttl_seconds=settings.CHAT_STORE_TTL_SECONDS,
+    flush_interval=settings.CHAT_STORE_FLUSH_SECONDS,
+)
@@ -1,17 +1,20 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, BackgroundTasks
+from app.core.config import settings
 from app.models.session import CookingSession
 from app.models.recipe import Recipe
 from app.services.ai_mentor import AIMentorService
+from app.services.ai_providers import AIClientRegistry
+from app.services.session_state import COMPLETED, session_state
+from app.services.step_cache import CachedStep, recipe_version, step_cache
+from app.services.step_faq import precompute_faq_in_background
 from datetime import datetime
 import asyncio
 
 class CookingService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, registry: AIClientRegistry = None):
         self.db = db
-        self.ai = AIMentorService()
+        self.ai = AIMentorService(registry)
     
     async def start_session(self, recipe_id: str, user_id: str = None, demo_session_id: str = None, background_tasks: BackgroundTasks = None):
         # 1. Verify Recipe Exists
@@ -30,101 +33,93 @@ class CookingService:
         self.db.add(session)
         await self.db.commit()
         await self.db.refresh(session)
+        await session_state.create(session, recipe_version(recipe.updated_at))
         
-        # 3. Prefetch Step 1 Guidance immediately
+        # 3. Prefetch guidance for the first steps immediately, and the recipe's chat FAQ
+        # (a no-op once every step's FAQ is current)
         if background_tasks:
             background_tasks.add_task(self._prefetch_guidance, str(session.id), 0)
+            if settings.CHAT_FAQ_ENABLED:
+                background_tasks.add_task(precompute_faq_in_background, str(recipe_id))
         
         return session
 
     async def get_current_step(self, session_id: str):
-        # Fetch session with recipe and steps
-        result = await self.db.execute(
-            select(CookingSession)
-            .options(selectinload(CookingSession.recipe).selectinload(Recipe.steps))
-            .where(CookingSession.id == session_id)
-        )
-        session = result.scalar_one_or_none()
-        
-        if not session:
+        # Hot state (Redis, see session_state.py) plus cached steps
+        # (step_cache.py) instead of a session + recipe + steps join
+        state = await session_state.get(self.db, session_id)
+        if not state:
             raise HTTPException(status_code=404, detail="Session not found")
-            
-        current_index = int(session.current_step_index)
-        steps = session.recipe.steps
-        steps.sort(key=lambda x: x.step_number)
+        steps = await step_cache.get(self.db, state["recipe_id"], state["recipe_version"])
+        return await self._step_response(session_id, state, steps)
+
+    async def _step_response(self, session_id: str, state: dict, steps: tuple[CachedStep, ...]) -> dict:
+        current_index = state["step_index"]
         
         if current_index >= len(steps):
             return {"message": "Recipe complete!", "is_last_step": True, "step_number": 999, "instruction": "Done!"}
             
         step = steps[current_index]
         
-        # Check Cache
-        guidance = session.next_step_guidance
+        # Tips stored at ingest (RecipeEnrichmentService) need no AI call,
+        # then the per-session prefetch cache
+        guidance = step.ai_tips or state["guidance"].get(current_index)
         
         if not guidance:
-            # Cache Miss: Fetch synchronously (slow)
+            # Cache Miss: Fetch synchronously (slow), kept for re-reads of this step
             try:
-                guidance = await self.ai.get_step_guidance(step.instruction)
+                guidance = await self.ai.get_step_guidance(step.instruction, hedge=True)
+                await session_state.set_guidance(self.db, session_id, {current_index: guidance})
             except:
-                guidance = "No tips available."
+                guidance = guidance or "No tips available."
         
         return {
             "step_number": step.step_number,
             "instruction": step.instruction,
             "expected_state": step.expected_state,
             "is_last_step": (current_index == len(steps) - 1),
-            "guidance": guidance
+            "guidance": guidance,
+            # Verdicts are checked per recipe at ingest; a stale one (edited
+            # instruction) is withheld until the backfill re-checks it
+            "safety_warnings": list(step.safety_warnings) if step.safety_warnings is not None else None,
+            "duration_minutes": step.duration_minutes,
+            "timer_required": step.timer_required,
         }
 
     async def advance_step(self, session_id: str, background_tasks: BackgroundTasks = None):
-        session = await self.db.get(CookingSession, session_id)
-        if not session:
+        # Atomic in Redis; Postgres gets it from the write-behind flush
+        state = await session_state.advance(self.db, session_id)
+        if not state:
             raise HTTPException(status_code=404, detail="Session not found")
-            
-        current = int(session.current_step_index)
+        steps = await step_cache.get(self.db, state["recipe_id"], state["recipe_version"])
         
-        # Clear used guidance
-        session.next_step_guidance = None
-        session.current_step_index = str(current + 1)
-        
-        await self.db.commit()
-        
-        # Prefetch NEXT step (current + 1 is the new current, so we want guidance for that)
-        # Actually, we want guidance for the step user JUST landed on.
-        # Wait, if user clicks "Next", they land on Step 2. We want Step 2 guidance ready.
-        # But we can't prefetch Step 2 BEFORE they click Next unless we do it during Step 1.
-        # Correct Logic: During Step 1, prefetch Step 2.
+        if state["step_index"] >= len(steps) and state["status"] != COMPLETED:
+            await session_state.complete(self.db, session_id)
         
+        # The step we just landed on was prefetched while the user was on the
+        # previous ones; slide the window so the next steps are ready too
         if background_tasks:
-            # Prefetch the step AFTER the one we just landed on? 
-            # No, users want guidance for the CURRENT step they are viewing.
-            # So when we enter Step 2, we should have ALREADY prefetched Step 2's guidance during Step 1.
-            
-            # Trigger prefetch for Step 3 (index + 2) so it's ready for next time
-            background_tasks.add_task(self._prefetch_guidance, session_id, current + 2)
+            background_tasks.add_task(self._prefetch_guidance, session_id, state["step_index"])
         
-        return await self.get_current_step(session_id)
+        return await self._step_response(session_id, state, steps)
 
     async def _prefetch_guidance(self, session_id: str, step_index: int):
-        """Background task to fetch AI guidance for a future step"""
+        """Background task to fetch AI guidance for the COOKING_GUIDANCE_LOOKAHEAD steps from step_index"""
         # Create new DB session for background task
         from app.db.base import AsyncSessionLocal
-        async with AsyncSessionLocal() as session:
-            db_session = await session.get(CookingSession, session_id) # Re-fetch
-            if not db_session: return
+        async with AsyncSessionLocal() as db:
+            state = await session_state.get(db, session_id)
+            if not state: return
+            
+            steps = await step_cache.get(db, state["recipe_id"], state["recipe_version"])
+            window = range(step_index, min(step_index + max(settings.COOKING_GUIDANCE_LOOKAHEAD, 1), len(steps)))
+            # Steps with stored tips are served straight from the recipe
+            missing = [i for i in window if not steps[i].ai_tips and i not in state["guidance"]]
+            if not missing:
+                return
             
-            # Load steps
-            result = await session.execute(
-                select(Recipe).where(Recipe.id == db_session.recipe_id).options(selectinload(Recipe.steps))
-            )
-            recipe = result.scalar_one()
-            steps = sorted(recipe.steps, key=lambda x: x.step_number)
+            # Concurrent, so the guidance batcher can fold them into one call
+            tips = await asyncio.gather(*(self.ai.get_step_guidance(steps[i].instruction) for i in missing))
             
-            if step_index < len(steps):
-                step = steps[step_index]
-                guidance = await self.ai.get_step_guidance(step.instruction)
-                
-                # Update DB
-                db_session.next_step_guidance = guidance
-                await session.commit()
-                print(f"✨ Prefetched guidance for Step {step_index + 1}")
+            await session_state.set_guidance(db, session_id, dict(zip(missing, tips)))
+            print(f"✨ Prefetched guidance for Steps {', '.join(str(i + 1) for i in missing)}")
@@ -3,13 +3,14 @@ from fastapi import UploadFile
 from app.models.session import FailureAnalysis
 from app.services.storage import StorageService
 from app.services.ai_vision import AIVisionService
+from app.services.ai_providers import AIClientRegistry
 import json
 
 class FailureService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, registry: AIClientRegistry = None):
         self.db = db
         self.storage = StorageService()
-        self.vision = AIVisionService()
+        self.vision = AIVisionService(registry)
     
     async def analyze_upload(self, file: UploadFile, user_id=None, cooking_session_id=None, context: dict = None):
         # 1. Read file
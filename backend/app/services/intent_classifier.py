@@ -0,0 +1,182 @@
+"""
+ChefMentor X – Local Voice Intent Classifier
+
+Hands-free commands ("next", "go back", "timer for five minutes") are a
+tiny closed grammar, so they are resolved locally with precompiled
+patterns in well under a millisecond – no network call. Every result
+carries a confidence score; only low-confidence utterances (free-form
+questions, ambiguous phrasing) are escalated to the LLM.
+
+Confidence levels:
+- 0.95  whole utterance is a known command, or a timer with a duration
+- 0.85  short utterance that starts with a command word
+- 0.6   command word buried in a longer sentence, or a question that
+        mentions a timer ("should I set a timer for 10 minutes") – escalate
+- 0.0   nothing recognised
+"""
+
+import re
+from typing import Optional
+
+# How parse_voice_intent answered: local grammar, LLM, or local guess after the LLM failed
+intent_stats = {"local": 0, "llm": 0, "fallback": 0}
+
+# ── Command grammar ────────────────────────────────
+
+COMMANDS = {
+    "NEXT": [
+        "next", "next step", "go next", "go on", "go ahead", "move on", "forward",
+        "whats next", "what is next", "done", "im done", "i am done", "finished",
+        "skip", "skip step", "skip this step", "next one",
+    ],
+    "PREV": [
+        "back", "go back", "previous", "prev", "previous step", "last step",
+        "step back", "go to the previous step", "go back a step", "undo",
+    ],
+    "REPEAT": [
+        "repeat", "repeat that", "repeat step", "repeat the step", "again",
+        "say that again", "say again", "one more time", "what was that",
+        "come again", "pardon", "read it again", "what did you say",
+    ],
+    "PAUSE": [
+        "pause", "stop", "wait", "hold on", "hold", "hang on", "one moment",
+        "pause cooking", "stop for a moment", "one sec", "one second", "just a sec",
+        "wait a sec", "wait a second", "give me a sec", "give me a second",
+    ],
+    "RESUME": [
+        "resume", "continue", "go", "carry on", "keep going", "unpause",
+        "im back", "i am back", "lets go", "ready", "resume cooking",
+    ],
+    "HELP": [
+        "help", "commands", "what can i say", "what can you do", "options",
+        "how does this work", "what are the commands",
+    ],
+}
+
+_FILLER = re.compile(
+    r"^(?:(?:ok(?:ay)?|hey|hi|um+|uh+|so|please|chef|mentor|can you|could you|would you)\s+)+"
+    r"|(?:\s+(?:please|chef|thanks|thank you|now))+$"
+)
+_PUNCTUATION = re.compile(r"[^\w\s.]")
+
+_EXACT = {
+    intent: re.compile(r"^(?:" + "|".join(map(re.escape, phrases)) + r")$")
+    for intent, phrases in COMMANDS.items()
+}
+_PREFIX = {
+    intent: re.compile(r"^(?:" + "|".join(map(re.escape, phrases)) + r")\b")
+    for intent, phrases in COMMANDS.items()
+}
+_ANYWHERE = {
+    intent: re.compile(r"\b(?:" + "|".join(map(re.escape, phrases)) + r")\b")
+    for intent, phrases in COMMANDS.items()
+    if intent != "RESUME"  # "go" appears in far too many sentences
+}
+
+_TIMER_WORDS = re.compile(r"\b(?:timer|remind me|alarm|countdown|count down)\b")
+# "is it ok to rest the dough for an hour" asks about a duration, it doesn't set one
+_QUESTION = re.compile(
+    r"^(?:what|whats|when|where|why|who|which|how|should|shall|can|could|would|will|"
+    r"is|are|am|do|does|did|was|were|has|have|isnt|dont|doesnt)\b"
+)
+_INGREDIENT = re.compile(
+    r"^(?:how much|how many|what ingredients|which ingredients|what do i need|do i need|"
+    r"ingredients|what goes in|can i use|can i substitute|what can i use)\b"
+)
+
+# ── Duration parsing ───────────────────────────────
+
+_UNITS = {"hour": 3600, "hr": 3600, "h": 3600, "minute": 60, "min": 60, "m": 60, "second": 1, "sec": 1, "s": 1}
+_ONES = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13,
+    "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+_TENS = {"twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90}
+_PHRASES = {"a couple of": 2, "a few": 3, "half an": 0.5, "half a": 0.5, "a half": 0.5,
+            "quarter of an": 0.25, "a quarter of an": 0.25, "an": 1, "a": 1}
+
+_WORD_NUMBER = (
+    r"(?:" + "|".join(_TENS) + r")(?:[\s-](?:" + "|".join(k for k in _ONES if k != "zero") + r"))?"
+    r"|" + "|".join(sorted(_ONES, key=len, reverse=True))
+    + r"|" + "|".join(map(re.escape, sorted(_PHRASES, key=len, reverse=True)))
+)
+# Word numbers must end at a word boundary and the one-letter units (h, m, s)
+# only follow digits, so "as", "am" and "ah" are never "a second/minute/hour"
+_DURATION = re.compile(
+    r"\b(?:(?P<digits>\d+(?:\.\d+)?)\s*(?P<abbr>[hms])\b"
+    rf"|(?P<number>\d+(?:\.\d+)?|(?:{_WORD_NUMBER})\b)(?P<half_before>\s+and\s+a\s+half)?\s*"
+    r"(?P<unit>hours?|hrs?|minutes?|mins?|seconds?|secs?)\b)"
+    r"(?P<half_after>\s+and\s+a\s+half)?"
+)
+
+
+def _to_number(token: str) -> float:
+    token = token.strip()
+    if token[0].isdigit():
+        return float(token)
+    if token in _PHRASES:
+        return _PHRASES[token]
+    if token in _ONES:
+        return _ONES[token]
+    parts = re.split(r"[\s-]", token)
+    return _TENS[parts[0]] + (_ONES[parts[1]] if len(parts) > 1 else 0)
+
+
+def parse_duration(text: str) -> Optional[int]:
+    """'1 hour and 30 minutes' -> 5400, 'half an hour' -> 1800, 'five mins' -> 300"""
+    total = 0.0
+    for match in _DURATION.finditer(text):
+        amount = _to_number(match.group("number") or match.group("digits"))
+        if match.group("half_before") or match.group("half_after"):
+            amount += 0.5
+        unit = (match.group("unit") or match.group("abbr")).rstrip("s") or "s"
+        total += amount * _UNITS[unit]
+    return int(total) if total > 0 else None
+
+
+# ── Classifier ─────────────────────────────────────
+
+def normalize_utterance(text: str) -> str:
+    text = text.lower().replace("'", "").replace("’", "")
+    text = _PUNCTUATION.sub(" ", text)
+    text = re.sub(r"\s+", " ", text).strip().rstrip(".")
+    return _FILLER.sub("", text).strip()
+
+
+def classify_intent(text: str) -> dict:
+    """
+    Returns {"intent": ..., "confidence": float} plus "duration_seconds" for
+    TIMER. Pure regex over precompiled patterns; no I/O.
+    """
+    utterance = normalize_utterance(text)
+    if not utterance:
+        return {"intent": "UNKNOWN", "confidence": 0.0}
+
+    for intent, pattern in _EXACT.items():
+        if pattern.match(utterance):
+            return {"intent": intent, "confidence": 0.95}
+
+    question = _QUESTION.match(utterance) is not None
+    duration = parse_duration(utterance)
+    if question and _TIMER_WORDS.search(utterance):
+        return {"intent": "TIMER", "duration_seconds": duration or 300, "confidence": 0.6}
+    if duration is not None and not question:
+        confidence = 0.95 if _TIMER_WORDS.search(utterance) or re.search(r"\b(?:for|in)\b", utterance) else 0.85
+        return {"intent": "TIMER", "duration_seconds": duration, "confidence": confidence}
+    if _TIMER_WORDS.search(utterance):
+        # "set a timer" – a timer for sure, but how long is a guess
+        return {"intent": "TIMER", "duration_seconds": 300, "confidence": 0.7}
+
+    if _INGREDIENT.match(utterance):
+        return {"intent": "INGREDIENT", "confidence": 0.85}
+
+    short = len(utterance.split()) <= 3
+    for intent, pattern in _PREFIX.items():
+        if pattern.match(utterance):
+            return {"intent": intent, "confidence": 0.85 if short else 0.6}
+    for intent, pattern in _ANYWHERE.items():
+        if pattern.search(utterance):
+            return {"intent": intent, "confidence": 0.6}
+
+    return {"intent": "UNKNOWN", "confidence": 0.0}
@@ -0,0 +1,172 @@
+"""
+ChefMentor X – Recipe Enrichment Pipeline
+
+Runs once per recipe when it enters the catalogue (seed, AI generation,
+imports) or from the backfill CLI, instead of once per step while someone
+is cooking. One fused LLM call (AIMentorService.enrich_recipe_steps)
+returns, for every step still needing it:
+
+- a tip                       -> RecipeStep.ai_tips
+- a food safety verdict       -> RecipeStep.safety_safe / safety_warnings
+- timer data                  -> RecipeStep.duration_minutes / timer_required
+
+A step needs the call when it has no tip or its safety verdict is missing
+or stale (the instruction text changed since it was checked,
+safety_instruction_hash). The local safety rules settle steps that only
+need a verdict, and are merged into the LLM's answer so an obvious
+hazard is never dropped. A duration the LLM leaves out is taken from an
+explicit number in the instruction ("simmer for 10 minutes").
+
+CookingService then serves stored tips, verdicts and timers with zero AI
+calls on the hot path.
+"""
+
+import hashlib
+import re
+from datetime import datetime
+from typing import Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.recipe import Recipe, RecipeStep
+from app.services.ai_cache import normalize_text
+from app.services.ai_mentor import AIMentorService
+from app.services.ai_providers import AIClientRegistry
+from app.services.safety_rules import prefilter_safety
+
+
+# Only explicit numbers: "as needed" or "a minute or so" aren't timer data
+_STATED_DURATION = re.compile(r"\b(\d+(?:\.\d+)?)\s*(hours?|hrs?|minutes?|mins?|seconds?|secs?)\b")
+_UNIT_MINUTES = {"h": 60, "m": 1, "s": 1 / 60}
+
+
+def stated_minutes(instruction: str) -> Optional[int]:
+    """'Simmer for 1 hour 30 minutes' -> 90, 'Stir as needed' -> None"""
+    total = sum(
+        float(amount) * _UNIT_MINUTES[unit[0]]
+        for amount, unit in _STATED_DURATION.findall(instruction.lower())
+    )
+    return max(1, round(total)) if total else None
+
+
+def instruction_hash(instruction: str) -> str:
+    return hashlib.sha256(normalize_text(instruction).encode()).hexdigest()
+
+
+def safety_is_current(step: RecipeStep) -> bool:
+    return step.safety_instruction_hash == instruction_hash(step.instruction)
+
+
+def _merge_verdicts(rule: Optional[dict], llm: dict) -> dict:
+    """A rule hit always stands; the LLM can only add warnings to it."""
+    if rule is None:
+        return {"safe": llm["safe"], "warnings": llm["warnings"]}
+    warnings = list(rule["warnings"])
+    warnings += [warning for warning in llm["warnings"] if warning not in warnings]
+    return {"safe": rule["safe"] and llm["safe"], "warnings": warnings}
+
+
+class RecipeEnrichmentService:
+    def __init__(self, db: AsyncSession, registry: AIClientRegistry = None):
+        self.db = db
+        self.ai = AIMentorService(registry)
+        self.llm_failures = 0  # recipes left partly unenriched because the LLM call failed
+
+    async def enrich_steps(self, title: str, steps: Sequence[RecipeStep], overwrite: bool = False) -> int:
+        """
+        Fills tips, safety verdicts and timer data on the given (possibly not
+        yet committed) steps. Returns the number of steps updated; the caller
+        commits.
+        """
+        pending = sorted(
+            (step for step in steps if overwrite or not step.ai_tips or not safety_is_current(step)),
+            key=lambda step: step.step_number,
+        )
+        if not pending:
+            return 0
+
+        updated = 0
+        needs_llm = []
+        for step in pending:
+            rule = prefilter_safety(step.instruction)
+            if overwrite or not step.ai_tips or rule is None:
+                needs_llm.append((step, rule))
+            else:
+                self._store_verdict(step, rule)
+                self._store_timer(step, None, None, overwrite)
+                updated += 1
+
+        if not needs_llm:
+            return updated
+
+        results = await self.ai.enrich_recipe_steps(title, [step.instruction for step, _ in needs_llm])
+        if results is None:
+            print(f"⚠️ Step enrichment failed for '{title}', will retry on next enrichment")
+            self.llm_failures += 1
+            # Keep what the local rules could settle; the rest is retried
+            for step, rule in needs_llm:
+                if rule is not None:
+                    self._store_verdict(step, rule)
+                    self._store_timer(step, None, None, overwrite)
+                    updated += 1
+            return updated
+
+        for (step, rule), result in zip(needs_llm, results):
+            if overwrite or not step.ai_tips:
+                step.ai_tips = result["tip"]
+            self._store_verdict(step, _merge_verdicts(rule, result))
+            self._store_timer(step, result.get("duration_minutes"), result["timer_required"], overwrite)
+        return updated + len(needs_llm)
+
+    def _store_verdict(self, step: RecipeStep, verdict: dict) -> None:
+        step.safety_safe = verdict["safe"]
+        step.safety_warnings = verdict["warnings"]
+        step.safety_instruction_hash = instruction_hash(step.instruction)
+
+    def _store_timer(self, step: RecipeStep, minutes: Optional[int], timer_required: Optional[bool], overwrite: bool) -> None:
+        """
+        LLM timer data first, falling back to a duration stated in the
+        instruction. timer_required is the LLM's call as given; None (no LLM
+        answer) means a timer whenever a duration is stated.
+        """
+        if step.duration_minutes is not None and not overwrite:
+            return
+        if minutes is None:
+            minutes = stated_minutes(step.instruction)
+        step.duration_minutes = minutes
+        step.timer_required = bool(minutes) if timer_required is None else timer_required
+
+    async def enrich_recipe(self, recipe_id, overwrite: bool = False) -> Optional[int]:
+        """
+        Loads a stored recipe, fills its tips, safety verdicts and timers and
+        commits. Returns the number of steps updated, None if the recipe
+        doesn't exist.
+        """
+        result = await self.db.execute(
+            select(Recipe).options(selectinload(Recipe.steps)).where(Recipe.id == recipe_id)
+        )
+        recipe = result.scalar_one_or_none()
+        if recipe is None:
+            return None
+
+        updated = await self.enrich_steps(recipe.title, recipe.steps, overwrite=overwrite)
+        if updated:
+            # New version for step_cache: sessions starting later load the new steps
+            recipe.updated_at = datetime.utcnow()
+            await self.db.commit()
+            from app.services.step_cache import step_cache
+            step_cache.invalidate(recipe.id)
+        return updated
+
+
+async def enrich_recipe_in_background(recipe_id) -> None:
+    """BackgroundTasks entry point: its own DB session, never raises."""
+    from app.db.base import AsyncSessionLocal
+
+    try:
+        async with AsyncSessionLocal() as db:
+            await RecipeEnrichmentService(db).enrich_recipe(recipe_id)
+    except Exception as e:
+        print(f"⚠️ Enrichment failed for recipe {recipe_id}, the backfill will retry it: {e}")
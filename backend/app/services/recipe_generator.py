@@ -1,19 +1,27 @@
-import google.generativeai as genai
-from app.core.config import settings
 from app.models.recipe import Recipe, RecipeStep, DifficultyLevel
+from app.services.ai_providers import AIClientRegistry, get_registry
+from app.services.ai_routing import get_routes, run_route
+from app.services.recipe_enrichment import RecipeEnrichmentService, enrich_recipe_in_background
+from app.services.structured_output import parse_json
+from app.schemas.ai import GeneratedRecipe
 from sqlalchemy.ext.asyncio import AsyncSession
-import json
+from fastapi import BackgroundTasks
+from functools import partial
 import uuid
 
 class RecipeGeneratorService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, registry: AIClientRegistry = None):
         self.db = db
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        registry = registry or get_registry()
+        self.gemini = registry.gemini
+        self.groq = registry.groq
+        self.enrichment = RecipeEnrichmentService(db, registry)
 
-    async def generate_from_name(self, dish_name: str) -> Recipe:
+    async def generate_from_name(self, dish_name: str, background_tasks: BackgroundTasks = None) -> Recipe:
         """
         Generates a full recipe from a dish name using AI, saves it to DB, and returns it.
+        Tips, safety verdicts and timers are filled afterwards: in the background
+        when background_tasks is given, otherwise best-effort before returning.
         """
         prompt = f"""
         Create a detailed cooking recipe for "{dish_name}".
@@ -36,10 +44,7 @@ class RecipeGeneratorService:
         """
         
         try:
-            response = await self.model.generate_content_async(prompt)
-            # Clean markdown
-            clean_text = response.text.replace('```json', '').replace('```', '').strip()
-            data = json.loads(clean_text)
+            data, ai_model = await self._generate(prompt)
             
             # Map difficulty to database enum values
             difficulty_map = {
@@ -70,7 +75,7 @@ class RecipeGeneratorService:
                 is_active=True,
                 is_featured=False,
                 ai_generated=True,
-                ai_model="gemini-2.5-flash"
+                ai_model=ai_model
             )
             self.db.add(recipe)
             await self.db.flush() # Get ID
@@ -87,8 +92,47 @@ class RecipeGeneratorService:
             
             await self.db.commit()
             await self.db.refresh(recipe)
-            return recipe
             
         except Exception as e:
             print(f"Recipe Generation Error: {e}")
             raise e
+        
+        # Tips, safety verdicts and timers for every step in one call, so
+        # cooking never waits on AI. Never fails the generation: the
+        # backfill picks up anything left unenriched
+        if background_tasks:
+            background_tasks.add_task(enrich_recipe_in_background, recipe.id)
+        else:
+            try:
+                await self.enrichment.enrich_recipe(recipe.id)
+            except Exception as e:
+                print(f"⚠️ Enrichment failed for '{recipe.title}', the backfill will retry it: {e}")
+                await self.db.rollback()
+            await self.db.refresh(recipe)
+        return recipe
+
+    async def _generate(self, prompt: str) -> tuple[dict, str]:
+        """
+        Tries the "recipe" routes in order (Gemini → Groq by default).
+        Returns (recipe_data, model_name). Every route sits behind the shared
+        provider circuit breakers and admission controllers; the next one is
+        only asked when a route fails or its answer can't be recovered into
+        a recipe.
+        """
+        providers = {"gemini": self.gemini, "groq": self.groq}
+        routes = get_routes("recipe")
+        for i, route in enumerate(routes):
+            try:
+                response_text = await run_route("recipe", route, partial(
+                    providers[route.provider].generate,
+                    prompt,
+                    max_tokens=route.max_tokens,
+                    temperature=0.4,
+                    json_mode=True,
+                    model=route.model,
+                ))
+                return parse_json(response_text, GeneratedRecipe), route.model
+            except Exception as e:
+                if i == len(routes) - 1:
+                    raise
+                print(f"⚠️ {route.model} recipe generation failed: {e}")
@@ -0,0 +1,166 @@
+"""
+ChefMentor X – Local Food Safety Prefilter
+
+Most instructions are obviously safe ("chop the onions") and most hazards
+are lexical ("raw chicken", "same cutting board", "thaw on the counter"),
+so one pass of a compiled Aho-Corasick automaton over the instruction
+settles the bulk of the catalogue in microseconds:
+
+- DANGER phrase          → unsafe, with warnings
+- no RISK phrase         → safe
+- RISK + MITIGATION      → safe ("cook the chicken until no longer pink",
+                           or a safe internal temperature)
+- RISK, no MITIGATION    → ambiguous: escalate to the LLM
+
+Only the ambiguous slice ever costs an LLM call.
+"""
+
+import re
+from collections import deque
+from typing import Optional
+
+from app.services.ai_cache import normalize_text
+
+DANGER = "danger"
+RISK = "risk"
+MITIGATION = "mitigation"
+
+safety_rule_stats = {"safe": 0, "unsafe": 0, "escalated": 0}
+
+# phrase -> (category, warning shown for DANGER phrases)
+RULES: dict[str, tuple[str, Optional[str]]] = {}
+
+_DANGER_PHRASES = {
+    "Cross-contamination: wash boards, knives and hands after handling raw meat": [
+        "same cutting board", "same chopping board", "same knife", "same plate",
+        "without washing", "reuse the marinade", "use the marinade as a sauce", "raw juices",
+    ],
+    "Thaw in the fridge or cold water, never at room temperature": [
+        "thaw on the counter", "defrost on the counter", "thaw at room temperature",
+        "defrost at room temperature", "on the counter overnight", "overnight on the counter",
+    ],
+    "Refrigerate perishables within 2 hours": [
+        "leave out overnight", "leave it out overnight", "room temperature overnight",
+        "unrefrigerated overnight", "leave out for several hours",
+    ],
+    "Cook poultry, pork and minced meat through – no pink centres": [
+        "undercooked chicken", "undercooked pork", "undercooked poultry", "pink chicken",
+        "chicken slightly pink", "pork slightly pink", "rare chicken", "rare pork", "rare burger",
+    ],
+    "Don't taste raw meat, eggs or batter": [
+        "taste the raw", "taste raw", "lick the spoon", "eat the raw dough",
+    ],
+}
+
+_RISK_PHRASES = [
+    "raw chicken", "raw poultry", "raw turkey", "raw pork", "raw meat", "raw beef",
+    "raw mince", "raw fish", "raw seafood", "raw shrimp", "raw prawns", "raw egg", "raw eggs",
+    "uncooked chicken", "uncooked meat", "uncooked egg", "uncooked eggs",
+    "chicken", "turkey", "duck", "poultry", "pork", "sausage", "sausages", "bacon",
+    "ground beef", "minced beef", "minced meat", "mince", "burger", "burgers", "patties", "meatballs",
+    "egg", "eggs", "egg yolk", "egg yolks", "fish", "salmon", "tuna", "shrimp", "prawns",
+    "shellfish", "mussels", "clams", "oysters", "scallops",
+    "leftover rice", "reheat", "reheated",
+]
+
+# Only explicit statements that the food ends up safe inside. A cooking verb
+# and a time ("fry for 1 minute", "bring to a boil"), surface colour ("until
+# golden"), texture ("until firm") and chilling ("refrigerate") say nothing
+# about the centre, so they're deliberately not here; neither is hygiene
+# advice, which doesn't make the food itself any safer
+_MITIGATION_PHRASES = [
+    "cooked through", "cook through", "until cooked", "fully cooked", "thoroughly cooked",
+    "no longer pink", "juices run clear", "opaque throughout", "opaque all the way through",
+    "until piping hot", "piping hot", "until the shells open", "pasteurized", "pasteurised",
+]
+
+for warning, phrases in _DANGER_PHRASES.items():
+    for phrase in phrases:
+        RULES[phrase] = (DANGER, warning)
+for phrase in _RISK_PHRASES:
+    RULES.setdefault(phrase, (RISK, None))
+for phrase in _MITIGATION_PHRASES:
+    RULES.setdefault(phrase, (MITIGATION, None))
+
+# Safe internal temperatures ("core temperature of 74°C", "165 F on a
+# thermometer") are easier as one regex. Only with "internal", "core" or
+# "thermometer" within a few words: an oven or pan at 200°C proves nothing
+_TEMPERATURE = r"(?:6[3-9]|[7-9]\d|1\d\d|2\d\d)\s*°?\s*[cf]\b"
+_PROBE = r"\b(?:internal|core|thermometer)\b"
+_SAFE_TEMPERATURE = re.compile(
+    rf"{_PROBE}(?:\W+\w+){{0,4}}?\W+{_TEMPERATURE}|\b{_TEMPERATURE}(?:\W+\w+){{0,4}}?\W+{_PROBE}"
+)
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: finds every pattern in one pass over the text."""
+
+    def __init__(self, patterns):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[str]] = [[]]
+
+        for pattern in patterns:
+            node = 0
+            for char in pattern:
+                if char not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[node][char] = len(self._goto) - 1
+                node = self._goto[node][char]
+            self._out[node].append(pattern)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text: str) -> list[tuple[int, str]]:
+        """[(start_index, pattern), ...] for every whole-word occurrence."""
+        matches = []
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for pattern in self._out[node]:
+                start = i - len(pattern) + 1
+                end = i + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                    matches.append((start, pattern))
+        return matches
+
+
+_matcher = AhoCorasick(RULES)
+
+
+def prefilter_safety(instruction: str) -> Optional[dict]:
+    """
+    Returns {"safe": bool, "warnings": [str]} when the rules are conclusive,
+    or None when the instruction should go to the LLM.
+    """
+    text = normalize_text(instruction)
+    categories = set()
+    warnings = []
+    for _, phrase in _matcher.find(text):
+        category, warning = RULES[phrase]
+        categories.add(category)
+        if warning and warning not in warnings:
+            warnings.append(warning)
+
+    if DANGER in categories:
+        safety_rule_stats["unsafe"] += 1
+        return {"safe": False, "warnings": warnings}
+    if RISK not in categories or MITIGATION in categories or _SAFE_TEMPERATURE.search(text):
+        safety_rule_stats["safe"] += 1
+        return {"safe": True, "warnings": []}
+
+    safety_rule_stats["escalated"] += 1
+    return None
@@ -0,0 +1,455 @@
+"""
+ChefMentor X – Hot Cooking Session State
+
+Every "next" tap used to commit to Postgres and every step read reloaded
+the session row. Active sessions now live in a Redis hash instead:
+
+1. cook:session:{id} holds recipe_id, the recipe version (step_cache.py),
+   step_index, status and one guidance:{n} field per prefetched step,
+   refreshed for COOKING_STATE_TTL_SECONDS on use
+2. Step transitions are one MULTI/EXEC (HINCRBY + SADD cook:dirty), so
+   concurrent taps never lose an increment
+3. Changed sessions are written behind to cooking_sessions in one batched
+   UPDATE every COOKING_STATE_FLUSH_SECONDS, and immediately when a
+   session completes. The dirty set lives in Redis, so any worker's
+   flusher writes it out, including advances made on a worker that
+   crashed or was redeployed before its next flush
+4. A missing hash (expired, Redis restarted) is rebuilt from Postgres,
+   under WATCH and only while the hash is still missing, so a rebuild
+   from a stale row never overwrites an advance made in the meantime
+
+Prefetched guidance is written through to cooking_step_guidance right
+away; it's produced in the background, off the tap path, and a rebuilt
+hash needs it. Postgres stays the durable record. Without Redis, reads and writes go
+straight to Postgres as before: in-process state can't be shared between
+workers, so it would serve stale steps.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from redis.exceptions import WatchError
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis import get_redis, mark_redis_failed
+from app.models.session import CookingSession, StepGuidance
+from app.services.step_cache import step_cache
+
+COMPLETED = "completed"
+DIRTY_KEY = "cook:dirty"
+FLUSH_BATCH = 500
+_GUIDANCE = "guidance:"
+
+
+def _as_uuid(session_id) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(str(session_id))
+    except ValueError:
+        return None
+
+
+class SessionStateStore:
+    def __init__(self, ttl_seconds: int, flush_interval: float):
+        self.ttl_seconds = ttl_seconds
+        self.flush_interval = flush_interval
+        self._flusher: Optional[asyncio.Task] = None
+        self.stats = {"redis_hits": 0, "db_loads": 0, "advances": 0, "flushed": 0, "flush_errors": 0}
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"cook:session:{session_id}"
+
+    @staticmethod
+    def _from_row(session: CookingSession, version: str, guidance: Optional[dict[int, str]] = None) -> dict:
+        return {
+            "recipe_id": str(session.recipe_id),
+            "recipe_version": version,
+            "step_index": int(session.current_step_index or 0),
+            "status": session.status or "in_progress",
+            "guidance": guidance or {},
+        }
+
+    @staticmethod
+    def _decode(raw: dict) -> dict:
+        return {
+            "recipe_id": raw["recipe_id"],
+            "recipe_version": raw.get("recipe_version", ""),
+            "step_index": int(raw["step_index"]),
+            "status": raw.get("status", "in_progress"),
+            "guidance": {
+                int(field[len(_GUIDANCE):]): text
+                for field, text in raw.items()
+                if field.startswith(_GUIDANCE)
+            },
+        }
+
+    @staticmethod
+    async def _row(db: AsyncSession, session_id: str) -> Optional[CookingSession]:
+        session_uuid = _as_uuid(session_id)
+        return await db.get(CookingSession, session_uuid) if session_uuid else None
+
+    @staticmethod
+    async def _stored_guidance(db: AsyncSession, session: CookingSession) -> dict[int, str]:
+        """Guidance rows for the current step onwards."""
+        result = await db.execute(
+            select(StepGuidance.step_index, StepGuidance.guidance).where(
+                StepGuidance.session_id == session.id,
+                StepGuidance.step_index >= int(session.current_step_index or 0),
+            )
+        )
+        return dict(result.all())
+
+    # ── Reads ──────────────────────────────────────────
+
+    async def get(self, db: AsyncSession, session_id: str) -> Optional[dict]:
+        """
+        {"recipe_id", "recipe_version", "step_index", "status", "guidance"},
+        guidance mapping step index -> prefetched text. None if the session
+        doesn't exist.
+        """
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                raw = await redis.hgetall(self._key(session_id))
+                if raw.get("recipe_id"):
+                    self.stats["redis_hits"] += 1
+                    await redis.expire(self._key(session_id), self.ttl_seconds)
+                    return self._decode(raw)
+            except Exception as e:
+                mark_redis_failed(e)
+                redis = None
+
+        session = await self._row(db, session_id)
+        if session is None:
+            return None
+        self.stats["db_loads"] += 1
+        state = self._from_row(
+            session,
+            await step_cache.version_of(db, session.recipe_id),
+            await self._stored_guidance(db, session),
+        )
+        if redis is not None:
+            await self._hydrate(session_id, state)
+        return state
+
+    async def _hydrate(self, session_id: str, state: dict) -> None:
+        redis = await get_redis()
+        if redis is None:
+            return
+        mapping = {
+            "recipe_id": state["recipe_id"],
+            "recipe_version": state["recipe_version"],
+            "step_index": state["step_index"],
+            "status": state["status"],
+            **{f"{_GUIDANCE}{index}": text for index, text in state["guidance"].items()},
+        }
+        try:
+            key = self._key(session_id)
+            async with redis.pipeline(transaction=True) as pipe:
+                await pipe.watch(key)
+                if await pipe.hexists(key, "recipe_id"):
+                    return  # another request rebuilt it first; its state is at least as new
+                pipe.multi()
+                pipe.delete(key)
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, self.ttl_seconds)
+                await pipe.execute()
+        except WatchError:
+            pass  # written to while we loaded the row; that write wins
+        except Exception as e:
+            mark_redis_failed(e)
+
+    # ── Writes ─────────────────────────────────────────
+
+    async def create(self, session: CookingSession, recipe_version: str) -> None:
+        """Cache a session that was just inserted; nothing to write behind yet."""
+        await self._hydrate(str(session.id), self._from_row(session, recipe_version))
+
+    async def advance(self, db: AsyncSession, session_id: str) -> Optional[dict]:
+        """Atomically move to the next step. Returns the new state."""
+        self.stats["advances"] += 1
+        redis = await get_redis()
+        if redis is not None:
+            # Second attempt covers a hash that expired between the two calls
+            for _ in range(2):
+                if await self.get(db, session_id) is None:
+                    return None
+                try:
+                    key = self._key(session_id)
+                    async with redis.pipeline(transaction=True) as pipe:
+                        # Guidance for steps already passed stays until the hash
+                        # expires; a rebuild from Postgres leaves it out
+                        pipe.hincrby(key, "step_index", 1)
+                        pipe.expire(key, self.ttl_seconds)
+                        pipe.sadd(DIRTY_KEY, session_id)
+                        pipe.hgetall(key)
+                        *_, raw = await pipe.execute()
+                except Exception as e:
+                    mark_redis_failed(e)
+                    break
+                if raw.get("recipe_id"):
+                    return self._decode(raw)
+                await redis.delete(key)
+
+        session = await self._row(db, session_id)
+        if session is None:
+            return None
+        session.current_step_index = str(int(session.current_step_index) + 1)
+        await db.commit()
+        return self._from_row(
+            session,
+            await step_cache.version_of(db, session.recipe_id),
+            await self._stored_guidance(db, session),
+        )
+
+    async def set_guidance(self, db: AsyncSession, session_id: str, guidance: dict[int, str]) -> None:
+        """Store guidance for one or more steps (step index -> text) in Postgres and the hot state."""
+        session_uuid = _as_uuid(session_id)
+        if session_uuid is None or not guidance:
+            return
+        for index, text in guidance.items():
+            await db.merge(StepGuidance(session_id=session_uuid, step_index=index, guidance=text))
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Another worker stored the same step first, or the session is gone
+            await db.rollback()
+            return
+
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                key = self._key(session_id)
+                if await redis.exists(key):
+                    await redis.hset(key, mapping={f"{_GUIDANCE}{index}": text for index, text in guidance.items()})
+            except Exception as e:
+                mark_redis_failed(e)
+
+    async def update(
+        self,
+        db: AsyncSession,
+        session_id: str,
+        step_index: Optional[int] = None,
+        status: Optional[str] = None,
+    ) -> Optional[dict]:
+        """Set the step and/or status directly (history and resume screens). Returns the new state."""
+        fields = {}
+        if step_index is not None:
+            fields["step_index"] = step_index
+        if status is not None:
+            fields["status"] = status
+        if not fields:
+            return await self.get(db, session_id)
+
+        redis = await get_redis()
+        if redis is not None:
+            # Second attempt covers a hash that expired between the two calls
+            for _ in range(2):
+                if await self.get(db, session_id) is None:
+                    return None
+                try:
+                    key = self._key(session_id)
+                    async with redis.pipeline(transaction=True) as pipe:
+                        pipe.hset(key, mapping=fields)
+                        pipe.expire(key, self.ttl_seconds)
+                        pipe.sadd(DIRTY_KEY, session_id)
+                        pipe.hgetall(key)
+                        *_, raw = await pipe.execute()
+                except Exception as e:
+                    mark_redis_failed(e)
+                    break
+                if raw.get("recipe_id"):
+                    if status is not None:
+                        # Status changes are rare and lists filter on the column,
+                        # so they're persisted now; steps wait for the flush
+                        await self.flush([session_id])
+                    return self._decode(raw)
+                await redis.delete(key)
+
+        session = await self._row(db, session_id)
+        if session is None:
+            return None
+        if step_index is not None:
+            session.current_step_index = str(step_index)
+        if status is not None:
+            if status == COMPLETED and session.status != COMPLETED:
+                session.completed_at = datetime.utcnow()
+            session.status = status
+        await db.commit()
+        return self._from_row(
+            session,
+            await step_cache.version_of(db, session.recipe_id),
+            await self._stored_guidance(db, session),
+        )
+
+    async def peek(self, session_ids: list[str]) -> dict[str, dict]:
+        """Hot state of the sessions cached in Redis, by id; no rebuilds, so cheap for lists."""
+        redis = await get_redis()
+        if redis is None or not session_ids:
+            return {}
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for session_id in session_ids:
+                    pipe.hgetall(self._key(session_id))
+                states = await pipe.execute()
+        except Exception as e:
+            mark_redis_failed(e)
+            return {}
+        return {
+            session_id: self._decode(raw)
+            for session_id, raw in zip(session_ids, states)
+            if raw.get("recipe_id")
+        }
+
+    async def delete(self, db: AsyncSession, session_id: str) -> bool:
+        """Delete the session, its guidance and its hot state. False if it doesn't exist."""
+        session = await self._row(db, session_id)
+        if session is None:
+            return False
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                # Before the row goes, so a flush can't race it with a stale write
+                await redis.srem(DIRTY_KEY, session_id)
+                await redis.delete(self._key(session_id))
+            except Exception as e:
+                mark_redis_failed(e)
+        await db.execute(delete(StepGuidance).where(StepGuidance.session_id == session.id))
+        await db.delete(session)
+        await db.commit()
+        return True
+
+    async def complete(self, db: AsyncSession, session_id: str) -> None:
+        """Mark the session completed and persist it now rather than on the next flush."""
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                key = self._key(session_id)
+                if await redis.exists(key):
+                    await redis.hset(key, "status", COMPLETED)
+                    await self.flush([session_id])
+                    return
+            except Exception as e:
+                mark_redis_failed(e)
+
+        session = await self._row(db, session_id)
+        if session is not None and session.status != COMPLETED:
+            session.status = COMPLETED
+            session.completed_at = datetime.utcnow()
+            await db.commit()
+
+    # ── Write-behind ───────────────────────────────────
+
+    async def flush(self, session_ids: Optional[list[str]] = None) -> int:
+        """
+        Persist the current Redis state of changed sessions (every session in
+        the shared dirty set, or just session_ids) in batched transactions.
+        Returns how many were written.
+        """
+        redis = await get_redis()
+        if redis is None:
+            return 0  # state is unreachable until Redis is back; the dirty set keeps it
+        written = 0
+        while True:
+            try:
+                if session_ids is None:
+                    # SPOP claims the batch, so two workers never write the same
+                    # sessions. A worker dying mid-write drops only that claim;
+                    # the session's next change marks it dirty again
+                    batch = await redis.spop(DIRTY_KEY, FLUSH_BATCH) or []
+                else:
+                    batch = list(session_ids)
+                    await redis.srem(DIRTY_KEY, *batch)
+            except Exception as e:
+                mark_redis_failed(e)
+                return written
+            if not batch:
+                return written
+
+            flushed = await self._write(redis, batch)
+            if flushed is None:
+                return written
+            written += flushed
+            if session_ids is not None or len(batch) < FLUSH_BATCH:
+                return written
+
+    async def _write(self, redis, batch: list[str]) -> Optional[int]:
+        """One batch to Postgres. None (and the batch back in the dirty set) on failure."""
+        from app.db.base import AsyncSessionLocal
+
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for session_id in batch:
+                    pipe.hgetall(self._key(session_id))
+                states = await pipe.execute()
+
+            rows = []
+            for session_id, raw in zip(batch, states):
+                if not raw.get("recipe_id"):
+                    continue  # expired before we got to it; its last flush stands
+                state = self._decode(raw)
+                row = {
+                    "id": uuid.UUID(session_id),
+                    "current_step_index": str(state["step_index"]),
+                    "status": state["status"],
+                }
+                if state["status"] == COMPLETED:
+                    row["completed_at"] = datetime.utcnow()
+                rows.append(row)
+
+            if rows:
+                async with AsyncSessionLocal() as session:
+                    # One executemany per column set (completed rows also set completed_at)
+                    for group in (
+                        [row for row in rows if "completed_at" not in row],
+                        [row for row in rows if "completed_at" in row],
+                    ):
+                        if group:
+                            await session.execute(update(CookingSession), group)
+                    await session.commit()
+        except Exception as e:
+            print(f"⚠️ Cooking session flush failed, will retry: {e}")
+            self.stats["flush_errors"] += 1
+            try:
+                await redis.sadd(DIRTY_KEY, *batch)
+            except Exception as e:
+                mark_redis_failed(e)
+            return None
+
+        self.stats["flushed"] += len(rows)
+        return len(rows)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the background flusher. Call this on application startup."""
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write out anything still pending. Call this on shutdown."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+
+    def snapshot(self) -> dict:
+        return dict(self.stats)
+
+
+session_state = SessionStateStore(
+    ttl_seconds=settings.COOKING_STATE_TTL_SECONDS,
+    flush_interval=settings.COOKING_STATE_FLUSH_SECONDS,
+)
@@ -0,0 +1,135 @@
+"""
+ChefMentor X – Pipelined Spoken Answers
+
+Hands-free cooks used to wait for the whole chat answer and then for the
+whole answer to be synthesized before hearing anything. The pipeline
+overlaps the three stages instead:
+
+1. Chat tokens stream in from the LLM
+2. SentenceSplitter cuts them at sentence boundaries
+3. Each sentence goes to VoiceService.text_to_speech as soon as it's
+   complete, while generation continues, with at most
+   MAX_PARALLEL_SYNTHESIS sentences in flight
+4. Audio is handed to the client strictly in sentence order
+
+The first audio arrives roughly one sentence of generation plus one short
+synthesis after the request.
+"""
+
+import asyncio
+import re
+import time
+from collections import deque
+from typing import AsyncIterator, NamedTuple, Optional
+
+from app.services.voice import VoiceService
+
+MAX_PARALLEL_SYNTHESIS = 3
+# Fragments shorter than this ("Yes!") are spoken together with the next sentence
+MIN_SENTENCE_CHARS = 12
+# A run-on without punctuation is cut at a comma or space past this length
+MAX_SENTENCE_CHARS = 240
+LATENCY_WINDOW = 200
+
+# Sentence end: . ! ? (optionally closing quote/bracket) followed by whitespace
+_BOUNDARY = re.compile(r"[.!?]+[\"')\]]*\s+")
+_ABBREVIATIONS = ("e.g.", "i.e.", "approx.", "tsp.", "tbsp.", "oz.", "lb.", "min.", "mins.", "hr.", "vs.", "etc.", "dr.", "no.")
+
+speech_stats = {"answers": 0, "sentences": 0, "synthesis_failures": 0}
+_first_audio_latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+
+class SentenceSplitter:
+    """Incremental: feed() text as it arrives, get back the sentences it completed."""
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in _BOUNDARY.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()].strip()
+            if candidate.lower().endswith(_ABBREVIATIONS) or len(candidate) < MIN_SENTENCE_CHARS:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+
+        if len(self._buffer) > MAX_SENTENCE_CHARS:
+            cut = max(self._buffer.rfind(", ", 0, MAX_SENTENCE_CHARS), self._buffer.rfind(" ", 0, MAX_SENTENCE_CHARS))
+            if cut > 0:
+                sentences.append(self._buffer[:cut + 1].strip())
+                self._buffer = self._buffer[cut + 1:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        rest, self._buffer = self._buffer.strip(), ""
+        return rest or None
+
+
+class SpokenSentence(NamedTuple):
+    index: int
+    text: str
+    audio: Optional[bytes]  # None when synthesis failed; the client can fall back to on-device TTS
+
+
+async def speak_stream(chunks: AsyncIterator[str], voice: VoiceService) -> AsyncIterator[SpokenSentence]:
+    """
+    Sentences of the streamed answer with their audio, in order, each
+    synthesized as soon as its sentence is complete.
+    """
+    started = time.monotonic()
+    limit = asyncio.Semaphore(MAX_PARALLEL_SYNTHESIS)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def synthesize(text: str) -> Optional[bytes]:
+        async with limit:
+            buffer = await voice.text_to_speech(text)
+        if buffer is None:
+            speech_stats["synthesis_failures"] += 1
+            return None
+        return buffer.read()
+
+    def start(text: str) -> None:
+        queue.put_nowait((text, asyncio.create_task(synthesize(text))))
+
+    async def produce() -> None:
+        splitter = SentenceSplitter()
+        try:
+            async for chunk in chunks:
+                for sentence in splitter.feed(chunk):
+                    start(sentence)
+            rest = splitter.flush()
+            if rest:
+                start(rest)
+        finally:
+            queue.put_nowait(None)
+
+    producer = asyncio.create_task(produce())
+    index = 0
+    try:
+        while (item := await queue.get()) is not None:
+            text, task = item
+            audio = await task
+            if index == 0:
+                _first_audio_latencies.append(time.monotonic() - started)
+            speech_stats["sentences"] += 1
+            yield SpokenSentence(index, text, audio)
+            index += 1
+        await producer  # surfaces a failed chat stream
+        speech_stats["answers"] += 1
+    finally:
+        # Client went away or something failed: stop generating and synthesizing
+        producer.cancel()
+        while not queue.empty():
+            item = queue.get_nowait()
+            if item is not None:
+                item[1].cancel()
+
+
+def speech_snapshot() -> dict:
+    ordered = sorted(_first_audio_latencies)
+    p50 = ordered[len(ordered) // 2] if ordered else None
+    return {**speech_stats, "first_audio_p50_ms": round(p50 * 1000) if p50 is not None else None}
@@ -0,0 +1,111 @@
+"""
+ChefMentor X – Recipe Step Cache
+
+Recipes almost never change, yet every step read and prefetch reloaded
+and re-sorted the full step list. Steps are now loaded once per recipe
+version into an immutable, pre-sorted tuple of compact CachedStep
+records:
+
+- keyed by (recipe_id, recipes.updated_at); each cooking session carries
+  the version it started with, so a hit costs no query at all
+- derived fields are computed at load time (a stale safety verdict is
+  already None), so serving a step is pure tuple indexing
+- invalidate(recipe_id) drops every version of a recipe after it's
+  edited or re-enriched; writers also bump updated_at so sessions that
+  start afterwards key the new version
+"""
+
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.recipe import Recipe, RecipeStep
+from app.services.recipe_enrichment import safety_is_current
+
+MAX_RECIPES = 1024
+
+
+class CachedStep(NamedTuple):
+    step_number: int
+    instruction: str
+    expected_state: Optional[str]
+    ai_tips: Optional[str]
+    safety_warnings: Optional[tuple[str, ...]]  # None unless the stored verdict is current
+    duration_minutes: Optional[int]
+    timer_required: bool
+
+
+def recipe_version(updated_at: Optional[datetime]) -> str:
+    return updated_at.isoformat() if updated_at else ""
+
+
+def _compact(step: RecipeStep) -> CachedStep:
+    warnings = step.safety_warnings if safety_is_current(step) else None
+    return CachedStep(
+        step_number=step.step_number,
+        instruction=step.instruction,
+        expected_state=step.expected_state,
+        ai_tips=step.ai_tips,
+        safety_warnings=tuple(warnings) if warnings is not None else None,
+        duration_minutes=step.duration_minutes,
+        timer_required=bool(step.timer_required),
+    )
+
+
+class StepCache:
+    def __init__(self, max_recipes: int = MAX_RECIPES):
+        self.max_recipes = max_recipes
+        self._entries: OrderedDict[tuple[str, str], tuple[CachedStep, ...]] = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    async def get(self, db: AsyncSession, recipe_id: str, version: str) -> tuple[CachedStep, ...]:
+        """The recipe's steps ordered by step_number."""
+        key = (str(recipe_id), version)
+        steps = self._entries.get(key)
+        if steps is not None:
+            self.stats["hits"] += 1
+            self._entries.move_to_end(key)
+            return steps
+
+        self.stats["misses"] += 1
+        result = await db.execute(
+            select(RecipeStep)
+            .where(RecipeStep.recipe_id == uuid.UUID(str(recipe_id)))
+            .order_by(RecipeStep.step_number)
+        )
+        steps = tuple(_compact(step) for step in result.scalars().all())
+        self._entries[key] = steps
+        while len(self._entries) > self.max_recipes:
+            self._entries.popitem(last=False)
+        return steps
+
+    async def version_of(self, db: AsyncSession, recipe_id: str) -> str:
+        """Current version of a recipe, for sessions whose state doesn't carry one."""
+        result = await db.execute(select(Recipe.updated_at).where(Recipe.id == uuid.UUID(str(recipe_id))))
+        return recipe_version(result.scalar_one_or_none())
+
+    def invalidate(self, recipe_id) -> None:
+        """Drop every cached version of a recipe. Call after editing or regenerating its steps."""
+        stale = [key for key in self._entries if key[0] == str(recipe_id)]
+        for key in stale:
+            del self._entries[key]
+        self.stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.stats = dict.fromkeys(self.stats, 0)
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else None,
+            "recipes": len(self._entries),
+        }
+
+
+step_cache = StepCache()
@@ -0,0 +1,166 @@
+"""
+ChefMentor X – Precomputed Step FAQ
+
+Cooks ask the same handful of questions on each step ("can I use oil
+instead of butter?", "how do I know it's done?"), so instead of an LLM
+round trip for each:
+
+1. When a cooking session starts, a background job generates the likely
+   questions and answers for every step of the recipe in one call and
+   stores them on RecipeStep.faq (once per recipe, redone only when an
+   instruction changes – faq_instruction_hash)
+2. /cooking/chat matches the incoming question against that step's FAQ
+   with a local lexical index (app/services/text_similarity.py) and
+   answers in milliseconds when it's close enough
+3. Anything below CHAT_FAQ_MATCH_THRESHOLD goes to the LLM as before
+"""
+
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.models.recipe import Recipe, RecipeStep
+from app.services.ai_mentor import AIMentorService
+from app.services.ai_providers import AIClientRegistry
+from app.services.recipe_enrichment import instruction_hash
+from app.services.session_state import session_state
+from app.services.text_similarity import LexicalIndex
+
+MAX_INDEXES = 512
+
+faq_stats = {"hits": 0, "misses": 0, "no_faq": 0, "steps_precomputed": 0, "precompute_failures": 0}
+
+# (step id, faq_instruction_hash) -> index over that step's questions
+_indexes: OrderedDict[tuple[str, str], LexicalIndex[str]] = OrderedDict()
+
+
+def faq_is_current(step: RecipeStep) -> bool:
+    return step.faq is not None and step.faq_instruction_hash == instruction_hash(step.instruction)
+
+
+def _index_for(step: RecipeStep) -> LexicalIndex[str]:
+    key = (str(step.id), step.faq_instruction_hash)
+    index = _indexes.get(key)
+    if index is None:
+        index = LexicalIndex()
+        for pair in step.faq:
+            index.add(pair["question"], pair["answer"])
+        _indexes[key] = index
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    _indexes.move_to_end(key)
+    return index
+
+
+def _as_uuid(value) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+class StepFAQService:
+    def __init__(self, db: AsyncSession, registry: AIClientRegistry = None):
+        self.db = db
+        self.ai = AIMentorService(registry)
+
+    async def precompute_recipe(self, recipe_id, overwrite: bool = False) -> Optional[int]:
+        """
+        Generates and stores the FAQ for every step whose FAQ is missing or
+        stale, in one call, and commits. Returns the number of steps updated,
+        None if the recipe doesn't exist.
+        """
+        result = await self.db.execute(
+            select(Recipe).options(selectinload(Recipe.steps)).where(Recipe.id == recipe_id)
+        )
+        recipe = result.scalar_one_or_none()
+        if recipe is None:
+            return None
+
+        pending = sorted(
+            (step for step in recipe.steps if overwrite or not faq_is_current(step)),
+            key=lambda step: step.step_number,
+        )
+        if not pending:
+            return 0
+
+        faqs = await self.ai.generate_step_faqs(
+            recipe.title, [step.instruction for step in pending], settings.CHAT_FAQ_PER_STEP,
+        )
+        if faqs is None:
+            faq_stats["precompute_failures"] += 1
+            print(f"⚠️ FAQ generation failed for '{recipe.title}', will retry on the next session")
+            return 0
+
+        for step, pairs in zip(pending, faqs):
+            step.faq = pairs
+            step.faq_instruction_hash = instruction_hash(step.instruction)
+        await self.db.commit()
+        faq_stats["steps_precomputed"] += len(pending)
+        return len(pending)
+
+    async def answer(self, context: dict, session_id: Optional[str], question: str) -> Optional[str]:
+        """
+        The stored answer to the closest FAQ question for the cook's current
+        step, or None when there isn't a close enough one.
+        """
+        step = await self._current_step(context, session_id)
+        if step is None or not faq_is_current(step):
+            faq_stats["no_faq"] += 1
+            return None
+
+        match = _index_for(step).best(question, settings.CHAT_FAQ_MATCH_THRESHOLD)
+        if match is None:
+            faq_stats["misses"] += 1
+            return None
+        faq_stats["hits"] += 1
+        return match[1]
+
+    async def _current_step(self, context: dict, session_id: Optional[str]) -> Optional[RecipeStep]:
+        """From context {"recipe_id", "current_step"} or, failing that, the cooking session."""
+        recipe_id = _as_uuid(context["recipe_id"]) if context.get("recipe_id") else None
+        step_number = context.get("current_step")
+        step_number = int(step_number) if str(step_number).isdigit() else None
+        step_index = None
+        if (recipe_id is None or step_number is None) and session_id:
+            state = await session_state.get(self.db, session_id)
+            if state is not None:
+                recipe_id = recipe_id or uuid.UUID(state["recipe_id"])
+                step_index = state["step_index"]
+        if recipe_id is None:
+            return None
+
+        query = select(RecipeStep).where(RecipeStep.recipe_id == recipe_id)
+        if step_number is not None:
+            query = query.where(RecipeStep.step_number == step_number)
+        elif step_index is not None:
+            query = query.order_by(RecipeStep.step_number).offset(step_index).limit(1)
+        else:
+            return None
+        return (await self.db.execute(query)).scalars().first()
+
+
+async def precompute_faq_in_background(recipe_id: str) -> None:
+    """BackgroundTasks entry point: its own DB session, never raises."""
+    from app.db.base import AsyncSessionLocal
+
+    try:
+        async with AsyncSessionLocal() as db:
+            await StepFAQService(db).precompute_recipe(recipe_id)
+    except Exception as e:
+        faq_stats["precompute_failures"] += 1
+        print(f"⚠️ FAQ precompute failed for recipe {recipe_id}: {e}")
+
+
+def faq_snapshot() -> dict:
+    asked = faq_stats["hits"] + faq_stats["misses"]
+    return {
+        **faq_stats,
+        "hit_rate": round(faq_stats["hits"] / asked, 3) if asked else None,
+        "indexes": len(_indexes),
+    }
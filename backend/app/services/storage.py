@@ -1,7 +1,9 @@
 import cloudinary
 import cloudinary.uploader
 from app.core.config import settings
+from app.services.ai_backends import is_offline, offline_call, recorded, simulated_upload_url
 import asyncio
+import hashlib
 from functools import partial
 
 # Configure Cloudinary
@@ -16,13 +18,21 @@ class StorageService:
     async def upload_image(file_data) -> str:
         """Uploads image bytes to Cloudinary and returns the secure URL"""
         try:
-            # Upload to Cloudinary (run in thread pool as it's synchronous)
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                partial(cloudinary.uploader.upload, file_data, folder="chefmentor_failures")
-            )
-            return response["secure_url"]
+            digest = hashlib.sha256(file_data if isinstance(file_data, bytes) else str(file_data).encode()).hexdigest()
+            request = {"image_sha256": digest}
+            if is_offline():
+                return await offline_call("storage", request, lambda: simulated_upload_url(digest))
+            return await recorded("storage", request, partial(StorageService._upload, file_data))
         except Exception as e:
             print(f"Cloudinary Upload Error: {e}")
             raise e
+
+    @staticmethod
+    async def _upload(file_data) -> str:
+        # Upload to Cloudinary (run in thread pool as it's synchronous)
+        loop = asyncio.get_event_loop()
+        response = await loop.run_in_executor(
+            None,
+            partial(cloudinary.uploader.upload, file_data, folder="chefmentor_failures")
+        )
+        return response["secure_url"]
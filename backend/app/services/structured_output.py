@@ -0,0 +1,165 @@
+"""
+ChefMentor X – Tolerant Structured Output Parsing
+
+LLMs wrap JSON in chatter, code fences, trailing commas, single quotes or
+Python literals, and sometimes run out of tokens mid-object. Each of those
+used to fail json.loads and cost a full second call to the next provider.
+parse_json() recovers them locally instead:
+
+1. Plain json.loads on the fence-stripped text
+2. Balanced-bracket scan for the first complete JSON value in the text
+   (string-aware; truncated values are closed off)
+3. Repair of the common near-misses: smart quotes, single-quoted strings,
+   True/False/None, unquoted keys, trailing commas
+4. Optional schema validation (pydantic), filling defaults for missing
+   fields and unwrapping {"tips": [...]} when a bare list was asked for
+
+Only answers that are still unusable after all that raise
+StructuredOutputError and fall through to the next tier.
+"""
+
+import json
+import re
+from functools import lru_cache
+from typing import Any, Optional
+
+from pydantic import TypeAdapter, ValidationError
+
+MAX_CANDIDATES = 8
+
+structured_stats = {"clean": 0, "extracted": 0, "repaired": 0, "failed": 0}
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.S)
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'', re.S)
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_UNQUOTED_KEY = re.compile(r"([{,]\s*)([A-Za-z_]\w*)(\s*:)")
+_PY_LITERALS = re.compile(r"\b(True|False|None)\b")
+_PY_TO_JSON = {"True": "true", "False": "false", "None": "null"}
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+
+class StructuredOutputError(ValueError):
+    """The response held no recoverable JSON, or it didn't match the schema."""
+
+
+def _loads(text: str) -> Any:
+    return json.loads(text, strict=False)
+
+
+def _scan(text: str, start: int) -> str:
+    """
+    The JSON value opening at text[start], up to its matching bracket. If the
+    text ends first (truncated output) the open string and brackets are closed.
+    """
+    closers = []
+    quote = None
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if quote:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char in "{[":
+            closers.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if not closers or char != closers[-1]:
+                break
+            closers.pop()
+            if not closers:
+                return text[start:i + 1]
+    tail = text[start:].rstrip().rstrip(",")
+    return tail + (quote or "") + "".join(reversed(closers))
+
+
+def repair_json(text: str) -> str:
+    """Rewrites common near-JSON into JSON, touching only text outside string literals."""
+    text = text.translate(_SMART_QUOTES)
+    out = []
+    pos = 0
+    for match in _STRING.finditer(text):
+        out.append(_repair_code(text[pos:match.start()]))
+        literal = match.group(0)
+        if literal[0] == "'":
+            literal = json.dumps(literal[1:-1].replace("\\'", "'"))
+        out.append(literal)
+        pos = match.end()
+    out.append(_repair_code(text[pos:]))
+    return "".join(out)
+
+
+def _repair_code(code: str) -> str:
+    code = _PY_LITERALS.sub(lambda m: _PY_TO_JSON[m.group(1)], code)
+    code = _UNQUOTED_KEY.sub(r'\1"\2"\3', code)
+    return _TRAILING_COMMA.sub(r"\1", code)
+
+
+def _values(text: str):
+    """(value, how) for every JSON value recoverable from the text, best first."""
+    text = (text or "").strip()
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1).strip()
+
+    try:
+        yield _loads(text), "clean"
+        return
+    except json.JSONDecodeError:
+        pass
+
+    starts = [i for i, char in enumerate(text) if char in "{["][:MAX_CANDIDATES]
+    candidates = [_scan(text, start) for start in starts]
+    for candidate in candidates:
+        try:
+            yield _loads(candidate), "extracted"
+        except json.JSONDecodeError:
+            pass
+    for candidate in candidates:
+        try:
+            yield _loads(repair_json(candidate)), "repaired"
+        except json.JSONDecodeError:
+            pass
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def _validate(adapter: TypeAdapter, value: Any) -> Any:
+    try:
+        return adapter.validate_python(value)
+    except ValidationError:
+        # JSON-mode answers wrap a requested list in an object: {"tips": [...]}
+        if isinstance(value, dict) and len(value) == 1:
+            return adapter.validate_python(next(iter(value.values())))
+        raise
+
+
+def parse_json(text: str, schema: Optional[Any] = None) -> Any:
+    """
+    The first JSON value in an LLM response. With a schema (a pydantic model
+    or a type such as list[str]) it's the first value that validates,
+    returned as plain dicts/lists with defaults filled.
+    """
+    adapter = _adapter(schema) if schema is not None else None
+    error = None
+    for value, how in _values(text):
+        if adapter is not None:
+            try:
+                value = adapter.dump_python(_validate(adapter, value), mode="json", exclude_none=True)
+            except ValidationError as e:
+                error = e
+                continue
+        structured_stats[how] += 1
+        return value
+
+    structured_stats["failed"] += 1
+    if error is not None:
+        raise StructuredOutputError(str(error)) from error
+    raise StructuredOutputError(f"no JSON found in response: {(text or '')[:80]!r}")
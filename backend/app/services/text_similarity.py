@@ -0,0 +1,190 @@
+"""
+ChefMentor X – Local Text Similarity
+
+Cheap lexical matching for short cooking questions, so paraphrases of a
+question we already have an answer for never reach an LLM:
+
+- content tokens: normalized words minus filler, with plural/-ing/-ed
+  endings folded ("frying" ~ "fry", "eggs" ~ "egg")
+- character trigrams over those tokens, which absorb typos and word order
+
+similarity() blends token Jaccard with trigram Dice; LexicalIndex keeps
+the features precomputed and an inverted trigram index so a lookup only
+scores entries that share something with the query.
+
+Both features ignore word order, which is right for paraphrases but not
+for substitutions: "oil instead of butter" and "butter instead of oil"
+share every token. The substitution direction is parsed separately and
+reversed_substitution() rules such pairs out.
+
+For larger, growing collections MinHasher turns the same features into a
+fixed-size signature whose agreement estimates their Jaccard similarity,
+with LSH band keys so near-duplicates are found without scanning. Pure
+Python, no network, no embeddings.
+"""
+
+import random
+import re
+import zlib
+from typing import Any, Generic, Optional, TypeVar
+
+from app.services.ai_cache import normalize_text
+
+T = TypeVar("T")
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Question words stay: "how long" and "how do i know" are different questions
+STOPWORDS = frozenset("""
+a an the and or but if of to in on at for with by from into onto about as is are was were be been being
+do does did doing can could should would will shall may might must i me my we our you your it its
+this that these those there here so just really very still then than too also any some please ok okay
+im ive id its thats theres dont doesnt didnt cant couldnt wont isnt arent
+""".split())
+
+
+def _stem(word: str) -> str:
+    for suffix in ("ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)]
+    return word
+
+
+def content_tokens(text: str) -> frozenset[str]:
+    words = _WORD.findall(normalize_text(text).replace("'", "").replace("’", ""))
+    return frozenset(_stem(word) for word in words if word not in STOPWORDS)
+
+
+# Each pattern captures what gets used (new) and what it stands in for (old)
+_SUBSTITUTIONS = (
+    re.compile(r"^(?:instead of|in place of|rather than) (?P<old>[^,]+), (?P<new>.+)"),
+    re.compile(r"(?P<new>.*)\b(?:instead of|in place of|rather than) (?P<old>.+)"),
+    re.compile(r"\bsubstitute (?P<new>.+?) for (?P<old>.+)"),
+    re.compile(r"\b(?:replace|swap|substitute) (?:out )?(?P<old>.+?) (?:with|for|by) (?P<new>.+)"),
+)
+
+
+def substitution(text: str) -> Optional[tuple[frozenset[str], frozenset[str]]]:
+    """(new, old) content tokens of an "X instead of Y"-style question, None if it isn't one."""
+    text = normalize_text(text)
+    for pattern in _SUBSTITUTIONS:
+        match = pattern.search(text)
+        if match:
+            new, old = content_tokens(match["new"]), content_tokens(match["old"])
+            if new - old and old - new:
+                return new - old, old - new
+    return None
+
+
+def char_trigrams(tokens: frozenset[str]) -> frozenset[str]:
+    grams = set()
+    for token in tokens:
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class TextFeatures:
+    __slots__ = ("tokens", "grams", "swap")
+
+    def __init__(self, text: str):
+        self.tokens = content_tokens(text)
+        self.grams = char_trigrams(self.tokens)
+        self.swap = substitution(text)
+
+    @property
+    def shingles(self) -> frozenset[str]:
+        """Tokens and trigrams as one set; tokens are prefixed so "egg" the word != "egg" the trigram."""
+        return self.grams | {f"w:{token}" for token in self.tokens}
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+def reversed_substitution(a: TextFeatures, b: TextFeatures) -> bool:
+    """True when one question uses what the other replaces ("oil for butter" vs "butter for oil")."""
+    if a.swap is None or b.swap is None:
+        return False
+    return bool(a.swap[0] & b.swap[1] or a.swap[1] & b.swap[0])
+
+
+def similarity(a: TextFeatures, b: TextFeatures) -> float:
+    """0..1; identical questions modulo case, punctuation and filler score 1.0, reversed substitutions 0."""
+    if not a.grams or not b.grams or reversed_substitution(a, b):
+        return 0.0
+    dice = 2 * len(a.grams & b.grams) / (len(a.grams) + len(b.grams))
+    return 0.5 * jaccard(a.tokens, b.tokens) + 0.5 * dice
+
+
+class LexicalIndex(Generic[T]):
+    """Texts with a payload each; best() returns the closest one above a threshold."""
+
+    def __init__(self):
+        self._entries: list[tuple[TextFeatures, T]] = []
+        self._postings: dict[str, list[int]] = {}
+
+    def add(self, text: str, payload: T) -> None:
+        features = TextFeatures(text)
+        entry_id = len(self._entries)
+        self._entries.append((features, payload))
+        for gram in features.grams:
+            self._postings.setdefault(gram, []).append(entry_id)
+
+    def best(self, text: str, threshold: float) -> Optional[tuple[float, T]]:
+        query = TextFeatures(text)
+        candidates = {entry_id for gram in query.grams for entry_id in self._postings.get(gram, ())}
+        best: Optional[tuple[float, Any]] = None
+        for entry_id in candidates:
+            features, payload = self._entries[entry_id]
+            score = similarity(query, features)
+            if score >= threshold and (best is None or score > best[0]):
+                best = (score, payload)
+        return best
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+class MinHasher:
+    """
+    num_perm universal hash functions (a * x + b mod p) over crc32 of each
+    shingle. Signatures split into `bands` LSH bands: two texts share a band
+    key with high probability once their Jaccard similarity is high, so
+    band keys make a cheap candidate index.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.rows = num_perm // bands
+        self._perms = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, shingles: frozenset[str]) -> tuple[int, ...]:
+        if not shingles:
+            return (_MAX_HASH,) * self.num_perm
+        hashes = [zlib.crc32(shingle.encode()) for shingle in shingles]
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._perms
+        )
+
+    def band_keys(self, signature: tuple[int, ...]) -> list[tuple]:
+        return [
+            (band, signature[start:start + self.rows])
+            for band, start in enumerate(range(0, self.num_perm, self.rows))
+        ]
+
+
+def estimated_jaccard(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / len(a)
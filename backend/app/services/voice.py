@@ -1,54 +1,80 @@
+import hashlib
 import io
 from gtts import gTTS
 from groq import Groq
 from app.core.config import settings
+from app.services.ai_backends import (
+    SIMULATED_TRANSCRIPT,
+    TTS_BYTES_PER_CHAR,
+    is_offline,
+    offline_call,
+    recorded,
+    simulated_audio,
+)
 
 class VoiceService:
     def __init__(self):
-        self.groq = Groq(api_key=settings.GROQ_API_KEY)
+        self.groq = None if is_offline() else Groq(api_key=settings.GROQ_API_KEY)
 
     async def speech_to_text(self, audio_bytes: bytes, filename: str = "audio.wav") -> str:
         """
         Transcribes audio using Groq (Whisper).
         """
         try:
-            # Groq API expects a tuple (filename, file_content)
-            transcription = self.groq.audio.transcriptions.create(
-                file=(filename, audio_bytes),
-                model="whisper-large-v3",
-                response_format="json",
-                language="en",
-                temperature=0.0
-            )
-            return transcription.text
+            request = {"audio_sha256": hashlib.sha256(audio_bytes).hexdigest()}
+            if is_offline():
+                return await offline_call("stt", request, lambda: SIMULATED_TRANSCRIPT)
+            return await recorded("stt", request, lambda: self._transcribe(audio_bytes, filename))
         except Exception as e:
             print(f"STT Error: {e}")
             return ""
 
+    async def _transcribe(self, audio_bytes: bytes, filename: str) -> str:
+        # Groq API expects a tuple (filename, file_content)
+        transcription = self.groq.audio.transcriptions.create(
+            file=(filename, audio_bytes),
+            model="whisper-large-v3",
+            response_format="json",
+            language="en",
+            temperature=0.0
+        )
+        return transcription.text
+
     async def text_to_speech(self, text: str) -> io.BytesIO:
         """
         Converts text to speech using Google TTS.
         Returns bytes buffer of MP3 audio.
         """
         try:
-            import asyncio
-            from functools import partial
-            
-            # Create a BytesIO buffer to hold the MP3 data in memory
-            mp3_fp = io.BytesIO()
-            
-            # Generate speech (run in thread pool since gTTS is synchronous)
-            loop = asyncio.get_event_loop()
-            tts = gTTS(text=text, lang='en', slow=False)
-            
-            # Write to buffer in thread pool
-            await loop.run_in_executor(None, partial(tts.write_to_fp, mp3_fp))
-            
-            # Reset buffer position to the beginning
-            mp3_fp.seek(0)
-            return mp3_fp
+            # Recordings keep only the audio size; replay serves silence of that size
+            request = {"text": text}
+            if is_offline():
+                size = await offline_call("tts", request, lambda: str(len(text) * TTS_BYTES_PER_CHAR))
+                return simulated_audio(int(size))
+            return await recorded(
+                "tts", request, lambda: self._synthesize(text),
+                serialize=lambda buffer: str(buffer.getbuffer().nbytes),
+            )
         except Exception as e:
             print(f"TTS Error: {e}")
             import traceback
             traceback.print_exc()
             return None
+
+    async def _synthesize(self, text: str) -> io.BytesIO:
+        import asyncio
+        from functools import partial
+
+        # Create a BytesIO buffer to hold the MP3 data in memory
+        mp3_fp = io.BytesIO()
+
+        # Generate speech (run in thread pool since gTTS is synchronous)
+        loop = asyncio.get_event_loop()
+        tts = gTTS(text=text, lang='en', slow=False)
+
+        # Write to buffer in thread pool
+        await loop.run_in_executor(None, partial(tts.write_to_fp, mp3_fp))
+
+        # Reset buffer position to the beginning
+        mp3_fp.seek(0)
+        return mp3_fp
@@ -0,0 +1,109 @@
+"""
+ChefMentor X – Recipe Enrichment Backfill
+
+Fills stored tips, food safety verdicts and timer data for every recipe
+step that lacks them, one fused LLM call per recipe. Progress is checkpointed to
+a JSON file after each recipe, so an interrupted run picks up where it
+stopped. A checkpoint only resumes an unfinished run with the same flags;
+once a run gets through its whole list the next one starts fresh, so
+--all and --overwrite always see every recipe again.
+
+Run with:
+    python scripts/backfill_enrichment.py [--limit N] [--all] [--overwrite] [--restart]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+# Configure path to import from app
+backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(backend_dir)
+
+from app.db.base import AsyncSessionLocal
+from app.models.recipe import Recipe, RecipeStep
+from app.services.recipe_enrichment import RecipeEnrichmentService
+from sqlalchemy import or_, select
+
+DEFAULT_CHECKPOINT = os.path.join(backend_dir, '.backfill_enrichment.json')
+
+
+def load_checkpoint(path: str, mode: dict) -> dict:
+    if os.path.exists(path):
+        with open(path) as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("mode") == mode and not checkpoint.get("complete"):
+            return checkpoint
+    return {"mode": mode, "complete": False, "done": [], "failed": []}
+
+
+def save_checkpoint(path: str, checkpoint: dict) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)  # atomic: a crash never leaves a torn checkpoint
+
+
+async def backfill(checkpoint_path: str, limit: int = None, overwrite: bool = False, check_all: bool = False):
+    checkpoint = load_checkpoint(checkpoint_path, {"overwrite": overwrite, "all": check_all})
+    done = set(checkpoint["done"])
+
+    async with AsyncSessionLocal() as session:
+        query = select(Recipe.id, Recipe.title).order_by(Recipe.created_at)
+        if not (overwrite or check_all):
+            missing = select(RecipeStep.recipe_id).where(
+                or_(RecipeStep.ai_tips.is_(None), RecipeStep.safety_instruction_hash.is_(None))
+            )
+            query = query.where(Recipe.id.in_(missing))
+        recipes = [(str(recipe_id), title) for recipe_id, title in (await session.execute(query)).all()]
+
+    todo = [(recipe_id, title) for recipe_id, title in recipes if recipe_id not in done]
+    partial = bool(limit) and len(todo) > limit
+    if limit:
+        todo = todo[:limit]
+    print(f"🔄 {len(todo)} recipe(s) to enrich ({len(done)} already done)")
+
+    for i, (recipe_id, title) in enumerate(todo, 1):
+        # Fresh session per recipe: one failure never rolls back the others
+        async with AsyncSessionLocal() as session:
+            service = RecipeEnrichmentService(session)
+            updated = await service.enrich_recipe(recipe_id, overwrite=overwrite)
+
+        if service.llm_failures:
+            if recipe_id not in checkpoint["failed"]:
+                checkpoint["failed"].append(recipe_id)
+            print(f"   ⚠️  [{i}/{len(todo)}] {title}: AI unavailable, {updated or 0} step(s) settled locally")
+        else:
+            checkpoint["done"].append(recipe_id)
+            if recipe_id in checkpoint["failed"]:
+                checkpoint["failed"].remove(recipe_id)
+            if updated:
+                print(f"   ✅ [{i}/{len(todo)}] {title}: {updated} step(s) updated")
+            else:
+                print(f"   ✅ [{i}/{len(todo)}] {title}: already current")
+        save_checkpoint(checkpoint_path, checkpoint)
+
+    # Failed recipes aren't in "done", so a resumed run retries them
+    checkpoint["complete"] = not partial and not checkpoint["failed"]
+    save_checkpoint(checkpoint_path, checkpoint)
+    print(f"\n✅ Backfill complete. {len(checkpoint['done'])} done, {len(checkpoint['failed'])} failed.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate stored tips and safety verdicts for recipe steps.")
+    parser.add_argument("--limit", type=int, help="Enrich at most N recipes this run")
+    parser.add_argument("--all", action="store_true", help="Check every recipe, catching edited instructions")
+    parser.add_argument("--overwrite", action="store_true", help="Regenerate tips and verdicts that already exist")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Checkpoint file path")
+    parser.add_argument("--restart", action="store_true", help="Ignore the existing checkpoint")
+    args = parser.parse_args()
+
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    try:
+        asyncio.run(backfill(args.checkpoint, limit=args.limit, overwrite=args.overwrite, check_all=args.all))
+    except KeyboardInterrupt:
+        print("\n🛑 Backfill interrupted. Re-run to resume from the checkpoint.")
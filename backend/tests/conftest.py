@@ -103,3 +103,23 @@ async def client(db_session):
         yield c
     
     app.dependency_overrides.clear()
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    """Provider breakers, admission controllers, batchers and the chat answer and step caches are process-wide; don't let one test's load leak into another."""
+    from app.services import admission, ai_routing, circuit_breaker
+    from app.services.ai_mentor import guidance_batcher
+    from app.services.answer_cache import chat_answer_cache
+    from app.services.step_cache import step_cache
+    chat_answer_cache.clear()
+    step_cache.clear()
+    circuit_breaker._breakers.clear()
+    admission._controllers.clear()
+    ai_routing._stats.clear()
+    yield
+    circuit_breaker._breakers.clear()
+    admission._controllers.clear()
+    ai_routing._stats.clear()
+    guidance_batcher._pending.clear()
+    guidance_batcher._timer = None
+    guidance_batcher._runner = None
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.services import admission
+from app.services.admission import AdmissionController, AdmissionRejected
+from app.services.ai_mentor import AIMentorService
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped():
+    controller = AdmissionController("test", max_concurrent=2, max_queue=10, max_wait_seconds=1)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with controller.slot():
+            peak = max(peak, controller.in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(call() for _ in range(6)))
+
+    assert peak == 2
+    assert controller.stats["admitted"] == 6
+    assert controller.stats["queued_total"] == 4
+    assert controller.in_flight == 0 and controller.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_immediately():
+    controller = AdmissionController("test", max_concurrent=1, max_queue=1, max_wait_seconds=5)
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0.01)
+    assert controller.queued == 1
+
+    with pytest.raises(AdmissionRejected, match="queue full"):
+        async with controller.slot():
+            pass
+
+    release.set()
+    await asyncio.gather(holder, waiter)
+    assert controller.stats["rejected_queue_full"] == 1
+
+
+@pytest.mark.asyncio
+async def test_wait_budget_is_enforced():
+    controller = AdmissionController("test", max_concurrent=1, max_queue=5, max_wait_seconds=0.01)
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected, match="wait budget"):
+        async with controller.slot():
+            pass
+
+    release.set()
+    await holder
+    assert controller.stats["rejected_timeout"] == 1
+    assert controller.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_overloaded_gemini_falls_to_groq():
+    gemini = AdmissionController("gemini", max_concurrent=1, max_queue=0, max_wait_seconds=1)
+    admission._controllers["gemini"] = gemini
+    release = asyncio.Event()
+
+    async def hold():
+        async with gemini.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    with patch("google.generativeai.GenerativeModel.generate_content_async", new_callable=AsyncMock) as mock_gemini, \
+         patch("app.services.ai_providers.GroqProvider.chat", new_callable=AsyncMock) as mock_groq:
+        mock_groq.return_value = "Let the pan heat fully before adding oil."
+        tip = await AIMentorService().get_step_guidance("Sear the scallops under admission control")
+
+    release.set()
+    await holder
+
+    assert tip == "Let the pan heat fully before adding oil."
+    mock_gemini.assert_not_called()
+    assert gemini.stats["rejected_queue_full"] == 1
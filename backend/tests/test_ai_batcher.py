@@ -0,0 +1,76 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from app.services.ai_batcher import MicroBatcher
+from app.services.ai_mentor import AIMentorService, guidance_batcher
+
+
+@pytest.mark.asyncio
+async def test_window_collects_items_into_one_run():
+    batcher = MicroBatcher("test", max_items=10, max_wait_seconds=0.02)
+    runs = []
+
+    async def run(items):
+        runs.append(items)
+        return [item.upper() for item in items]
+
+    results = await asyncio.gather(
+        batcher.submit("a", "a", run),
+        batcher.submit("b", "b", run),
+        batcher.submit("a", "a", run),
+    )
+
+    assert results == ["A", "B", "A"]
+    assert runs == [["a", "b"]]
+    assert batcher.stats["deduplicated"] == 1
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting_for_the_window():
+    batcher = MicroBatcher("test", max_items=2, max_wait_seconds=60)
+
+    async def run(items):
+        return items
+
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.submit(1, 1, run), batcher.submit(2, 2, run)),
+        timeout=1,
+    )
+
+    assert results == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_reaches_every_caller():
+    batcher = MicroBatcher("test", max_items=10, max_wait_seconds=0.01)
+
+    async def run(items):
+        raise RuntimeError("provider down")
+
+    results = await asyncio.gather(
+        batcher.submit("a", "a", run),
+        batcher.submit("b", "b", run),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert batcher.stats["failed_batches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_distinct_steps_share_one_provider_call():
+    steps = ["Whisk the eggs", "Toast the cumin seeds", "Rest the steak"]
+
+    async def generate(prompt, *args, **kwargs):
+        response = MagicMock()
+        response.text = json.dumps([f"Tip {i}" for i in range(1, len(steps) + 1)])
+        return response
+
+    with patch("google.generativeai.GenerativeModel.generate_content_async", side_effect=generate) as mock_gen:
+        service = AIMentorService()
+        tips = await asyncio.gather(*(service.get_step_guidance(step) for step in steps))
+
+    assert mock_gen.call_count == 1
+    assert tips == ["Tip 1", "Tip 2", "Tip 3"]
+    assert guidance_batcher.stats["largest_batch"] >= 3
@@ -0,0 +1,138 @@
+import asyncio
+import pytest
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.services.ai_cache import AICache, LRUCache, normalize_text
+from app.services.ai_mentor import AIMentorService
+
+
+def test_normalized_instructions_share_a_key():
+    cache = AICache("test", max_entries=10, ttl_seconds=60)
+    a = cache.make_key("gemini-2.5-flash", "Boil 1.5 cups of  water in a pan.")
+    b = cache.make_key("gemini-2.5-flash", "boil 1.5 cups of water in a pan")
+    c = cache.make_key("llama-3.3-70b-versatile", "boil 1.5 cups of water in a pan")
+    assert a == b
+    assert a != c
+    assert normalize_text("  Stir\nWell!  ") == "stir well"
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(max_entries=2, ttl_seconds=60)
+    lru.set("a", "1")
+    lru.set("b", "2")
+    lru.get("a")  # "b" is now least recently used
+    lru.set("c", "3")
+
+    assert lru.get("b") is None
+    assert lru.get("a") == "1"
+    assert lru.get("c") == "3"
+    assert lru.evictions == 1
+
+
+def test_lru_expires_entries():
+    lru = LRUCache(max_entries=2, ttl_seconds=60)
+    lru.set("a", "1")
+    with patch("app.services.ai_cache.time.monotonic", return_value=time.monotonic() + 61):
+        assert lru.get("a") is None
+    assert len(lru) == 0
+
+
+@pytest.mark.asyncio
+async def test_step_guidance_is_served_from_cache():
+    """Second cook of the same step must not reach the provider"""
+    with patch("google.generativeai.GenerativeModel.generate_content_async", new_callable=AsyncMock) as mock_gen:
+        mock_gen.return_value.text = "Listen for a rolling boil."
+
+        service = AIMentorService()
+        first = await service.get_step_guidance("Bring a large pot of salted water to the boil")
+        second = await service.get_step_guidance("bring a large pot of salted water to the boil.")
+
+    assert first == second == "Listen for a rolling boil."
+    assert mock_gen.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_prompts_share_one_call():
+    """Hundreds of cooks reaching the same step at once cost one provider call"""
+    async def slow_generate(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        response = MagicMock()
+        response.text = "Keep the heat at a gentle simmer."
+        return response
+
+    with patch("google.generativeai.GenerativeModel.generate_content_async", side_effect=slow_generate) as mock_gen:
+        service = AIMentorService()
+        results = await asyncio.gather(*[
+            service.get_step_guidance("Simmer the stock for twenty minutes") for _ in range(20)
+        ])
+
+    assert set(results) == {"Keep the heat at a gentle simmer."}
+    assert mock_gen.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_propagates_errors_to_followers():
+    from app.services.ai_singleflight import SingleFlight
+
+    flight = SingleFlight("test")
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    results = await asyncio.gather(
+        *[flight.do("same", failing) for _ in range(5)], return_exceptions=True
+    )
+    assert calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flight.snapshot()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_survives_a_cancelled_leader():
+    from app.services.ai_singleflight import SingleFlight
+
+    flight = SingleFlight("test")
+    calls = 0
+
+    async def slow():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return "tip"
+
+    leader = asyncio.create_task(flight.do("same", slow))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("same", slow))
+    await asyncio.sleep(0)
+    leader.cancel()  # the leader's client disconnected
+
+    assert await follower == "tip"
+    assert leader.cancelled()
+    assert calls == 1
+    assert flight.snapshot()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancels_the_call_when_everyone_leaves():
+    from app.services.ai_singleflight import SingleFlight
+
+    flight = SingleFlight("test")
+    started, cancelled = asyncio.Event(), asyncio.Event()
+
+    async def slow():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    caller = asyncio.create_task(flight.do("same", slow))
+    await started.wait()
+    caller.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.services.ai_hedging import hedged
+from app.services.ai_mentor import AIMentorService
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_cancelled():
+    primary_cancelled = asyncio.Event()
+
+    async def slow_primary():
+        try:
+            await asyncio.sleep(5)
+            return "primary"
+        except asyncio.CancelledError:
+            primary_cancelled.set()
+            raise
+
+    async def fast_secondary():
+        return "secondary"
+
+    result = await hedged(slow_primary, fast_secondary, delay=0.01)
+    await asyncio.sleep(0)
+
+    assert result == "secondary"
+    assert primary_cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_never_starts_secondary():
+    secondary = AsyncMock(return_value="secondary")
+
+    async def primary():
+        return "primary"
+
+    assert await hedged(primary, secondary, delay=1.0) == "primary"
+    secondary.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_failed_primary_starts_secondary_without_waiting():
+    async def broken_primary():
+        raise ValueError("not JSON")
+
+    async def secondary():
+        return "secondary"
+
+    # A 10s delay would time the test out if we waited for it
+    result = await asyncio.wait_for(hedged(broken_primary, secondary, delay=10), timeout=1)
+    assert result == "secondary"
+
+
+@pytest.mark.asyncio
+async def test_both_failing_raises_last_error():
+    async def broken():
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        await hedged(broken, broken, delay=0.01)
+
+
+@pytest.mark.asyncio
+async def test_voice_intent_uses_groq_when_gemini_stalls():
+    async def stalled(*args, **kwargs):
+        await asyncio.sleep(5)
+
+    with patch("google.generativeai.GenerativeModel.generate_content_async", side_effect=stalled), \
+         patch("app.services.ai_providers.GroqProvider.chat", new_callable=AsyncMock) as mock_groq, \
+         patch("app.services.ai_mentor.hedge_delay", return_value=0.01):
+        mock_groq.return_value = '{"intent": "INGREDIENT"}'
+
+        service = AIMentorService()
+        result = await asyncio.wait_for(service.parse_voice_intent("could I swap the garlic for shallots"), timeout=1)
+
+    assert result == {"intent": "INGREDIENT"}
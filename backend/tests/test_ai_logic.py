@@ -46,8 +46,8 @@ async def test_voice_intent_parsing():
     # Mock Gemini for Intent
     mock_json = '{"intent": "TIMER", "duration_seconds": 300}'
     
-    # Note: The service runs synchronous code in a thread pool, so we mock generate_content
-    with patch("google.generativeai.GenerativeModel.generate_content") as mock_gen:
+    # The service uses the SDK's native async API
+    with patch("google.generativeai.GenerativeModel.generate_content_async", new_callable=AsyncMock) as mock_gen:
         mock_gen.return_value.text = mock_json
         
         service = AIMentorService()
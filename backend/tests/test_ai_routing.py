@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.core.config import settings
+from app.services import ai_routing
+from app.services.ai_mentor import AIMentorService
+from app.services.ai_routing import GROQ_FAST_MODEL, Route, get_routes, routing_snapshot
+from app.services.circuit_breaker import CircuitOpenError, OPEN, get_breaker
+
+
+def test_route_caps_the_callers_budget():
+    assert Route("groq", "m", 1000, 60).cap(100) == 60
+    assert Route("groq", "m", 1000, 60).cap(None) == 60
+    assert Route("gemini", "m", 1000).cap(250) == 250
+
+
+def test_environment_overrides_replace_a_tasks_routes(monkeypatch):
+    monkeypatch.setattr(settings, "AI_ROUTES", {
+        "intent": [{"provider": "gemini", "model": "gemini-custom", "timeout_ms": 900}],
+    })
+
+    assert get_routes("intent") == [Route("gemini", "gemini-custom", 900)]
+    assert get_routes("recipe") == ai_routing.DEFAULT_ROUTES["recipe"]
+
+
+@pytest.mark.asyncio
+async def test_voice_intents_go_to_the_fast_model_first():
+    ai = AIMentorService()
+    with patch.object(ai.groq, "generate", new_callable=AsyncMock, return_value='{"intent": "HELP"}') as groq, \
+         patch.object(ai.gemini, "generate", new_callable=AsyncMock) as gemini:
+        result = await ai.parse_voice_intent("is it fine if the butter browns a little")
+
+    assert result["intent"] == "HELP"
+    gemini.assert_not_called()
+    assert groq.call_args.kwargs["model"] == GROQ_FAST_MODEL
+    assert groq.call_args.kwargs["max_tokens"] == 60
+
+
+@pytest.mark.asyncio
+async def test_timed_out_route_falls_through_and_is_reported(monkeypatch):
+    monkeypatch.setattr(settings, "AI_ROUTES", {
+        "chat_summary": [
+            {"provider": "gemini", "model": "slow-model", "timeout_ms": 20},
+            {"provider": "groq", "model": "fast-model", "timeout_ms": 1000},
+        ],
+    })
+
+    async def stalled(*args, **kwargs):
+        await asyncio.sleep(5)
+
+    ai = AIMentorService()
+    with patch.object(ai.gemini, "generate", side_effect=stalled), \
+         patch.object(ai.groq, "generate", new_callable=AsyncMock, return_value="They are making risotto."):
+        summary = await ai._summarize_turns(None, [{"role": "user", "content": "Making risotto"}])
+
+    assert summary == "They are making risotto."
+    snapshot = routing_snapshot()["chat_summary"]
+    assert snapshot["slow-model"]["timeouts"] >= 1
+    assert snapshot["fast-model"]["latency_p50_ms"] is not None
+
+
+@pytest.mark.asyncio
+async def test_hedge_losers_keep_the_hedge_delay_from_shrinking():
+    route = Route(provider="gemini", model="hedged-model", timeout_ms=1000)
+    stats = ai_routing.route_stats("step_guidance", route)
+    for _ in range(5):
+        stats.record(0.001)  # a few fast answers
+
+    async def slow():
+        await asyncio.sleep(5)
+
+    # Hedge losers: cancelled after ~20ms without answering
+    for _ in range(10):
+        attempt = asyncio.create_task(ai_routing.run_route("step_guidance", route, slow))
+        await asyncio.sleep(0.02)
+        attempt.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await attempt
+
+    assert stats.cancelled == 10
+    assert stats.latency_percentile(0.9) >= 0.02
+
+
+@pytest.mark.asyncio
+async def test_route_timeouts_trip_the_providers_breaker():
+    route = Route(provider="gemini", model="stalled-model", timeout_ms=10)
+
+    async def stalled(*args, **kwargs):
+        await asyncio.sleep(5)
+
+    ai = AIMentorService()
+    with patch("google.generativeai.GenerativeModel.generate_content_async", side_effect=stalled):
+        for _ in range(settings.AI_BREAKER_MIN_CALLS):
+            with pytest.raises(asyncio.TimeoutError):
+                await ai_routing.run_route("chat_summary", route, lambda: ai.gemini.generate("hi", model=route.model))
+
+        with pytest.raises(CircuitOpenError):
+            await ai_routing.run_route("chat_summary", route, lambda: ai.gemini.generate("hi", model=route.model))
+
+    assert get_breaker("gemini").state == OPEN
+    assert get_breaker("gemini").stats["timeouts"] == settings.AI_BREAKER_MIN_CALLS
+
+
+@pytest.mark.asyncio
+async def test_stream_first_chunk_timeouts_count_against_the_breaker():
+    route = Route(provider="groq", model="stalled-stream", timeout_ms=10)
+    breaker = get_breaker("groq")
+
+    async def stalled_stream():
+        async with breaker.guard():
+            await asyncio.sleep(5)
+            yield "never"
+
+    with pytest.raises(asyncio.TimeoutError):
+        async for _ in ai_routing.stream_route("chat", route, stalled_stream):
+            pass
+
+    assert breaker.stats["timeouts"] == 1
+    assert breaker.stats["failures"] == 1
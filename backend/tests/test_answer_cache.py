@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.core.config import settings
+from app.services.ai_mentor import AIMentorService
+from app.services.answer_cache import SimilarAnswerCache, chat_answer_cache, chat_scope
+
+CONTEXT = {"recipe_name": "Omelette", "current_step": 2, "step_instruction": "Heat butter in a pan"}
+SCOPE = chat_scope(CONTEXT)
+
+
+def test_paraphrase_on_the_same_step_reuses_the_answer():
+    cache = SimilarAnswerCache()
+    cache.store(SCOPE, "Can I use oil instead of butter?", "Yes, a neutral oil works.")
+
+    assert cache.lookup(SCOPE, "could I use oil instead of the butter") == "Yes, a neutral oil works."
+    assert cache.lookup(SCOPE, "can i use oil instead of buter") == "Yes, a neutral oil works."
+    assert cache.lookup(SCOPE, "Can I use margarine instead of butter?") is None
+    assert cache.lookup(chat_scope({**CONTEXT, "current_step": 3}), "Can I use oil instead of butter?") is None
+    assert cache.snapshot()["hit_rate"] == 0.5
+
+
+def test_reversed_substitution_is_a_different_question():
+    cache = SimilarAnswerCache()
+    cache.store(SCOPE, "Can I use oil instead of butter?", "Yes, a neutral oil works.")
+
+    assert cache.lookup(SCOPE, "can I use butter instead of oil?") is None
+    assert cache.lookup(SCOPE, "instead of oil, can I use butter?") is None
+    assert cache.lookup(SCOPE, "could I use oil instead of butter") == "Yes, a neutral oil works."
+
+
+def test_edited_instruction_starts_a_new_scope():
+    assert chat_scope({**CONTEXT, "step_instruction": "Heat olive oil in a pan"}) != SCOPE
+    assert chat_scope({"recipe_name": "Omelette"}) is None
+
+
+def test_context_dependent_follow_ups_are_not_shared():
+    cache = SimilarAnswerCache()
+    cache.store(SCOPE, "what about that?", "Only for this conversation.")
+
+    assert cache.lookup(SCOPE, "what about that?") is None
+    assert cache.stats["stores"] == 0
+    assert cache.stats["skipped"] == 1
+
+
+def test_sampled_hits_are_rechecked_exactly(monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_SIMILAR_CACHE_SAMPLE_RATE", 1.0)
+    cache = SimilarAnswerCache()
+    cache.store(SCOPE, "How do I know the butter is hot enough?", "When it stops foaming.")
+
+    cache.lookup(SCOPE, "how do i know when the butter is hot enough")
+
+    snapshot = cache.snapshot()
+    assert snapshot["sampled"] == 1
+    assert snapshot["recent_samples"][0]["matched"] == "How do I know the butter is hot enough?"
+    assert snapshot["suspect_rate"] == snapshot["recent_samples"][0]["suspect"]
+
+
+def test_full_scope_evicts_oldest_and_its_band_postings():
+    cache = SimilarAnswerCache(max_entries=2)
+    cache.store(SCOPE, "Can I use oil instead of butter?", "oil")
+    cache.store(SCOPE, "How long should the butter heat?", "a minute")
+    cache.store(SCOPE, "Should the pan be non-stick?", "ideally")
+
+    bucket = cache._scopes[SCOPE]
+    assert cache.lookup(SCOPE, "Can I use oil instead of butter?") is None
+    assert {entry_id for ids in bucket.bands.values() for entry_id in ids} == set(bucket.entries)
+
+
+@pytest.mark.asyncio
+async def test_second_cook_asking_a_paraphrase_costs_no_llm_call():
+    ai = AIMentorService()
+    with patch.object(ai.gemini, "chat", new_callable=AsyncMock, return_value="Yes, a neutral oil works.") as gemini:
+        first = await ai.chat_with_mentor([{"role": "user", "content": "Can I use oil instead of butter?"}], CONTEXT)
+        second = await ai.chat_with_mentor([{"role": "user", "content": "could i use oil instead of the butter"}], CONTEXT)
+        chunks = [chunk async for chunk in ai.chat_with_mentor_stream(
+            [{"role": "user", "content": "can I use oil instead of the butter?"}], CONTEXT,
+        )]
+
+    assert first == second == "".join(chunks) == "Yes, a neutral oil works."
+    gemini.assert_called_once()
+    assert chat_answer_cache.stats["hits"] == 2
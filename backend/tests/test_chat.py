@@ -0,0 +1,125 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.services.ai_mentor import AIMentorService, CHAT_FALLBACK, ChatStreamInterrupted
+
+CONTEXT = {"recipe_name": "Scrambled Eggs", "current_step": 2, "step_instruction": "Heat 1 tbsp butter"}
+MESSAGES = [{"role": "user", "content": "Can I use oil instead of butter?"}]
+
+
+def _stream(*chunks, fail_after=None):
+    async def gen(*args, **kwargs):
+        for i, chunk in enumerate(chunks):
+            if fail_after is not None and i == fail_after:
+                raise RuntimeError("stream dropped")
+            yield chunk
+    return gen
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_yields_gemini_chunks():
+    with patch("app.services.ai_providers.GeminiProvider.chat_stream", _stream("Yes, ", "a neutral oil ", "works fine.")):
+        service = AIMentorService()
+        chunks = [c async for c in service.chat_with_mentor_stream(MESSAGES, CONTEXT)]
+
+    assert chunks == ["Yes, ", "a neutral oil ", "works fine."]
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_falls_back_to_groq_before_first_token():
+    with patch("app.services.ai_providers.GeminiProvider.chat_stream", _stream("never", fail_after=0)), \
+         patch("app.services.ai_providers.GroqProvider.chat_stream", _stream("Oil is fine.")):
+        service = AIMentorService()
+        chunks = [c async for c in service.chat_with_mentor_stream(MESSAGES, CONTEXT)]
+
+    assert chunks == ["Oil is fine."]
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_moves_on_when_a_route_ends_empty():
+    with patch("app.services.ai_providers.GeminiProvider.chat_stream", _stream()), \
+         patch("app.services.ai_providers.GroqProvider.chat_stream", _stream("Oil is fine.")):
+        service = AIMentorService()
+        chunks = [c async for c in service.chat_with_mentor_stream(MESSAGES, CONTEXT)]
+
+    assert chunks == ["Oil is fine."]
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_static_fallback_when_every_route_ends_empty():
+    with patch("app.services.ai_providers.GeminiProvider.chat_stream", _stream()), \
+         patch("app.services.ai_providers.GroqProvider.chat_stream", _stream()):
+        service = AIMentorService()
+        chunks = [c async for c in service.chat_with_mentor_stream(MESSAGES, CONTEXT)]
+
+    assert chunks == [CHAT_FALLBACK]
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_does_not_restart_after_partial_answer():
+    groq = AsyncMock()
+    with patch("app.services.ai_providers.GeminiProvider.chat_stream", _stream("Yes, ", "oil", fail_after=1)), \
+         patch("app.services.ai_providers.GroqProvider.chat_stream", groq):
+        service = AIMentorService()
+        chunks = []
+        with pytest.raises(ChatStreamInterrupted):
+            async for chunk in service.chat_with_mentor_stream(MESSAGES, CONTEXT):
+                chunks.append(chunk)
+
+    assert chunks == ["Yes, "]
+    groq.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_endpoint_emits_sse(client):
+    with patch("app.services.ai_providers.GeminiProvider.chat_stream", _stream("Use ", "ghee.")):
+        response = await client.post("/api/v1/cooking/chat/stream", json={"messages": MESSAGES, "context": CONTEXT})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [f for f in response.text.split("\n\n") if f]
+    assert json.loads(frames[0].removeprefix("data: ")) == {"token": "Use "}
+    assert frames[-1].startswith("event: done")
+    assert json.loads(frames[-1].split("data: ")[1]) == {"response": "Use ghee.", "conversation_id": None}
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_endpoint_reports_a_cut_off_answer(client):
+    with patch("app.services.ai_providers.GeminiProvider.chat_stream", _stream("Use ", "ghee", fail_after=1)):
+        response = await client.post("/api/v1/cooking/chat/stream", json={"messages": MESSAGES, "context": CONTEXT})
+
+    frames = [f for f in response.text.split("\n\n") if f]
+    assert json.loads(frames[0].removeprefix("data: ")) == {"token": "Use "}
+    assert frames[-1].startswith("event: error")
+    final = json.loads(frames[-1].split("data: ")[1])
+    assert final["truncated"] is True and final["response"] == "Use"
+    assert not any(frame.startswith("event: done") for frame in frames)
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_static_fallback_when_all_tiers_fail():
+    with patch("app.services.ai_providers.GeminiProvider.chat_stream", _stream("x", fail_after=0)), \
+         patch("app.services.ai_providers.GroqProvider.chat_stream", _stream("x", fail_after=0)):
+        service = AIMentorService()
+        chunks = [c async for c in service.chat_with_mentor_stream(MESSAGES, CONTEXT)]
+
+    assert chunks == [CHAT_FALLBACK]
+
+
+@pytest.mark.asyncio
+async def test_chat_requests_reuse_app_scoped_clients(client):
+    """No genai.configure / client construction on the request path"""
+    from app.services.ai_providers import get_registry
+    registry = get_registry()
+
+    with patch("google.generativeai.configure") as mock_configure, \
+         patch("app.services.ai_providers.AIClientRegistry.__init__") as mock_init, \
+         patch("app.services.ai_providers.GeminiProvider.chat", new_callable=AsyncMock) as mock_chat:
+        mock_chat.return_value = "Sure."
+        for _ in range(2):
+            response = await client.post("/api/v1/cooking/chat", json={"messages": MESSAGES, "context": CONTEXT})
+            assert response.json()["response"] == "Sure."
+
+    mock_configure.assert_not_called()
+    mock_init.assert_not_called()
+    assert get_registry() is registry
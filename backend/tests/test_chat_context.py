@@ -0,0 +1,101 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.services.ai_mentor import AIMentorService
+from app.services.chat_context import compact_messages, count_tokens, summary_cache
+
+
+def _conversation(turns: int, words: int = 40) -> list[dict]:
+    messages = []
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"question {i} " + "salt " * words})
+        messages.append({"role": "assistant", "content": f"answer {i} " + "pepper " * words})
+    return messages
+
+
+@pytest.fixture(autouse=True)
+def clear_summary_cache():
+    summary_cache.local.clear()
+    yield
+    summary_cache.local.clear()
+
+
+@pytest.mark.asyncio
+async def test_short_chat_is_untouched():
+    summarize = AsyncMock()
+    messages = _conversation(2)
+
+    result, summary = await compact_messages(messages, "system", summarize, max_tokens=3000, keep_recent=6)
+
+    assert result == messages
+    assert summary is None
+    summarize.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_long_chat_keeps_recent_turns_and_fits_budget():
+    summarize = AsyncMock(return_value="User is making risotto.")
+    messages = _conversation(20)
+
+    result, summary = await compact_messages(messages, "system", summarize, max_tokens=800, keep_recent=6)
+
+    assert summary == "User is making risotto."
+    assert result == messages[-len(result):]
+    assert result[0]["role"] == "user"
+    assert len(result) >= 2
+    assert count_tokens(result) <= 800
+    summarize.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_summary_is_folded_incrementally():
+    summarize = AsyncMock(side_effect=["summary A", "summary B"])
+    messages = _conversation(20)
+
+    await compact_messages(messages, "system", summarize, max_tokens=800, keep_recent=6)
+    first_fold = summarize.call_args.args[1]
+
+    # The next turn reuses the cached summary: no new LLM call
+    messages.append({"role": "user", "content": "next question"})
+    _, summary = await compact_messages(messages, "system", summarize, max_tokens=800, keep_recent=6)
+    assert summary == "summary A"
+    assert summarize.call_count == 1
+
+    # Once a full fold's worth of turns accumulates, only the new turns are summarized
+    messages.append({"role": "assistant", "content": "answer"})
+    messages.extend(_conversation(3))
+    _, summary = await compact_messages(messages, "system", summarize, max_tokens=800, keep_recent=6)
+
+    assert summary == "summary B"
+    previous_summary, new_turns = summarize.call_args.args
+    assert previous_summary == "summary A"
+    assert new_turns == messages[len(first_fold):len(first_fold) + len(new_turns)]
+
+
+@pytest.mark.asyncio
+async def test_failed_summary_falls_back_to_trimming():
+    summarize = AsyncMock(return_value=None)
+    messages = _conversation(20)
+
+    result, summary = await compact_messages(messages, "system", summarize, max_tokens=800, keep_recent=6)
+
+    assert summary is None
+    assert result[-1] == messages[-1]
+    assert count_tokens(result) <= 800
+
+
+@pytest.mark.asyncio
+async def test_mentor_chat_sends_compacted_history():
+    messages = _conversation(30)
+
+    with patch("app.services.ai_providers.GeminiProvider.generate", new_callable=AsyncMock) as mock_summary, \
+         patch("app.services.ai_providers.GeminiProvider.chat", new_callable=AsyncMock) as mock_chat:
+        mock_summary.return_value = "User is frying onions for a curry."
+        mock_chat.return_value = "Keep the heat medium."
+
+        reply = await AIMentorService().chat_with_mentor(messages, {"recipe_name": "Curry"})
+
+    assert reply == "Keep the heat medium."
+    sent_messages = mock_chat.call_args.args[0]
+    assert len(sent_messages) < len(messages)
+    assert sent_messages[-1] == messages[-1]
+    assert "User is frying onions for a curry." in mock_chat.call_args.kwargs["system_prompt"]
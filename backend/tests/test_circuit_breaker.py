@@ -0,0 +1,114 @@
+import asyncio
+import pytest
+import time
+from unittest.mock import AsyncMock, patch
+from app.core.config import settings
+from app.services.circuit_breaker import (
+    CircuitBreaker, CircuitOpenError, call_deadline, get_breaker, CLOSED, OPEN, HALF_OPEN,
+)
+from app.services.ai_mentor import AIMentorService
+
+
+async def _fail():
+    raise RuntimeError("503 from provider")
+
+
+@pytest.mark.asyncio
+async def test_breaker_trips_on_error_rate_and_rejects_fast():
+    breaker = CircuitBreaker("test", min_calls=4, error_rate_threshold=0.5)
+
+    for _ in range(4):
+        with pytest.raises(RuntimeError):
+            async with breaker.guard():
+                await _fail()
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        async with breaker.guard():
+            pass
+    assert breaker.stats["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_breaker_half_open_probe_closes_on_success():
+    breaker = CircuitBreaker("test", min_calls=1, open_seconds=30)
+    breaker.trip()
+
+    with patch("app.services.circuit_breaker.time.monotonic", return_value=time.monotonic() + 31):
+        assert breaker.allow() is True
+        assert breaker.state == HALF_OPEN
+        # Only one probe at a time
+        assert breaker.allow() is False
+        breaker.record_success(0.2)
+
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_breaker_half_open_probe_failure_reopens():
+    breaker = CircuitBreaker("test", min_calls=1, open_seconds=30)
+    breaker.trip()
+
+    with patch("app.services.circuit_breaker.time.monotonic", return_value=time.monotonic() + 31):
+        assert breaker.allow() is True
+        breaker.record_failure(1.0)
+
+    assert breaker.state == OPEN
+    assert breaker.stats["trips"] == 2
+
+
+async def _guarded_sleep(breaker: CircuitBreaker):
+    async with breaker.guard():
+        await asyncio.sleep(5)
+
+
+@pytest.mark.asyncio
+async def test_calls_cut_off_by_their_deadline_count_as_failures():
+    breaker = CircuitBreaker("test", min_calls=4, error_rate_threshold=0.5)
+
+    for _ in range(4):
+        with pytest.raises(asyncio.TimeoutError):
+            with call_deadline(0.01):
+                await asyncio.wait_for(_guarded_sleep(breaker), 0.01)
+
+    assert breaker.stats["timeouts"] == 4
+    assert breaker.state == OPEN
+
+
+@pytest.mark.asyncio
+async def test_cancelled_calls_before_the_deadline_are_neutral():
+    breaker = CircuitBreaker("test", min_calls=1)
+
+    with call_deadline(5):
+        attempt = asyncio.create_task(_guarded_sleep(breaker))
+        await asyncio.sleep(0.01)
+        attempt.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await attempt
+
+    assert breaker.state == CLOSED
+    assert breaker.stats["failures"] == 0
+    assert breaker.snapshot()["window_calls"] == 0
+
+
+def test_breakers_use_the_configured_slow_rate(monkeypatch):
+    monkeypatch.setattr(settings, "AI_BREAKER_SLOW_RATE", 0.3)
+
+    assert get_breaker("slow-rate-test").slow_rate_threshold == 0.3
+
+
+@pytest.mark.asyncio
+async def test_open_gemini_goes_straight_to_groq():
+    """While Gemini is open, users don't pay its failure latency"""
+    get_breaker("gemini").trip()
+
+    with patch("google.generativeai.GenerativeModel.generate_content_async", new_callable=AsyncMock) as mock_gemini, \
+         patch("app.services.ai_providers.GroqProvider.chat", new_callable=AsyncMock) as mock_groq:
+        mock_groq.return_value = "Wait for the butter to foam before adding eggs."
+
+        service = AIMentorService()
+        tip = await service.get_step_guidance("Melt butter in a pan for the omelette")
+
+    assert tip == "Wait for the butter to foam before adding eggs."
+    mock_gemini.assert_not_called()
+    assert get_breaker("gemini").stats["rejected"] == 1
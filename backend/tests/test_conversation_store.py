@@ -0,0 +1,229 @@
+import json
+import uuid
+import pytest
+from unittest.mock import AsyncMock, patch
+from sqlalchemy import select
+from app.models.chat import ChatMessage
+from app.services.conversation_store import ConversationStore
+
+CONTEXT = {"recipe_name": "Dal", "current_step": 1, "step_instruction": "Rinse the lentils"}
+
+
+class FakeRedis:
+    """The list commands ConversationStore uses, with decode_responses semantics."""
+
+    def __init__(self):
+        self.lists: dict[str, list[str]] = {}
+
+    async def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(values)
+        return len(self.lists[key])
+
+    async def lpush(self, key, *values):
+        self.lists[key] = list(reversed(values)) + self.lists.get(key, [])
+        return len(self.lists[key])
+
+    async def lrange(self, key, start, end):
+        items = self.lists.get(key, [])
+        return items[start:] if end == -1 else items[start:end + 1]
+
+    async def ltrim(self, key, start, end):
+        self.lists[key] = await self.lrange(key, start, end)
+        return True
+
+    async def expire(self, key, seconds):
+        return int(key in self.lists)
+
+    async def delete(self, key):
+        return int(self.lists.pop(key, None) is not None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+@pytest.fixture
+def store(db_session):
+    """Fresh store without Redis whose write-behind lands in the test database."""
+    store = ConversationStore(ttl_seconds=60, flush_interval=60)
+    with patch("app.services.conversation_store.get_redis", new_callable=AsyncMock, return_value=None), \
+         patch("app.db.base.AsyncSessionLocal") as mock_session_factory:
+        mock_session_factory.return_value.__aenter__.return_value = db_session
+        yield store
+
+
+@pytest.mark.asyncio
+async def test_append_and_load(store):
+    conversation_id = str(uuid.uuid4())
+    await store.append(conversation_id, "user", "How long do I soak them?")
+    await store.append(conversation_id, "assistant", "About 30 minutes.")
+
+    assert await store.load(conversation_id) == [
+        {"role": "user", "content": "How long do I soak them?"},
+        {"role": "assistant", "content": "About 30 minutes."},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_behind_in_order(store, db_session):
+    conversation_id = str(uuid.uuid4())
+    await store.append(conversation_id, "user", "first")
+    await store.append(conversation_id, "assistant", "second")
+
+    assert await store.flush() == 2
+    assert await store.flush() == 0
+
+    result = await db_session.execute(select(ChatMessage).order_by(ChatMessage.seq))
+    rows = result.scalars().all()
+    assert [(row.seq, row.role, row.content) for row in rows] == [(0, "user", "first"), (1, "assistant", "second")]
+
+
+@pytest.mark.asyncio
+async def test_expired_conversation_is_rebuilt_from_database(store):
+    conversation_id = str(uuid.uuid4())
+    await store.append(conversation_id, "user", "persisted")
+    await store.flush()
+    await store.append(conversation_id, "assistant", "not flushed yet")
+
+    # Cached copy gone (TTL, eviction, restart of another worker)
+    store._local.clear()
+
+    assert await store.load(conversation_id) == [
+        {"role": "user", "content": "persisted"},
+        {"role": "assistant", "content": "not flushed yet"},
+    ]
+    assert store.stats["db_loads"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_retried():
+    store = ConversationStore(ttl_seconds=60, flush_interval=60)
+    with patch("app.services.conversation_store.get_redis", new_callable=AsyncMock, return_value=None), \
+         patch("app.db.base.AsyncSessionLocal", side_effect=Exception("db down")):
+        await store.append(str(uuid.uuid4()), "user", "hello")
+        assert await store.flush() == 0
+
+    assert store.snapshot()["pending"] == 1
+    assert store.stats["flush_errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rejected_row_is_dropped_without_blocking_the_batch(store, db_session):
+    conversation_id = str(uuid.uuid4())
+    await store.append(conversation_id, "user", "kept")
+    await store.append("not-a-uuid", "user", "poison")
+    await store.append(conversation_id, "assistant", "also kept")
+
+    assert await store.flush() == 2
+    assert store.snapshot()["pending"] == 0
+    assert store.stats["dropped"] == 1
+
+    result = await db_session.execute(select(ChatMessage.content).order_by(ChatMessage.seq))
+    assert result.scalars().all() == ["kept", "also kept"]
+
+
+@pytest.fixture
+def shared_redis(db_session):
+    """One Redis for every worker's store, with write-behind landing in the test database."""
+    redis = FakeRedis()
+    with patch("app.services.conversation_store.get_redis", new_callable=AsyncMock, return_value=redis), \
+         patch("app.db.base.AsyncSessionLocal") as mock_session_factory:
+        mock_session_factory.return_value.__aenter__.return_value = db_session
+        yield redis
+
+
+@pytest.mark.asyncio
+async def test_any_worker_flushes_and_rebuilds_with_queued_turns(shared_redis, db_session):
+    conversation_id = str(uuid.uuid4())
+    worker_a = ConversationStore(ttl_seconds=60, flush_interval=60)
+    worker_b = ConversationStore(ttl_seconds=60, flush_interval=60)
+    await worker_a.append(conversation_id, "user", "persisted")
+    assert await worker_b.flush() == 1
+    await worker_a.append(conversation_id, "assistant", "not flushed yet")
+
+    # Conversation expired from Redis; worker A's queued turn is still visible to B
+    del shared_redis.lists[f"chat:conv:{conversation_id}"]
+    assert await worker_b.load(conversation_id) == [
+        {"role": "user", "content": "persisted"},
+        {"role": "assistant", "content": "not flushed yet"},
+    ]
+
+    assert await worker_b.flush() == 1
+    assert await worker_a.flush() == 0
+    result = await db_session.execute(select(ChatMessage.seq).order_by(ChatMessage.seq))
+    assert result.scalars().all() == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_failed_shared_flush_puts_rows_back_in_order(shared_redis):
+    conversation_id = str(uuid.uuid4())
+    store = ConversationStore(ttl_seconds=60, flush_interval=60)
+    for text in ("one", "two"):
+        await store.append(conversation_id, "user", text)
+
+    with patch("app.db.base.AsyncSessionLocal", side_effect=Exception("db down")):
+        assert await store.flush() == 0
+
+    queued = [json.loads(raw)["content"] for raw in shared_redis.lists["chat:pending"]]
+    assert queued == ["one", "two"]
+    assert store.snapshot()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_chat_endpoint_keeps_history_server_side(client, store):
+    with patch("app.api.v1.endpoints.cooking.conversation_store", store), \
+         patch("app.services.ai_providers.GeminiProvider.chat", new_callable=AsyncMock) as mock_chat:
+        mock_chat.return_value = "Rinse until the water runs clear."
+        first = await client.post("/api/v1/cooking/chat", json={"message": "How much do I rinse?", "context": CONTEXT})
+        conversation_id = first.json()["conversation_id"]
+
+        mock_chat.return_value = "Yes, a pressure cooker works."
+        second = await client.post("/api/v1/cooking/chat", json={
+            "message": "Can I use a pressure cooker?",
+            "conversation_id": conversation_id,
+            "context": CONTEXT,
+        })
+
+    assert first.status_code == 200 and second.status_code == 200
+    assert second.json() == {"response": "Yes, a pressure cooker works.", "conversation_id": conversation_id}
+    assert mock_chat.call_args.args[0] == [
+        {"role": "user", "content": "How much do I rinse?"},
+        {"role": "assistant", "content": "Rinse until the water runs clear."},
+        {"role": "user", "content": "Can I use a pressure cooker?"},
+    ]
+    assert len(await store.load(conversation_id)) == 4
+
+
+@pytest.mark.asyncio
+async def test_chat_endpoint_rejects_bad_conversation_id(client):
+    response = await client.post("/api/v1/cooking/chat", json={"message": "hi", "conversation_id": "nope", "context": CONTEXT})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("session_id, status", [("nope", 400), (str(uuid.uuid4()), 404)])
+async def test_chat_endpoint_rejects_unknown_session(client, store, session_id, status):
+    with patch("app.api.v1.endpoints.cooking.conversation_store", store), \
+         patch("app.services.ai_providers.GeminiProvider.chat", new_callable=AsyncMock) as mock_chat:
+        response = await client.post("/api/v1/cooking/chat", json={"message": "hi", "session_id": session_id, "context": CONTEXT})
+
+    assert response.status_code == status
+    assert store.snapshot()["pending"] == 0
+    mock_chat.assert_not_called()
@@ -99,6 +99,24 @@ async def test_cooking_service_advance_step(db_session, seeded_recipe, test_user
     updated_session = db_result.scalar_one()
     assert updated_session.current_step_index == "1"
 
+@pytest.mark.asyncio
+async def test_cooking_service_serves_stored_tips(db_session, seeded_recipe, test_user):
+    """Tips stored on the step at ingest are served without calling AI"""
+    cooking_service = CookingService(db_session)
+    db_result = await db_session.execute(
+        select(RecipeStep).where(RecipeStep.recipe_id == seeded_recipe.id, RecipeStep.step_number == 1)
+    )
+    db_result.scalar_one().ai_tips = "Use a lid to boil faster."
+    await db_session.commit()
+    
+    session = await cooking_service.start_session(str(seeded_recipe.id), user_id=str(test_user.id))
+    
+    with patch("app.services.ai_mentor.AIMentorService.get_step_guidance", new_callable=AsyncMock) as mock_ai:
+        result = await cooking_service.get_current_step(str(session.id))
+    
+    assert result["guidance"] == "Use a lid to boil faster."
+    mock_ai.assert_not_called()
+
 @pytest.mark.asyncio
 async def test_cooking_service_handles_completion(db_session, seeded_recipe, test_user):
     """Test behavior when all steps are completed"""
@@ -0,0 +1,105 @@
+import time
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.services.ai_mentor import AIMentorService
+from app.services.intent_classifier import classify_intent, parse_duration
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("next step", "NEXT"),
+    ("Okay chef, next please", "NEXT"),
+    ("What's next?", "NEXT"),
+    ("go back", "PREV"),
+    ("repeat that", "REPEAT"),
+    ("Could you repeat the step", "REPEAT"),
+    ("pause", "PAUSE"),
+    ("wait a sec", "PAUSE"),
+    ("resume", "RESUME"),
+    ("help", "HELP"),
+    ("how much garlic do I need", "INGREDIENT"),
+])
+def test_commands_are_confident(text, intent):
+    result = classify_intent(text)
+    assert result["intent"] == intent
+    assert result["confidence"] >= 0.8
+
+
+@pytest.mark.parametrize("text, seconds", [
+    ("set timer for 5 minutes", 300),
+    ("set a timer for five mins", 300),
+    ("timer for twenty-five minutes", 1500),
+    ("remind me in an hour and a half", 5400),
+    ("set a timer for one and a half hours", 5400),
+    ("timer for half an hour", 1800),
+    ("timer 1 hour 30 minutes", 5400),
+    ("timer for 90 sec", 90),
+    ("set timer 10m", 600),
+])
+def test_timer_durations(text, seconds):
+    result = classify_intent(text)
+    assert result == {"intent": "TIMER", "duration_seconds": seconds, "confidence": 0.95}
+
+
+@pytest.mark.parametrize("text", ["stir the sauce", "stir as needed", "what am I doing wrong", "ah I see"])
+def test_parse_duration_without_duration(text):
+    assert parse_duration(text) is None
+
+
+@pytest.mark.parametrize("text", [
+    "what's the best way to chop an onion",
+    "I think we should go back to the previous one",
+    "set a timer",
+    "what am I doing wrong",
+    "is it ok to rest the dough for an hour",
+    "should I set a timer for 10 minutes",
+    "how long do I simmer it for 5 minutes or more",
+])
+def test_ambiguous_utterances_are_not_confident(text):
+    assert classify_intent(text)["confidence"] < 0.8
+
+
+def test_questions_about_durations_are_not_timers():
+    result = classify_intent("is it ok to rest the dough for an hour")
+    assert result["intent"] != "TIMER"
+
+
+def test_classifier_is_fast():
+    started = time.perf_counter()
+    for _ in range(1000):
+        classify_intent("okay set a timer for one and a half hours please")
+    # Budget is <10ms per utterance; typical is a few microseconds
+    assert (time.perf_counter() - started) / 1000 < 0.01
+
+
+@pytest.mark.asyncio
+async def test_confident_command_skips_llm():
+    with patch("google.generativeai.GenerativeModel.generate_content_async", new_callable=AsyncMock) as mock_gemini, \
+         patch("app.services.ai_providers.GroqProvider.chat", new_callable=AsyncMock) as mock_groq:
+        result = await AIMentorService().parse_voice_intent("next step")
+
+    assert result["intent"] == "NEXT"
+    mock_gemini.assert_not_called()
+    mock_groq.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ambiguous_command_escalates_to_llm():
+    mock_response = AsyncMock()
+    mock_response.text = '{"intent": "PREV"}'
+
+    with patch("google.generativeai.GenerativeModel.generate_content_async", new_callable=AsyncMock) as mock_gemini:
+        mock_gemini.return_value = mock_response
+        result = await AIMentorService().parse_voice_intent("I think we should go back to the previous one")
+
+    assert result == {"intent": "PREV"}
+    mock_gemini.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_llm_failure_falls_back_to_local_guess():
+    with patch("google.generativeai.GenerativeModel.generate_content_async", side_effect=Exception("down")), \
+         patch("app.services.ai_providers.GroqProvider.chat", side_effect=Exception("down")):
+        result = await AIMentorService().parse_voice_intent("set a timer")
+
+    assert result["intent"] == "TIMER"
+    assert result["duration_seconds"] == 300
@@ -0,0 +1,192 @@
+import pytest
+import pytest_asyncio
+from app.models.recipe import Recipe, RecipeStep, DifficultyLevel
+from app.services.cooking import CookingService
+from app.services.recipe_enrichment import RecipeEnrichmentService
+from app.services.step_cache import step_cache
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy import select
+
+import json
+
+
+def _enriched(tip, safe=True, warnings=(), minutes=None, timer=None):
+    timer = minutes is not None if timer is None else timer
+    result = {"tip": tip, "safe": safe, "warnings": list(warnings), "timer_required": timer}
+    if minutes is not None:
+        result["duration_minutes"] = minutes
+    return result
+
+
+def _fused(*results):
+    return json.dumps(list(results))
+
+@pytest_asyncio.fixture
+async def untipped_recipe(db_session):
+    recipe = Recipe(title="Omelette", difficulty=DifficultyLevel.BEGINNER, servings=1)
+    db_session.add(recipe)
+    await db_session.flush()
+    db_session.add_all([
+        RecipeStep(recipe_id=recipe.id, step_number=1, instruction="Whisk eggs"),
+        RecipeStep(recipe_id=recipe.id, step_number=2, instruction="Heat butter", ai_tips="Wait for the foam to subside."),
+        RecipeStep(recipe_id=recipe.id, step_number=3, instruction="Fold and serve"),
+    ])
+    await db_session.commit()
+    return recipe
+
+
+def _gemini_returns(*texts):
+    responses = []
+    for text in texts:
+        response = MagicMock()
+        response.text = text
+        responses.append(response)
+    return patch("google.generativeai.GenerativeModel.generate_content_async", new_callable=AsyncMock, side_effect=responses)
+
+
+async def _steps(db_session, recipe):
+    result = await db_session.execute(
+        select(RecipeStep).where(RecipeStep.recipe_id == recipe.id).order_by(RecipeStep.step_number)
+    )
+    return result.scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_enrich_recipe_fills_tips_verdicts_and_timers_in_one_call(db_session, untipped_recipe):
+    fused = _fused(
+        _enriched("Whisk until frothy.", safe=False, warnings=["Cook eggs until set"], minutes=2),
+        _enriched("Tilt the pan to coat it."),
+    )
+    with _gemini_returns(fused) as mock_gemini:
+        updated = await RecipeEnrichmentService(db_session).enrich_recipe(untipped_recipe.id)
+
+    # "Heat butter" already has a tip and the rules settle its safety
+    assert updated == 3
+    assert mock_gemini.call_count == 1
+    prompt = mock_gemini.call_args.args[0]
+    assert "Heat butter" not in prompt
+    steps = await _steps(db_session, untipped_recipe)
+    assert [step.ai_tips for step in steps] == [
+        "Whisk until frothy.",
+        "Wait for the foam to subside.",
+        "Tilt the pan to coat it.",
+    ]
+    assert [step.safety_safe for step in steps] == [False, True, True]
+    assert steps[0].safety_warnings == ["Cook eggs until set"]
+    assert [(step.duration_minutes, step.timer_required) for step in steps] == [(2, True), (None, False), (None, False)]
+
+
+@pytest.mark.asyncio
+async def test_rule_hit_survives_an_llm_that_calls_the_step_safe(db_session, untipped_recipe):
+    steps = await _steps(db_session, untipped_recipe)
+    steps[2].instruction = "Fold and serve on the same plate that held the raw eggs"
+    await db_session.commit()
+
+    with _gemini_returns(_fused(_enriched("a"), _enriched("b", warnings=["Serve promptly"]))):
+        await RecipeEnrichmentService(db_session).enrich_recipe(untipped_recipe.id)
+
+    step = (await _steps(db_session, untipped_recipe))[2]
+    assert step.safety_safe is False
+    assert len(step.safety_warnings) >= 2 and step.safety_warnings[-1] == "Serve promptly"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("instruction, timer, expected", [
+    ("Whisk eggs for 90 seconds", True, (2, True)),
+    # The LLM's "no timer" stands even with a stated duration
+    ("Rest the batter, about 10 minutes", False, (10, False)),
+    # Only explicit numbers count as a duration
+    ("Stir as needed", False, (None, False)),
+    ("Whisk for a minute or so", False, (None, False)),
+])
+async def test_stated_duration_fills_the_timer_when_the_llm_gives_none(db_session, untipped_recipe, instruction, timer, expected):
+    steps = await _steps(db_session, untipped_recipe)
+    steps[0].instruction = instruction
+    await db_session.commit()
+
+    with _gemini_returns(_fused(_enriched("a", timer=timer), _enriched("b"))):
+        await RecipeEnrichmentService(db_session).enrich_recipe(untipped_recipe.id)
+
+    step = (await _steps(db_session, untipped_recipe))[0]
+    assert (step.duration_minutes, step.timer_required) == expected
+
+
+@pytest.mark.asyncio
+async def test_enriched_recipe_costs_no_further_calls(db_session, untipped_recipe):
+    with _gemini_returns(_fused(_enriched("a"), _enriched("b"))):
+        await RecipeEnrichmentService(db_session).enrich_recipe(untipped_recipe.id)
+
+    with _gemini_returns() as mock_gemini:
+        updated = await RecipeEnrichmentService(db_session).enrich_recipe(untipped_recipe.id)
+
+    assert updated == 0
+    mock_gemini.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_edited_instruction_invalidates_only_its_verdict(db_session, untipped_recipe):
+    with _gemini_returns(_fused(_enriched("a"), _enriched("b"))):
+        await RecipeEnrichmentService(db_session).enrich_recipe(untipped_recipe.id)
+
+    steps = await _steps(db_session, untipped_recipe)
+    steps[0].instruction = "Whisk raw eggs and taste the mixture"
+    await db_session.commit()
+
+    with _gemini_returns(_fused(_enriched("a", safe=False, warnings=["Cook eggs until set"]))) as mock_gemini:
+        updated = await RecipeEnrichmentService(db_session).enrich_recipe(untipped_recipe.id)
+
+    assert updated == 1
+    prompt = mock_gemini.call_args.args[0]
+    assert "taste the mixture" in prompt and "Fold and serve" not in prompt
+    steps = await _steps(db_session, untipped_recipe)
+    assert [step.safety_safe for step in steps] == [False, True, True]
+    assert steps[0].ai_tips == "a"
+
+
+@pytest.mark.asyncio
+async def test_clear_cut_edit_is_settled_without_a_call(db_session, untipped_recipe):
+    with _gemini_returns(_fused(_enriched("a"), _enriched("b"))):
+        await RecipeEnrichmentService(db_session).enrich_recipe(untipped_recipe.id)
+
+    steps = await _steps(db_session, untipped_recipe)
+    steps[2].instruction = "Fold and serve on the same plate that held the raw eggs"
+    await db_session.commit()
+
+    with _gemini_returns() as mock_gemini:
+        updated = await RecipeEnrichmentService(db_session).enrich_recipe(untipped_recipe.id)
+
+    assert updated == 1
+    mock_gemini.assert_not_called()
+    assert (await _steps(db_session, untipped_recipe))[2].safety_safe is False
+
+
+@pytest.mark.asyncio
+async def test_wrong_result_count_falls_back_then_keeps_only_rule_verdicts(db_session, untipped_recipe):
+    with _gemini_returns(_fused(_enriched("only one"))), \
+         patch("app.services.ai_providers.GroqProvider.chat", new_callable=AsyncMock, side_effect=Exception("down")) as mock_groq:
+        updated = await RecipeEnrichmentService(db_session).enrich_recipe(untipped_recipe.id)
+
+    assert updated == 2  # verdicts the rules could settle; "Whisk eggs" waits for a retry
+    mock_groq.assert_called_once()
+    steps = await _steps(db_session, untipped_recipe)
+    assert [step.ai_tips for step in steps] == [None, "Wait for the foam to subside.", None]
+    assert steps[0].safety_instruction_hash is None
+
+
+@pytest.mark.asyncio
+async def test_cooking_serves_stored_verdict_until_instruction_changes(db_session, untipped_recipe):
+    with _gemini_returns(_fused(_enriched("a", safe=False, warnings=["Cook eggs until set"]), _enriched("b"))):
+        await RecipeEnrichmentService(db_session).enrich_recipe(untipped_recipe.id)
+
+    cooking = CookingService(db_session)
+    session = await cooking.start_session(str(untipped_recipe.id))
+    with _gemini_returns() as mock_gemini:
+        step = await cooking.get_current_step(str(session.id))
+    assert step["safety_warnings"] == ["Cook eggs until set"]
+    mock_gemini.assert_not_called()
+
+    (await _steps(db_session, untipped_recipe))[0].instruction = "Whisk eggs with cream"
+    await db_session.commit()
+    step_cache.invalidate(untipped_recipe.id)  # as any recipe editor must
+    step = await cooking.get_current_step(str(session.id))
+    assert step["safety_warnings"] is None
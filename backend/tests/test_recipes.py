@@ -1,6 +1,8 @@
 import pytest
 from app.models.recipe import Recipe, RecipeStep, DifficultyLevel
 from app.services.recipe_generator import RecipeGeneratorService
+from app.services.recipe_enrichment import enrich_recipe_in_background
+from fastapi import BackgroundTasks
 import uuid
 from unittest.mock import AsyncMock, patch, MagicMock
 from sqlalchemy import select
@@ -36,8 +38,15 @@ async def test_recipe_generator_creates_recipe_from_ai(db_session):
     }
     ```"""
     
+    # Tips, safety and timers for both steps come back from a second, fused call
+    mock_enrichment_response = MagicMock()
+    mock_enrichment_response.text = """[
+        {"tip": "Salt the water generously.", "safe": true, "warnings": [], "duration_minutes": 10, "timer_required": true},
+        {"tip": "Use room-temperature eggs.", "safe": false, "warnings": ["Raw egg: use pasteurized eggs"], "timer_required": false}
+    ]"""
+    
     # Mock the Gemini model
-    with patch.object(recipe_service.model, 'generate_content_async', new_callable=AsyncMock, return_value=mock_ai_response):
+    with patch.object(recipe_service.gemini.model, 'generate_content_async', new_callable=AsyncMock, side_effect=[mock_ai_response, mock_enrichment_response]):
         recipe = await recipe_service.generate_from_name("Spaghetti Carbonara")
     
     # Verify recipe was created
@@ -53,6 +62,9 @@ async def test_recipe_generator_creates_recipe_from_ai(db_session):
     steps = db_result.scalars().all()
     assert len(steps) == 2
     assert steps[0].instruction == "Boil water and cook pasta until al dente"
+    assert sorted(step.ai_tips for step in steps) == ["Salt the water generously.", "Use room-temperature eggs."]
+    assert sorted(step.safety_safe for step in steps) == [False, True]
+    assert sorted((step.duration_minutes or 0, step.timer_required) for step in steps) == [(0, False), (10, True)]
 
 @pytest.mark.asyncio
 async def test_recipe_generator_handles_difficulty_mapping(db_session):
@@ -63,12 +75,43 @@ async def test_recipe_generator_handles_difficulty_mapping(db_session):
     mock_ai_response = MagicMock()
     mock_ai_response.text = '{"name": "Simple Salad", "difficulty": "easy", "estimated_time_min": 10, "steps": [{"step_number": 1, "instruction": "Chop vegetables", "expected_state": "Evenly chopped"}]}'
     
-    with patch.object(recipe_service.model, 'generate_content_async', new_callable=AsyncMock, return_value=mock_ai_response):
+    mock_tips_response = MagicMock()
+    mock_tips_response.text = '[{"tip": "Cut everything the same size.", "safe": true}]'
+    
+    with patch.object(recipe_service.gemini.model, 'generate_content_async', new_callable=AsyncMock, side_effect=[mock_ai_response, mock_tips_response]):
         recipe = await recipe_service.generate_from_name("Simple Salad")
     
     # Should map "easy" to BEGINNER
     assert recipe.difficulty == DifficultyLevel.BEGINNER
 
+@pytest.mark.asyncio
+async def test_recipe_generator_saves_recipe_when_enrichment_fails(db_session):
+    """Enrichment is best-effort: the generated recipe is committed first"""
+    recipe_service = RecipeGeneratorService(db_session)
+    mock_ai_response = MagicMock()
+    mock_ai_response.text = '{"name": "Toast", "difficulty": "easy", "estimated_time_min": 5, "steps": [{"step_number": 1, "instruction": "Toast the bread"}]}'
+    
+    with patch.object(recipe_service.gemini.model, 'generate_content_async', new_callable=AsyncMock, return_value=mock_ai_response), \
+         patch("app.services.recipe_enrichment.RecipeEnrichmentService.enrich_recipe", new_callable=AsyncMock, side_effect=RuntimeError("db hiccup")):
+        recipe = await recipe_service.generate_from_name("Toast")
+    
+    db_result = await db_session.execute(select(RecipeStep).where(RecipeStep.recipe_id == recipe.id))
+    assert [step.instruction for step in db_result.scalars().all()] == ["Toast the bread"]
+
+@pytest.mark.asyncio
+async def test_recipe_generator_enriches_in_the_background(db_session):
+    """With BackgroundTasks the response only waits for the generation call"""
+    recipe_service = RecipeGeneratorService(db_session)
+    mock_ai_response = MagicMock()
+    mock_ai_response.text = '{"name": "Toast", "difficulty": "easy", "estimated_time_min": 5, "steps": [{"step_number": 1, "instruction": "Toast the bread"}]}'
+    background_tasks = BackgroundTasks()
+    
+    with patch.object(recipe_service.gemini.model, 'generate_content_async', new_callable=AsyncMock, return_value=mock_ai_response) as mock_gen:
+        recipe = await recipe_service.generate_from_name("Toast", background_tasks)
+    
+    assert mock_gen.call_count == 1
+    assert [(task.func, task.args) for task in background_tasks.tasks] == [(enrich_recipe_in_background, (recipe.id,))]
+
 # ============================================================================
 # INTEGRATION TESTS: Recipe Endpoints
 # ============================================================================
@@ -164,10 +207,11 @@ async def test_ai_recipe_generation_mock(client):
     }
     """
     
-    with patch("app.services.recipe_generator.genai") as mock_genai:
-        mock_model = MagicMock()
-        mock_model.generate_content_async = AsyncMock(return_value=mock_ai_response)
-        mock_genai.GenerativeModel.return_value = mock_model
+    mock_tips_response = MagicMock()
+    mock_tips_response.text = '[{"tip": "Knead until smooth.", "safe": true}]'
+    
+    from app.services.ai_providers import get_registry
+    with patch.object(get_registry().gemini.model, "generate_content_async", new_callable=AsyncMock, side_effect=[mock_ai_response, mock_tips_response]):
         
         # Try the generate endpoint if it exists
         response = await client.post("/api/v1/recipes/generate", json={"dish_name": "Pizza"})
@@ -0,0 +1,79 @@
+import time
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.services.ai_mentor import AIMentorService
+from app.services.safety_rules import AhoCorasick, prefilter_safety
+
+
+def test_automaton_finds_overlapping_whole_words():
+    matcher = AhoCorasick(["he", "she", "hers", "his"])
+    assert sorted(matcher.find("she said hers and his")) == [(0, "she"), (9, "hers"), (18, "his")]
+    assert matcher.find("ushers") == []
+
+
+@pytest.mark.parametrize("instruction", [
+    "Chop the onions finely",
+    "Boil water and cook pasta until al dente",
+    "Cook the chicken until no longer pink",
+    "Roast the pork to a core temperature of 63°C",
+    "Grill the burgers until 71°C on a meat probe thermometer",
+    "Simmer the mussels until the shells open and discard any that stay closed",
+])
+def test_clear_cases_are_safe(instruction):
+    assert prefilter_safety(instruction) == {"safe": True, "warnings": []}
+
+
+@pytest.mark.parametrize("instruction", [
+    "Slice the raw chicken, then the salad on the same cutting board",
+    "Thaw the turkey on the counter overnight",
+    "Serve the chicken slightly pink in the middle",
+    "Taste the raw batter for seasoning",
+])
+def test_lexical_hazards_are_unsafe(instruction):
+    verdict = prefilter_safety(instruction)
+    assert verdict["safe"] is False
+    assert verdict["warnings"]
+
+
+@pytest.mark.parametrize("instruction", [
+    "Whisk eggs with sugar",
+    "Sear the salmon",
+    "Roast the pork until it reaches 63°C",
+])
+def test_unmitigated_risk_is_escalated(instruction):
+    assert prefilter_safety(instruction) is None
+
+
+@pytest.mark.parametrize("instruction", [
+    # Oven temperature, not the meat's
+    "Preheat the oven to 200°C and put the chicken in for 10 minutes",
+    # Surface colour isn't doneness
+    "Sear the chicken breasts until golden on the outside, leaving the centre rare",
+    # Chilling doesn't make raw egg safe
+    "Whisk raw eggs into the mayonnaise and refrigerate",
+    # A cooking verb and a time say nothing about the centre
+    "Fry the chicken for 1 minute",
+    "Bake the salmon for 3 minutes",
+    "Bring the sausages to a boil, then slice",
+    "Grill the burgers until firm",
+    # Hygiene advice doesn't cook anything
+    "Wash your hands, then serve the raw chicken",
+])
+def test_misleading_cues_are_not_cleared(instruction):
+    assert prefilter_safety(instruction) is None
+
+
+def test_prefilter_is_fast():
+    started = time.perf_counter()
+    for _ in range(1000):
+        prefilter_safety("Heat oil in a pan and fry the onions until golden brown, then add the garlic")
+    assert (time.perf_counter() - started) / 1000 < 0.001
+
+
+@pytest.mark.asyncio
+async def test_validate_food_safety_skips_llm_for_clear_cases():
+    with patch("google.generativeai.GenerativeModel.generate_content_async", new_callable=AsyncMock) as mock_gemini:
+        verdict = await AIMentorService().validate_food_safety("Chop the onions finely")
+
+    assert verdict == {"safe": True, "warnings": []}
+    mock_gemini.assert_not_called()
@@ -0,0 +1,290 @@
+import asyncio
+import pytest
+import uuid
+import pytest_asyncio
+from unittest.mock import AsyncMock, patch
+from redis.exceptions import WatchError
+from app.core.dependencies import get_current_user
+from app.main import app
+from app.models.recipe import Recipe, RecipeStep, DifficultyLevel
+from app.models.session import CookingSession
+from app.models.user import User
+from app.services.cooking import CookingService
+from app.services.session_state import SessionStateStore
+
+
+class FakeRedis:
+    """The hash commands SessionStateStore uses, with decode_responses semantics."""
+
+    def __init__(self):
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.sets: dict[str, set[str]] = {}
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def hset(self, key, field=None, value=None, mapping=None):
+        target = self.hashes.setdefault(key, {})
+        if field is not None:
+            target[field] = str(value)
+        for name, item in (mapping or {}).items():
+            target[name] = str(item)
+
+    async def hincrby(self, key, field, amount):
+        target = self.hashes.setdefault(key, {})
+        target[field] = str(int(target.get(field, 0)) + amount)
+        return int(target[field])
+
+    async def hexists(self, key, field):
+        return field in self.hashes.get(key, {})
+
+    async def hdel(self, key, field):
+        return int(self.hashes.get(key, {}).pop(field, None) is not None)
+
+    async def exists(self, key):
+        return int(key in self.hashes)
+
+    async def delete(self, key):
+        return int(self.hashes.pop(key, None) is not None)
+
+    async def expire(self, key, seconds):
+        return int(key in self.hashes)
+
+    async def sadd(self, key, *members):
+        target = self.sets.setdefault(key, set())
+        added = len(set(members) - target)
+        target.update(members)
+        return added
+
+    async def srem(self, key, *members):
+        target = self.sets.get(key, set())
+        removed = len(target & set(members))
+        target.difference_update(members)
+        return removed
+
+    async def spop(self, key, count=None):
+        target = self.sets.get(key, set())
+        popped = [target.pop() for _ in range(min(count or 1, len(target)))]
+        return popped if count is not None else (popped[0] if popped else None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues commands; after watch() and until multi() they run immediately, like redis-py."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+        self.watched: dict[str, dict] = {}
+        self.immediate = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def watch(self, *keys):
+        self.immediate = True
+        self.watched = {key: dict(self.redis.hashes.get(key, {})) for key in keys}
+
+    def multi(self):
+        self.immediate = False
+
+    def __getattr__(self, name):
+        if self.immediate:
+            return getattr(self.redis, name)
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    async def execute(self):
+        if any(self.redis.hashes.get(key, {}) != seen for key, seen in self.watched.items()):
+            raise WatchError("Watched variable changed.")
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+@pytest_asyncio.fixture
+async def three_steps(db_session):
+    recipe = Recipe(title="Pancakes", difficulty=DifficultyLevel.BEGINNER, servings=2)
+    db_session.add(recipe)
+    await db_session.flush()
+    db_session.add_all([
+        RecipeStep(recipe_id=recipe.id, step_number=n, instruction=f"Step {n}", ai_tips=f"Tip {n}")
+        for n in (1, 2, 3)
+    ])
+    await db_session.commit()
+    return recipe
+
+
+@pytest.fixture
+def store(db_session):
+    """Fresh store on a fake Redis whose write-behind lands in the test database."""
+    redis = FakeRedis()
+    store = SessionStateStore(ttl_seconds=60, flush_interval=60)
+    with patch("app.services.session_state.get_redis", new_callable=AsyncMock, return_value=redis), \
+         patch("app.services.cooking.session_state", store), \
+         patch("app.api.v1.endpoints.sessions.session_state", store), \
+         patch("app.db.base.AsyncSessionLocal") as mock_session_factory:
+        mock_session_factory.return_value.__aenter__.return_value = db_session
+        store.redis = redis
+        yield store
+
+
+@pytest.mark.asyncio
+async def test_taps_stay_in_redis_until_the_batched_flush(db_session, three_steps, store):
+    cooking = CookingService(db_session)
+    session = await cooking.start_session(str(three_steps.id))
+
+    step = await cooking.advance_step(str(session.id))
+
+    assert step["step_number"] == 2
+    await db_session.refresh(session)
+    assert session.current_step_index == "0"
+    assert await store.flush() == 1
+    await db_session.refresh(session)
+    assert session.current_step_index == "1"
+    assert await store.flush() == 0
+
+
+@pytest.mark.asyncio
+async def test_another_worker_flushes_a_dead_workers_advances(db_session, three_steps, store):
+    cooking = CookingService(db_session)
+    session = await cooking.start_session(str(three_steps.id))
+    await cooking.advance_step(str(session.id))
+
+    # The worker that took the tap is gone before its flusher ran
+    other_worker = SessionStateStore(ttl_seconds=60, flush_interval=60)
+    assert await other_worker.flush() == 1
+    await db_session.refresh(session)
+    assert session.current_step_index == "1"
+    assert await store.flush() == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_sessions_dirty(db_session, three_steps, store):
+    cooking = CookingService(db_session)
+    session = await cooking.start_session(str(three_steps.id))
+    await cooking.advance_step(str(session.id))
+
+    with patch("app.db.base.AsyncSessionLocal", side_effect=Exception("db down")):
+        assert await store.flush() == 0
+    assert store.redis.sets["cook:dirty"] == {str(session.id)}
+    assert await store.flush() == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_taps_never_lose_a_transition(db_session, three_steps, store):
+    session = await CookingService(db_session).start_session(str(three_steps.id))
+
+    await asyncio.gather(*(store.advance(db_session, str(session.id)) for _ in range(2)))
+
+    assert (await store.get(db_session, str(session.id)))["step_index"] == 2
+
+
+@pytest.mark.asyncio
+async def test_expired_state_is_rebuilt_from_postgres(db_session, three_steps, store):
+    cooking = CookingService(db_session)
+    session = await cooking.start_session(str(three_steps.id))
+    await cooking.advance_step(str(session.id))
+    await store.flush()
+
+    store.redis.hashes.clear()
+
+    assert (await cooking.get_current_step(str(session.id)))["step_number"] == 2
+    assert store.stats["db_loads"] == 1
+
+
+@pytest.mark.asyncio
+async def test_completion_is_persisted_immediately(db_session, three_steps, store):
+    cooking = CookingService(db_session)
+    session = await cooking.start_session(str(three_steps.id))
+    for _ in range(3):
+        result = await cooking.advance_step(str(session.id))
+
+    assert result["message"] == "Recipe complete!"
+    await db_session.refresh(session)
+    assert (session.status, session.current_step_index) == ("completed", "3")
+    assert session.completed_at is not None
+
+
+@pytest.mark.asyncio
+async def test_prefetched_guidance_survives_expired_state(db_session, store):
+    recipe = Recipe(title="Toast", difficulty=DifficultyLevel.BEGINNER, servings=1)
+    db_session.add(recipe)
+    await db_session.flush()
+    db_session.add(RecipeStep(recipe_id=recipe.id, step_number=1, instruction="Toast the bread"))
+    await db_session.commit()
+    cooking = CookingService(db_session)
+    session = await cooking.start_session(str(recipe.id))
+
+    with patch("app.services.ai_mentor.AIMentorService.get_step_guidance", new_callable=AsyncMock, return_value="Watch the edges") as mock_ai:
+        await cooking._prefetch_guidance(str(session.id), 0)
+        assert store.redis.hashes[f"cook:session:{session.id}"]["guidance:0"] == "Watch the edges"
+
+        store.redis.hashes.clear()
+        step = await cooking.get_current_step(str(session.id))
+
+    assert step["guidance"] == "Watch the edges"
+    assert mock_ai.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_rebuild_from_a_stale_row_keeps_a_newer_advance(db_session, three_steps, store):
+    session = await CookingService(db_session).start_session(str(three_steps.id))
+    stale = await store.get(db_session, str(session.id))
+    await store.advance(db_session, str(session.id))
+
+    # Another request found the hash missing earlier and rebuilds it from the row it read
+    await store._hydrate(str(session.id), stale)
+
+    assert (await store.get(db_session, str(session.id)))["step_index"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rebuild_yields_to_an_advance_landing_mid_rebuild(db_session, three_steps, store):
+    session = await CookingService(db_session).start_session(str(three_steps.id))
+    key = f"cook:session:{session.id}"
+    stale = await store.get(db_session, str(session.id))
+    store.redis.hashes.pop(key)
+
+    async def advance_lands(key, field):
+        store.redis.hashes[key] = {"recipe_id": str(three_steps.id), "step_index": "1"}
+        return False
+
+    with patch.object(store.redis, "hexists", side_effect=advance_lands):
+        await store._hydrate(str(session.id), stale)
+
+    assert store.redis.hashes[key]["step_index"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_history_endpoints_read_and_write_the_hot_state(client, db_session, three_steps, store):
+    user = User(email="cook@example.com", name="Cook")
+    db_session.add(user)
+    await db_session.commit()
+    app.dependency_overrides[get_current_user] = lambda: user
+
+    response = await client.post("/api/v1/sessions/", json={"recipe_id": str(three_steps.id), "session_type": "live"})
+    assert response.status_code == 201
+    session_id = response.json()["id"]
+    await store.advance(db_session, session_id)
+
+    # The row still says step 1 until the flush; the endpoints don't
+    assert (await client.get(f"/api/v1/sessions/{session_id}")).json()["current_step"] == 2
+    assert (await client.get("/api/v1/sessions/")).json()[0]["current_step"] == 2
+
+    response = await client.post(f"/api/v1/sessions/{session_id}/step", json={"step_number": 3})
+    assert response.json()["current_step"] == 3
+    assert (await store.get(db_session, session_id))["step_index"] == 2
+
+    response = await client.put(f"/api/v1/sessions/{session_id}", json={"status": "completed"})
+    assert response.json()["status"] == "completed"
+    assert response.json()["completed_at"] is not None
+    row = await db_session.get(CookingSession, uuid.UUID(session_id))
+    await db_session.refresh(row)
+    assert (row.status, row.current_step_index) == ("completed", "2")
+
+    assert (await client.delete(f"/api/v1/sessions/{session_id}")).status_code == 204
+    assert f"cook:session:{session_id}" not in store.redis.hashes
+    assert (await client.get(f"/api/v1/sessions/{session_id}")).status_code == 404
@@ -0,0 +1,108 @@
+import asyncio
+import base64
+import io
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.services.speech_pipeline import SentenceSplitter, speak_stream
+
+
+def test_splitter_cuts_sentences_across_token_boundaries():
+    splitter = SentenceSplitter()
+    sentences = []
+    for token in ["Yes! Melt 1 tsp. of butter", " over 2.5 minutes. Then ", "add the eggs", "! Keep stirring"]:
+        sentences += splitter.feed(token)
+
+    assert sentences == ["Yes! Melt 1 tsp. of butter over 2.5 minutes.", "Then add the eggs!"]
+    assert splitter.flush() == "Keep stirring"
+
+
+def test_splitter_breaks_up_run_on_text():
+    splitter = SentenceSplitter()
+    sentences = splitter.feed("stir " * 100)
+
+    assert len(sentences) == 1 and len(sentences[0]) <= 240
+
+
+class FakeVoice:
+    """Synthesis that records what it was asked for and can be held per sentence."""
+
+    def __init__(self, delays=None):
+        self.requested = []
+        self.first_started = asyncio.Event()
+        self.delays = delays or {}
+
+    async def text_to_speech(self, text):
+        self.requested.append(text)
+        self.first_started.set()
+        await asyncio.sleep(self.delays.get(len(self.requested) - 1, 0))
+        return io.BytesIO(text.upper().encode())
+
+
+@pytest.mark.asyncio
+async def test_first_sentence_is_synthesized_while_the_answer_is_still_generating():
+    voice = FakeVoice()
+
+    async def answer():
+        yield "Use a low heat for soft curds. "
+        # Generation stalls here until the first sentence is already in synthesis
+        await asyncio.wait_for(voice.first_started.wait(), timeout=1)
+        yield "Take them off while still glossy."
+
+    spoken = [sentence async for sentence in speak_stream(answer(), voice)]
+
+    assert [sentence.text for sentence in spoken] == ["Use a low heat for soft curds.", "Take them off while still glossy."]
+    assert spoken[0].audio == b"USE A LOW HEAT FOR SOFT CURDS."
+
+
+@pytest.mark.asyncio
+async def test_audio_is_delivered_in_sentence_order():
+    voice = FakeVoice(delays={0: 0.05})
+
+    async def answer():
+        yield "The first sentence is slow to speak. The second one is quick."
+
+    spoken = [sentence async for sentence in speak_stream(answer(), voice)]
+
+    assert [sentence.index for sentence in spoken] == [0, 1]
+    assert spoken[1].audio == b"THE SECOND ONE IS QUICK."
+
+
+@pytest.mark.asyncio
+async def test_speak_endpoint_streams_audio_frames_then_done(client):
+    async def answer(*args, **kwargs):
+        for token in ["Use a splash of milk. ", "It keeps them soft."]:
+            yield token
+
+    with patch("app.services.ai_mentor.AIMentorService.chat_with_mentor_stream", side_effect=answer), \
+         patch("app.services.voice.VoiceService.text_to_speech", new_callable=AsyncMock, side_effect=[io.BytesIO(b"mp3-1"), None]):
+        response = await client.post("/api/v1/cooking/chat/speak", json={
+            "context": {"recipe_name": "Omelette"},
+            "messages": [{"role": "user", "content": "Any tips?"}],
+        })
+
+    frames = [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+    assert frames[0] == {"index": 0, "text": "Use a splash of milk.", "audio": base64.b64encode(b"mp3-1").decode()}
+    assert frames[1] == {"index": 1, "text": "It keeps them soft.", "audio": None}
+    assert frames[2]["response"] == "Use a splash of milk. It keeps them soft."
+
+
+@pytest.mark.asyncio
+async def test_speak_endpoint_reports_a_cut_off_answer(client):
+    from app.services.ai_mentor import ChatStreamInterrupted
+
+    async def answer(*args, **kwargs):
+        yield "Use a splash of milk. It keeps"
+        raise ChatStreamInterrupted("gemini")
+
+    with patch("app.services.ai_mentor.AIMentorService.chat_with_mentor_stream", side_effect=answer), \
+         patch("app.services.voice.VoiceService.text_to_speech", new_callable=AsyncMock, return_value=None):
+        response = await client.post("/api/v1/cooking/chat/speak", json={
+            "context": {"recipe_name": "Omelette"},
+            "messages": [{"role": "user", "content": "Any tips?"}],
+        })
+
+    assert "event: error" in response.text and "event: done" not in response.text
+    frames = [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+    assert frames[0]["text"] == "Use a splash of milk."
+    assert frames[-1]["truncated"] is True
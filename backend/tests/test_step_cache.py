@@ -0,0 +1,65 @@
+import json
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.models.recipe import Recipe, RecipeStep, DifficultyLevel
+from app.services.cooking import CookingService
+from app.services.recipe_enrichment import RecipeEnrichmentService
+from app.services.step_cache import step_cache
+
+
+@pytest_asyncio.fixture
+async def shuffled_recipe(db_session):
+    recipe = Recipe(title="Rice", difficulty=DifficultyLevel.BEGINNER, servings=2)
+    db_session.add(recipe)
+    await db_session.flush()
+    # Inserted out of order on purpose
+    db_session.add_all([
+        RecipeStep(recipe_id=recipe.id, step_number=2, instruction="Simmer covered", ai_tips="Keep the lid on."),
+        RecipeStep(recipe_id=recipe.id, step_number=1, instruction="Rinse the rice", ai_tips="Until the water runs clear."),
+    ])
+    await db_session.commit()
+    return recipe
+
+
+@pytest.mark.asyncio
+async def test_steps_are_loaded_once_per_recipe_version(db_session, shuffled_recipe):
+    cooking = CookingService(db_session)
+    first = await cooking.start_session(str(shuffled_recipe.id))
+    second = await cooking.start_session(str(shuffled_recipe.id))
+
+    assert (await cooking.get_current_step(str(first.id)))["instruction"] == "Rinse the rice"
+    assert (await cooking.advance_step(str(first.id)))["instruction"] == "Simmer covered"
+    assert (await cooking.get_current_step(str(second.id)))["step_number"] == 1
+
+    assert step_cache.stats["misses"] == 1
+    assert step_cache.stats["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_steps_are_immutable_and_sorted(db_session, shuffled_recipe):
+    steps = await step_cache.get(db_session, shuffled_recipe.id, "v1")
+
+    assert [step.step_number for step in steps] == [1, 2]
+    with pytest.raises((AttributeError, TypeError)):
+        steps[0].instruction = "changed"
+
+
+@pytest.mark.asyncio
+async def test_re_enrichment_invalidates_and_bumps_the_version(db_session, shuffled_recipe):
+    cooking = CookingService(db_session)
+    session = await cooking.start_session(str(shuffled_recipe.id))
+    version = shuffled_recipe.updated_at
+    await cooking.get_current_step(str(session.id))
+
+    response = MagicMock()
+    response.text = json.dumps([
+        {"tip": "Swirl, don't scrub.", "safe": True, "warnings": []},
+        {"tip": "Don't peek.", "safe": True, "warnings": []},
+    ])
+    with patch("google.generativeai.GenerativeModel.generate_content_async", new_callable=AsyncMock, return_value=response):
+        await RecipeEnrichmentService(db_session).enrich_recipe(shuffled_recipe.id, overwrite=True)
+
+    assert shuffled_recipe.updated_at != version
+    assert (await cooking.get_current_step(str(session.id)))["guidance"] == "Swirl, don't scrub."
+    assert step_cache.stats["invalidations"] == 1
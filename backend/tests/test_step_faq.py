@@ -0,0 +1,138 @@
+import json
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.models.recipe import Recipe, RecipeStep, DifficultyLevel
+from app.models.session import CookingSession
+from app.services.step_faq import StepFAQService
+from app.services.text_similarity import LexicalIndex
+from app.db.base import get_db
+from app.main import app
+
+BUTTER_FAQ = [
+    {"question": "Can I use oil instead of butter?", "answer": "Yes, a neutral oil works; the eggs will taste less rich."},
+    {"question": "How do I know the butter is ready?", "answer": "When the foam subsides and it smells nutty."},
+]
+
+
+@pytest_asyncio.fixture
+async def omelette(db_session):
+    recipe = Recipe(title="Omelette", difficulty=DifficultyLevel.BEGINNER, servings=1)
+    db_session.add(recipe)
+    await db_session.flush()
+    db_session.add_all([
+        RecipeStep(recipe_id=recipe.id, step_number=1, instruction="Whisk eggs"),
+        RecipeStep(recipe_id=recipe.id, step_number=2, instruction="Heat butter"),
+    ])
+    await db_session.commit()
+    return recipe
+
+
+async def _precompute(db_session, recipe):
+    response = MagicMock()
+    response.text = json.dumps([
+        {"questions": [{"question": "Should I add milk?", "answer": "A splash makes it softer."}]},
+        {"questions": BUTTER_FAQ},
+    ])
+    with patch("google.generativeai.GenerativeModel.generate_content_async", new_callable=AsyncMock, return_value=response) as mock_gemini:
+        updated = await StepFAQService(db_session).precompute_recipe(recipe.id)
+    return updated, mock_gemini
+
+
+def test_index_matches_paraphrases_but_not_other_substitutions():
+    index = LexicalIndex()
+    for pair in BUTTER_FAQ:
+        index.add(pair["question"], pair["answer"])
+
+    assert index.best("could I use oil instead of the butter", 0.72)[1] == BUTTER_FAQ[0]["answer"]
+    assert index.best("can i use margarine instead of butter?", 0.72) is None
+    assert index.best("can I use butter instead of oil?", 0.72) is None
+    assert index.best("replace the oil with butter", 0.72) is None
+    assert index.best("what temperature should the oven be", 0.72) is None
+
+
+@pytest.mark.asyncio
+async def test_precompute_stores_every_steps_faq_in_one_call(db_session, omelette):
+    updated, mock_gemini = await _precompute(db_session, omelette)
+
+    assert updated == 2
+    assert mock_gemini.call_count == 1
+    assert await StepFAQService(db_session).precompute_recipe(omelette.id) == 0
+
+
+@pytest.mark.asyncio
+async def test_chat_answers_from_the_step_faq_without_an_llm_call(client, db_session, omelette):
+    await _precompute(db_session, omelette)
+
+    with patch("app.services.ai_mentor.AIMentorService.chat_with_mentor", new_callable=AsyncMock) as mock_chat:
+        response = await client.post("/api/v1/cooking/chat", json={
+            "context": {"recipe_id": str(omelette.id), "current_step": 2},
+            "messages": [{"role": "user", "content": "can I use oil instead of butter"}],
+        })
+
+    assert response.status_code == 200
+    assert response.json()["response"] == BUTTER_FAQ[0]["answer"]
+    mock_chat.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stream_resolves_the_step_from_the_cooking_session(client, db_session, omelette):
+    await _precompute(db_session, omelette)
+    session = CookingSession(recipe_id=omelette.id, status="in_progress", current_step_index="1")
+    db_session.add(session)
+    await db_session.commit()
+
+    with patch("app.services.ai_mentor.AIMentorService.chat_with_mentor_stream") as mock_stream:
+        response = await client.post("/api/v1/cooking/chat/stream", json={
+            "context": {"recipe_name": "Omelette"},
+            "session_id": str(session.id),
+            "messages": [{"role": "user", "content": "How do I know when the butter is ready?"}],
+        })
+
+    assert BUTTER_FAQ[1]["answer"] in response.text
+    mock_stream.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_edited_instruction_falls_back_to_the_llm(client, db_session, omelette):
+    await _precompute(db_session, omelette)
+    omelette_steps = (await db_session.get(Recipe, omelette.id)).steps
+    next(step for step in omelette_steps if step.step_number == 2).instruction = "Heat olive oil"
+    await db_session.commit()
+
+    with patch("app.services.ai_mentor.AIMentorService.chat_with_mentor", new_callable=AsyncMock, return_value="Sure.") as mock_chat:
+        response = await client.post("/api/v1/cooking/chat", json={
+            "context": {"recipe_id": str(omelette.id), "current_step": 2},
+            "messages": [{"role": "user", "content": "can I use oil instead of butter"}],
+        })
+
+    assert response.json()["response"] == "Sure."
+    mock_chat.assert_called_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("endpoint", ["/api/v1/cooking/chat/stream", "/api/v1/cooking/chat/speak"])
+async def test_streams_read_the_faq_before_the_request_session_closes(client, db_session, endpoint):
+    # get_db's cleanup runs before a StreamingResponse body is sent
+    closed = []
+
+    async def closing_get_db():
+        yield db_session
+        closed.append(True)
+
+    app.dependency_overrides[get_db] = closing_get_db
+    seen_closed = []
+
+    async def answer(self, context, session_id, question):
+        seen_closed.append(bool(closed))
+        return "From the FAQ."
+
+    with patch("app.services.step_faq.StepFAQService.answer", answer), \
+         patch("app.services.voice.VoiceService.text_to_speech", new_callable=AsyncMock, return_value=None):
+        response = await client.post(endpoint, json={
+            "context": {"recipe_name": "Omelette"},
+            "messages": [{"role": "user", "content": "Is the butter ready?"}],
+        })
+
+    assert "From the FAQ." in response.text
+    assert seen_closed == [False]
@@ -0,0 +1,60 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.schemas.ai import SafetyVerdict, VoiceIntent
+from app.services.ai_mentor import AIMentorService
+from app.services.ai_providers import GroqProvider
+from app.services.structured_output import StructuredOutputError, parse_json
+
+
+@pytest.mark.parametrize("text", [
+    '{"safe": false, "warnings": ["raw chicken"]}',
+    '```json\n{"safe": false, "warnings": ["raw chicken"]}\n```',
+    'Sure! Here is the check:\n{"safe": false, "warnings": ["raw chicken"]}\nStay safe!',
+    '{"safe": false, "warnings": ["raw chicken",],}',
+    "{'safe': False, 'warnings': ['raw chicken']}",
+    '{safe: false, warnings: [“raw chicken”]}',
+    '{"safe": false, "warnings": ["raw chicken"',
+])
+def test_recovers_common_malformations(text):
+    assert parse_json(text) == {"safe": False, "warnings": ["raw chicken"]}
+
+
+def test_schema_fills_defaults_and_normalizes():
+    assert parse_json('{"intent": " timer ", "duration_seconds": "600"}', VoiceIntent) == {
+        "intent": "TIMER",
+        "duration_seconds": 600,
+    }
+    assert parse_json('[{"safe": true}, {}]', list[SafetyVerdict]) == [
+        {"safe": True, "warnings": []},
+        {"safe": True, "warnings": []},
+    ]
+
+
+def test_schema_skips_non_matching_values_and_unwraps_lists():
+    assert parse_json('Step [1] done. Tips: ["Salt the water", "Stir"]', list[str]) == ["Salt the water", "Stir"]
+    assert parse_json('{"tips": ["Salt the water", "Stir"]}', list[str]) == ["Salt the water", "Stir"]
+
+
+def test_unrecoverable_output_raises():
+    with pytest.raises(StructuredOutputError):
+        parse_json("I can't help with that.")
+    with pytest.raises(StructuredOutputError):
+        parse_json('{"safe": true}', list[str])
+
+
+@pytest.mark.asyncio
+async def test_chatty_answer_does_not_cost_a_groq_call():
+    ai = AIMentorService()
+    chatty = 'Here you go!\n```\n[{"tip": "Listen for the sizzle"}, {"tip": "Look for golden edges", "safe": true},]\n```'
+    with patch.object(ai.gemini, "generate", new_callable=AsyncMock, return_value=chatty), \
+         patch.object(ai.groq, "generate", new_callable=AsyncMock) as groq:
+        steps = await ai.enrich_recipe_steps("Fried Rice", ["Heat the wok", "Add rice"])
+
+    assert [step["tip"] for step in steps] == ["Listen for the sizzle", "Look for golden edges"]
+    assert all(step["safe"] and not step["timer_required"] for step in steps)
+    groq.assert_not_called()
+
+
+def test_groq_json_mode_requests_json_object():
+    request = GroqProvider()._request([{"role": "user", "content": "JSON please"}], None, None, None, json_mode=True)
+    assert request["response_format"] == {"type": "json_object"}